@@ -0,0 +1,126 @@
+"""
+LaZone Index Rollout Script
+
+Adds the lazone table's global secondary indexes to an existing stack. DynamoDB (and so
+CloudFormation) creates at most one new index per table update, so a template that adds
+several indexes at once fails on an existing table. The template stages its indexes with
+the IndexStage parameter instead, and this script raises it one step per stack update,
+waiting for each update to finish and the new index to become active before the next.
+
+A new stack can be created with the default IndexStage directly, as every index is
+created together with the table. The lazone lambda only queries indexes that are active,
+so it keeps working (with scans) while the rollout is in progress, and the template only
+turns on its sparse claim and think tank plans (SPARSE_INDEXES) with the last stage. The
+script can be rerun after an interruption: it continues from the stack's current IndexStage.
+
+Usage:
+    python3 rollout_indexes.py --stack-name lazone [--target 9] [--template lazone-template.yaml]
+
+Prerequisites:
+- AWS credentials configured with CloudFormation and DynamoDB access
+- boto3 library installed
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import os
+import time
+import boto3
+
+region_name = 'ap-southeast-2'
+table_name = 'lazone'
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lazone-template.yaml')
+STAGE_PARAMETER = 'IndexStage'
+# Index created by each IndexStage step, in the template's order
+INDEX_STAGES = [
+    'source-dateTime-index',
+    'dateBucket-dateTime-index',
+    'hasThinkTank-dateTime-index',
+    'claim_gw_not_happening-dateTime-index',
+    'claim_not_caused_by_human-dateTime-index',
+    'claim_impacts_not_bad-dateTime-index',
+    'claim_solutions_wont_work-dateTime-index',
+    'claim_science_movement_unrel-dateTime-index',
+    'claim_individual_action-dateTime-index'
+]
+POLL_SECONDS = 30
+
+def get_stack_parameters(cloudformation, stack_name):
+    """
+    Reads the stack's current parameter values.
+
+    Returns:
+        dict: Parameter name -> value
+    """
+    stack = cloudformation.describe_stacks(StackName=stack_name)['Stacks'][0]
+    return {parameter['ParameterKey']: parameter.get('ParameterValue') for parameter in stack.get('Parameters', [])}
+
+def update_stage(cloudformation, stack_name, template_body, parameter_names, stage):
+    """
+    Runs one stack update with IndexStage set to stage, keeping every other parameter.
+    """
+    parameters = [
+        {'ParameterKey': name, 'UsePreviousValue': True}
+        for name in parameter_names if name != STAGE_PARAMETER
+    ]
+    parameters.append({'ParameterKey': STAGE_PARAMETER, 'ParameterValue': str(stage)})
+    cloudformation.update_stack(
+        StackName=stack_name,
+        TemplateBody=template_body,
+        Parameters=parameters,
+        Capabilities=['CAPABILITY_NAMED_IAM']
+    )
+    # Index creation includes the backfill of existing items, which can take a while
+    cloudformation.get_waiter('stack_update_complete').wait(
+        StackName=stack_name, WaiterConfig={'Delay': POLL_SECONDS, 'MaxAttempts': 480}
+    )
+
+def wait_for_index(dynamodb, index_name):
+    """
+    Waits until the index exists and is active.
+    """
+    while True:
+        description = dynamodb.describe_table(TableName=table_name)['Table']
+        statuses = {index['IndexName']: index['IndexStatus'] for index in description.get('GlobalSecondaryIndexes', [])}
+        if statuses.get(index_name) == 'ACTIVE':
+            return
+        time.sleep(POLL_SECONDS)
+
+def main():
+    """
+    Main function to raise the stack's IndexStage one index at a time.
+    """
+    parser = argparse.ArgumentParser(description='Add the lazone table indexes one stack update at a time')
+    parser.add_argument('--stack-name', required=True, help='CloudFormation stack created from lazone-template.yaml')
+    parser.add_argument('--target', type=int, default=len(INDEX_STAGES), help='IndexStage to reach (default: all indexes)')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='Template file (default: lazone-template.yaml)')
+    args = parser.parse_args()
+
+    if not 0 <= args.target <= len(INDEX_STAGES):
+        parser.error(f"--target must be between 0 and {len(INDEX_STAGES)}")
+
+    cloudformation = boto3.client('cloudformation', region_name=region_name)
+    dynamodb = boto3.client('dynamodb', region_name=region_name)
+    with open(args.template, 'r', encoding='utf-8') as template_file:
+        template_body = template_file.read()
+
+    parameters = get_stack_parameters(cloudformation, args.stack_name)
+    # Stacks created before the parameter existed have none of the staged indexes
+    current = int(parameters.get(STAGE_PARAMETER) or 0)
+    if current >= args.target:
+        print(f"Stack {args.stack_name} is already at {STAGE_PARAMETER} {current}")
+        return
+
+    parameter_names = set(parameters) | {STAGE_PARAMETER}
+    for stage in range(current + 1, args.target + 1):
+        index_name = INDEX_STAGES[stage - 1]
+        start_time = time.time()
+        print(f"Updating {args.stack_name} to {STAGE_PARAMETER} {stage} ({index_name})")
+        update_stage(cloudformation, args.stack_name, template_body, parameter_names, stage)
+        wait_for_index(dynamodb, index_name)
+        print(f"{index_name} active after {time.time() - start_time:.0f} seconds")
+
+if __name__ == "__main__":
+    main()
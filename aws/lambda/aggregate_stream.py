@@ -0,0 +1,180 @@
+"""
+LaZone Aggregates - DynamoDB Stream consumer for the dashboard summary rollups
+
+Keeps the lazone-aggregates table in step with the lazone table so the lazone lambda's
+aggregate endpoint can answer summary queries (article counts per day, month and source,
+think tank reference counts and broadClaims counts) in a few Query calls, whatever the
+size of the corpus.
+
+Each article contributes one count to every metric it has:
+    *                   - the article itself
+    think_tank_ref      - the article has a think_tank_ref attribute
+    broadClaims.<claim> - the article's broadClaims map has the claim key
+
+and each metric is counted in three rows of the lazone-aggregates table
+(partition key 'bucket', sort key 'key', counter attribute 'count'):
+    bucket 'ALL',     key '*#<metric>#<source>'           - all time
+    bucket 'ALL',     key 'YYYY-MM#<metric>#<source>'     - per month
+    bucket 'YYYY-MM', key 'YYYY-MM-DD#<metric>#<source>'  - per day
+
+Articles without a valid dateTime are only counted in the all time rows.
+
+Stream records carry both images (StreamViewType NEW_AND_OLD_IMAGES), so inserts,
+updates and deletes are handled alike: the old image's rows are decremented and the new
+image's rows incremented. Deltas are summed over the whole batch first, so re-uploading
+an unchanged article writes nothing. Stream delivery is at least once; if a batch fails
+part way it is retried and may be counted twice, so data/database/build_aggregates.py
+can rebuild the table from scratch.
+
+Maintainers:
+    Primary: Oisin Aeonn (s3952320@student.rmit.edu.au)
+
+Changelog:
+v1.0.0 - Initial Release: per day, month and all time counts by source and metric
+"""
+
+import boto3
+import os
+import threading
+from boto3.dynamodb.types import TypeDeserializer
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+aggregates_table_name = os.environ.get('AGGREGATES_TABLE', 'lazone-aggregates')
+
+# Rollup layout (shared with the aggregate endpoint in lambda_function.py)
+ALL_BUCKET = 'ALL'
+TOTAL_PERIOD = '*'
+ARTICLE_METRIC = '*'
+THINK_TANK_METRIC = 'think_tank_ref'
+CLAIM_METRIC_PREFIX = 'broadClaims.'
+UNKNOWN_SOURCE = 'unknown'
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# UpdateItem calls sent at once; each changed row needs its own call
+UPDATE_WORKERS = 16
+
+deserializer = TypeDeserializer()
+update_executor = ThreadPoolExecutor(max_workers=UPDATE_WORKERS)
+thread_local = threading.local()
+
+def get_thread_table():
+    """
+    Returns the aggregates Table for the current worker thread (boto3 resources are not thread safe)
+
+    Returns:
+        Table: DynamoDB Table bound to a per-thread session
+    """
+    if not hasattr(thread_local, 'table'):
+        thread_local.table = boto3.session.Session().resource('dynamodb').Table(aggregates_table_name)
+    return thread_local.table
+
+def get_article_day(date_time):
+    """
+    Extracts the publication day of an article
+
+    Args:
+        date_time (str): Article dateTime (ISO 8601), or None
+
+    Returns:
+        str: Day as YYYY-MM-DD, or None if the dateTime is missing or invalid
+    """
+    try:
+        return datetime.strptime(date_time, DATE_FORMAT).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+def get_rollup_keys(article):
+    """
+    Lists the aggregate rows an article is counted in
+
+    Args:
+        article (dict): Article item (plain Python values)
+
+    Returns:
+        list: (bucket, key) tuples
+    """
+    source = article.get('source') or UNKNOWN_SOURCE
+    metrics = [ARTICLE_METRIC]
+    if 'think_tank_ref' in article:
+        metrics.append(THINK_TANK_METRIC)
+    claims = article.get('broadClaims')
+    if isinstance(claims, dict):
+        metrics.extend(f"{CLAIM_METRIC_PREFIX}{claim}" for claim in claims)
+
+    day = get_article_day(article.get('dateTime'))
+    keys = []
+    for metric in metrics:
+        keys.append((ALL_BUCKET, f"{TOTAL_PERIOD}#{metric}#{source}"))
+        if day:
+            keys.append((ALL_BUCKET, f"{day[:7]}#{metric}#{source}"))
+            keys.append((day[:7], f"{day}#{metric}#{source}"))
+    return keys
+
+def deserialize_image(image):
+    """
+    Converts a stream record image from DynamoDB JSON to plain Python values
+
+    Args:
+        image (dict): NewImage or OldImage of a stream record, or None
+
+    Returns:
+        dict: Article item, or None if the record has no such image
+    """
+    if not image:
+        return None
+    return {name: deserializer.deserialize(value) for name, value in image.items()}
+
+def get_deltas(records):
+    """
+    Sums the count changes of a batch of stream records
+
+    Args:
+        records (list): DynamoDB Stream records
+
+    Returns:
+        Counter: (bucket, key) -> net change, without rows whose changes cancel out
+    """
+    deltas = Counter()
+    for record in records:
+        change = record.get('dynamodb', {})
+        old_image = deserialize_image(change.get('OldImage'))
+        new_image = deserialize_image(change.get('NewImage'))
+        if old_image:
+            deltas.subtract(get_rollup_keys(old_image))
+        if new_image:
+            deltas.update(get_rollup_keys(new_image))
+    return Counter({key: delta for key, delta in deltas.items() if delta})
+
+def apply_delta(row, delta):
+    """
+    Atomically adds a change to one aggregate row (creating it if needed)
+
+    Args:
+        row (tuple): (bucket, key) of the row
+        delta (int): Amount to add (negative for removed articles)
+    """
+    bucket, key = row
+    get_thread_table().update_item(
+        Key={'bucket': bucket, 'key': key},
+        UpdateExpression='ADD #count :delta',
+        ExpressionAttributeNames={'#count': 'count'},
+        ExpressionAttributeValues={':delta': delta}
+    )
+
+def lambda_handler(event, context):
+    """
+    Stream handler: applies the batch's net count changes to lazone-aggregates
+
+    Any failed update fails the invocation so Lambda retries the batch.
+
+    Returns:
+        dict: Number of records processed and rows updated
+    """
+    records = event.get('Records', [])
+    deltas = get_deltas(records)
+    # list() waits for every update and re-raises the first failure
+    list(update_executor.map(lambda row: apply_delta(row, deltas[row]), deltas))
+    print(f"Processed {len(records)} records, updated {len(deltas)} aggregate rows")
+    return {'records': len(records), 'rows': len(deltas)}
@@ -0,0 +1,392 @@
+"""
+LaZone API Benchmark - lambda_handler against a local DynamoDB stand-in
+
+Seeds a local DynamoDB (moto in process by default, or DynamoDB Local with --endpoint-url)
+with synthetic corpora and times representative API Gateway events through
+lambda_function.lambda_handler, without touching the real lazone table.
+
+For each corpus size and query case it reports:
+- latency percentiles (p50/p90/p99) over --repeat runs, with the result and postings caches cleared
+  before every run so each one reaches DynamoDB
+- DynamoDB requests made and items read (ScannedCount of Scan/Query plus items returned by
+  BatchGetItem) against articles returned, i.e. how much work the query plan wastes
+- response payload bytes (uncompressed)
+
+Latencies against moto or DynamoDB Local are not those of the real service, but they are
+comparable between runs on the same machine, and the request and item counts are exact.
+--save-baseline stores the results; later runs are compared with the stored baseline and
+exit with status 1 when a case gets slower than --latency-tolerance or reads or returns
+more than --count-tolerance more items or bytes.
+
+The corpus is generated from a fixed seed, so counts are repeatable. Only the postings of
+the benchmarked search terms are seeded (the search plan reads no others), which keeps
+seeding the 100k corpus to a few minutes. moto re-reads the whole table for every Scan
+page, so prefer DynamoDB Local for the largest corpus.
+
+Usage:
+    python3 benchmark.py [--sizes 1000,10000,100000] [--repeat 10] [--cases search,publisher]
+                         [--endpoint-url http://localhost:8000] [--baseline benchmark_baseline.json]
+                         [--save-baseline]
+
+Prerequisites:
+- boto3 library installed
+- moto library installed (unless --endpoint-url is used)
+
+Maintainers:
+    Primary: Oisin Aeonn (s3952320@student.rmit.edu.au)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 10
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+LATENCY_TOLERANCE = 0.25  # Allowed p50 slowdown before a case is flagged
+COUNT_TOLERANCE = 0.10  # Allowed growth in items read, items returned and payload bytes
+SEED = 42
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Query cases: API Gateway query string parameters
+CASES = {
+    'date_range': {'startDate': '2019-11-01T00:00:00Z', 'endDate': '2020-01-31T23:59:59Z'},
+    'multi_source': {'sources': 'abc.net.au,theguardian.com,foxnews.com'},
+    'publisher': {'publisher': 'murdoch media'},
+    'search': {'search': 'bushfire and arson'},
+    'broad_claims_or': {'broadClaims': 'gw_not_happening,impacts_not_bad'},
+    'broad_claims_and': {'broadClaims': 'gw_not_happening,impacts_not_bad', 'claimsMatch': 'all'},
+    'think_tank': {'thinkTankRef': 'true'},
+}
+
+# Synthetic corpus settings
+SOURCES = [
+    "theaustralian.com.au", "theguardian.com", "abc.net.au", "news.com.au",
+    "heraldsun.com.au", "skynews.com.au", "afr.com", "smh.com.au",
+    "dailytelegraph.com.au", "foxnews.com", "nytimes.com", "dailywire.com",
+    "couriermail.com.au", "thewest.com.au", "7news.com.au", "9news.com.au",
+    "theconversation.com", "nypost.com", "wsj.com", "wattsupwiththat.com"
+]
+CLAIMS = {
+    'gw_not_happening': ['sc_deny_extreme_weather', 'sc_cold_event_denial'],
+    'not_caused_by_human': ['sc_natural_variations', 'sc_past_climate_reference'],
+    'impacts_not_bad': ['sc_downplay_warming', 'sc_species_adapt'],
+    'solutions_wont_work': ['sc_policies_ineffective', 'sc_clean_energy_unreliable'],
+    'science_movement_unrel': ['sc_no_consensus', 'sc_hoax_conspiracy'],
+    'individual_action': ['sc_low_support_policies'],
+}
+VOCABULARY = (
+    "fire climate change smoke drought heat emergency season fuel burn "
+    "government policy report scientists warming hazard reduction lightning rain firefighters "
+    "evacuation community coast forest national park record temperature weather volunteers"
+).split()
+CORPUS_START = datetime(2019, 7, 1)
+CORPUS_DAYS = 366
+BODY_WORDS = 40
+SEARCH_TERM_PROBABILITY = {'bushfire': 0.2, 'arson': 0.05}  # Share of bodies containing each search token
+CLAIM_PROBABILITY = 0.2
+THINK_TANK_PROBABILITY = 0.3
+# Marker attributes keying the sparse indexes (see push_to_dynamodb.clean_item)
+SPARSE_MARKERS = ['hasThinkTank'] + [f'claim_{claim}' for claim in CLAIMS]
+
+class RequestCounter:
+    """
+    Counts DynamoDB requests and items read by every boto3 client in the process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.items_read = 0
+
+    def record(self, operation, response):
+        if operation in ('Scan', 'Query'):
+            items = response.get('ScannedCount', 0)
+        elif operation == 'BatchGetItem':
+            items = sum(len(table_items) for table_items in response.get('Responses', {}).values())
+        elif operation == 'GetItem':
+            items = 1 if 'Item' in response else 0
+        else:
+            items = 0
+        with self.lock:
+            self.requests += 1
+            self.items_read += items
+
+def install_counter(counter):
+    """
+    Wrap botocore's API call method so DynamoDB calls from any session are counted.
+    """
+    from botocore.client import BaseClient
+
+    original = BaseClient._make_api_call
+
+    def counted_api_call(client, operation, params):
+        response = original(client, operation, params)
+        if client.meta.service_model.service_name == 'dynamodb':
+            counter.record(operation, response)
+        return response
+
+    BaseClient._make_api_call = counted_api_call
+
+def generate_articles(size, seed=SEED):
+    """
+    Generate a repeatable synthetic corpus in the lazone item layout.
+
+    Args:
+        size (int): Number of articles
+        seed (int): Random seed
+
+    Yields:
+        dict: Article item (with dateBucket and the sparse index markers)
+    """
+    rng = random.Random(seed)
+    # Zipf-like source popularity: a few outlets publish most articles
+    weights = [1 / (rank + 1) for rank in range(len(SOURCES))]
+    for article_id in range(size):
+        date_time = CORPUS_START + timedelta(seconds=rng.randrange(CORPUS_DAYS * 86400))
+        broad_claims = {}
+        sub_claims = {}
+        for claim, subclaims in CLAIMS.items():
+            if rng.random() < CLAIM_PROBABILITY:
+                broad_claims[claim] = f"sentence supporting {claim}"
+                sub_claim = rng.choice(subclaims)
+                sub_claims[sub_claim] = f"sentence supporting {sub_claim}"
+        words = [rng.choice(VOCABULARY) for _ in range(BODY_WORDS)]
+        for token, probability in SEARCH_TERM_PROBABILITY.items():
+            if rng.random() < probability:
+                words.insert(rng.randrange(len(words) + 1), token)
+        article = {
+            'articleId': article_id,
+            'title': f"synthetic article {article_id}",
+            'dateTime': date_time.strftime(DATE_FORMAT),
+            'dateBucket': date_time.strftime("%Y-%m"),
+            'authors': f"author {rng.randrange(500)}",
+            'image': f"https://example.com/images/{article_id}.jpg",
+            'body': ' '.join(words),
+            'source': rng.choices(SOURCES, weights)[0],
+            'url': f"https://example.com/articles/{article_id}",
+            'uri': f"uri-{article_id:08x}",
+            'isDuplicate': False,
+            'broadClaims': broad_claims,
+            'subClaims': sub_claims,
+        }
+        if rng.random() < THINK_TANK_PROBABILITY:
+            article['think_tank_ref'] = "think tank sentence"
+            article['hasThinkTank'] = 'true'
+        if broad_claims:
+            article.update({f'claim_{claim}': 'true' for claim in broad_claims})
+        yield article
+
+def build_search_postings(article):
+    """
+    Build the lazone-postings items of an article for the benchmarked search tokens only.
+
+    Returns:
+        list: Posting items (same layout as push_to_dynamodb.build_postings)
+    """
+    positions = {}
+    for position, token in enumerate(article['body'].split()):
+        if token in SEARCH_TERM_PROBABILITY:
+            positions.setdefault(token, []).append(position)
+    return [
+        {
+            'token': token,
+            'articleId': article['articleId'],
+            'positions': token_positions,
+            'dateTime': article['dateTime'],
+            'source': article['source']
+        }
+        for token, token_positions in positions.items()
+    ]
+
+def create_tables(dynamodb):
+    """
+    (Re)create the lazone and lazone-postings tables as defined in lazone-template.yaml.
+    """
+    def index(name, hash_key, range_key):
+        return {
+            'IndexName': name,
+            'KeySchema': [{'AttributeName': hash_key, 'KeyType': 'HASH'}, {'AttributeName': range_key, 'KeyType': 'RANGE'}],
+            'Projection': {'ProjectionType': 'ALL'}
+        }
+
+    definitions = {
+        'lazone': {
+            'KeySchema': [{'AttributeName': 'articleId', 'KeyType': 'HASH'}],
+            'AttributeDefinitions': [
+                {'AttributeName': name, 'AttributeType': attribute_type}
+                for name, attribute_type in [('articleId', 'N'), ('source', 'S'), ('dateBucket', 'S'), ('dateTime', 'S')]
+            ] + [{'AttributeName': marker, 'AttributeType': 'S'} for marker in SPARSE_MARKERS],
+            'GlobalSecondaryIndexes': [
+                index('source-dateTime-index', 'source', 'dateTime'),
+                index('dateBucket-dateTime-index', 'dateBucket', 'dateTime')
+            ] + [index(f'{marker}-dateTime-index', marker, 'dateTime') for marker in SPARSE_MARKERS]
+        },
+        'lazone-postings': {
+            'KeySchema': [{'AttributeName': 'token', 'KeyType': 'HASH'}, {'AttributeName': 'articleId', 'KeyType': 'RANGE'}],
+            'AttributeDefinitions': [{'AttributeName': 'token', 'AttributeType': 'S'}, {'AttributeName': 'articleId', 'AttributeType': 'N'}]
+        }
+    }
+    existing = set(dynamodb.meta.client.list_tables()['TableNames'])
+    for name, definition in definitions.items():
+        if name in existing:
+            dynamodb.Table(name).delete()
+            dynamodb.meta.client.get_waiter('table_not_exists').wait(TableName=name)
+        dynamodb.create_table(TableName=name, BillingMode='PAY_PER_REQUEST', **definition)
+        dynamodb.meta.client.get_waiter('table_exists').wait(TableName=name)
+
+def seed_corpus(dynamodb, size):
+    """
+    Create fresh tables and load a synthetic corpus of the given size.
+    """
+    create_tables(dynamodb)
+    articles_table = dynamodb.Table('lazone')
+    postings_table = dynamodb.Table('lazone-postings')
+    with articles_table.batch_writer() as articles_batch, postings_table.batch_writer() as postings_batch:
+        for article in generate_articles(size):
+            articles_batch.put_item(Item=article)
+            for posting in build_search_postings(article):
+                postings_batch.put_item(Item=posting)
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+def run_case(lambda_function, counter, params, repeat):
+    """
+    Time one query case.
+
+    Returns:
+        dict: Latency percentiles (ms), DynamoDB requests, items read and returned, payload bytes
+    """
+    latencies = []
+    for _ in range(repeat):
+        lambda_function.result_cache.clear()
+        lambda_function.postings_cache.clear()
+        counter.reset()
+        event = {'queryStringParameters': dict(params), 'headers': {}}
+        start = time.perf_counter()
+        # The handler logs every request; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = lambda_function.lambda_handler(event, None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response['statusCode'] != 200:
+            raise RuntimeError(f"Case {params} failed: {response['body']}")
+
+    return {
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p90_ms': round(percentile(latencies, 0.9), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'requests': counter.requests,
+        'items_read': counter.items_read,
+        'items_returned': len(json.loads(response['body'])),
+        'bytes': len(response['body'].encode('utf-8')),
+        'plan': response['headers'].get('X-Query-Plan', '')
+    }
+
+def find_regressions(results, baseline, latency_tolerance, count_tolerance):
+    """
+    Compare results with a stored baseline.
+
+    Returns:
+        list: Descriptions of the regressions found
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if result['p50_ms'] > previous['p50_ms'] * (1 + latency_tolerance):
+            regressions.append(f"{key}: p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms")
+        for metric in ('items_read', 'items_returned', 'bytes'):
+            if result[metric] > previous[metric] * (1 + count_tolerance):
+                regressions.append(f"{key}: {metric} {previous[metric]} -> {result[metric]}")
+    return regressions
+
+def main():
+    """
+    Seed each corpus size, run the query cases and report (and check) the results.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark lambda_handler against a local DynamoDB')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated corpus sizes')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per case')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated cases to run')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local endpoint (default: moto in process)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=LATENCY_TOLERANCE)
+    parser.add_argument('--count-tolerance', type=float, default=COUNT_TOLERANCE)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = [case.strip() for case in args.cases.split(',')]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    # moto only intercepts clients created after it starts, so the stand-in is set up before the import
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-southeast-2')
+    os.environ.setdefault('SPARSE_INDEXES', 'on')  # create_tables creates every sparse index
+    if args.endpoint_url:
+        os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = args.endpoint_url
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+    else:
+        from moto import mock_aws
+        os.environ['AWS_ACCESS_KEY_ID'] = 'testing'
+        os.environ['AWS_SECRET_ACCESS_KEY'] = 'testing'
+        mock_aws().start()
+
+    import boto3
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import lambda_function
+
+    counter = RequestCounter()
+    install_counter(counter)
+    dynamodb = boto3.resource('dynamodb')
+
+    results = {}
+    print(f"{'case':<24}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'requests':>10}{'read':>9}{'returned':>10}{'bytes':>10}  plan")
+    for size in sizes:
+        start = time.time()
+        seed_corpus(dynamodb, size)
+        lambda_function.table_size['item_count'] = None
+        print(f"-- {size} articles (seeded in {time.time() - start:.1f}s)")
+        for case in cases:
+            result = run_case(lambda_function, counter, CASES[case], args.repeat)
+            results[f"{size}:{case}"] = result
+            print(f"{case:<24}{result['p50_ms']:>9.1f}{result['p90_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                  f"{result['requests']:>10}{result['items_read']:>9}{result['items_returned']:>10}{result['bytes']:>10}  {result['plan']}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=4, sort_keys=True)
+        print(f"Saved baseline to '{args.baseline}'")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(results, baseline, args.latency_tolerance, args.count_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against '{args.baseline}'")
+
+if __name__ == "__main__":
+    main()
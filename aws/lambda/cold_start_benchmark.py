@@ -0,0 +1,192 @@
+"""
+LaZone API Cold Start Benchmark - lambda_function import and first invocation times
+
+Measures what a cold Lambda container pays before it can answer a request. Every run starts
+a fresh Python process (as a new container would) and records:
+- import_ms - importing lambda_function (and whatever it imports at module level), i.e. the Init Duration
+  Lambda reports, measured in a process that has imported nothing else
+- first_ms - the container's first invocation, which imports boto3 and creates the DynamoDB client(s)
+- warm_ms - a second invocation of the same query in the same process (result and postings caches cleared)
+- cold_ms - import_ms + first_ms, the latency a request landing on a cold container adds
+
+The query is a case from benchmark.py (default: think_tank, run as a parallel scan with
+--segments segments so per-thread client set up is included) against a small synthetic
+corpus in moto, or DynamoDB Local with --endpoint-url.
+
+--compare REF also measures lambda_function.py as of a git revision (e.g. the commit before
+the cold start changes), interleaving the runs of both versions so machine load affects
+them alike, and prints the two side by side. Medians over --runs are stable to a few
+milliseconds on an idle machine.
+
+Usage:
+    python3 cold_start_benchmark.py [--runs 10] [--compare HEAD~1] [--case think_tank] [--segments 8]
+                                    [--size 1000] [--endpoint-url http://localhost:8000]
+
+Prerequisites:
+- boto3 library installed
+- moto library installed (unless --endpoint-url is used)
+- git (for --compare)
+
+Maintainers:
+    Primary: Oisin Aeonn (s3952320@student.rmit.edu.au)
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+LAMBDA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RUNS = 10
+DEFAULT_SIZE = 1000
+DEFAULT_CASE = 'think_tank'
+DEFAULT_SEGMENTS = 8
+METRICS = ['import_ms', 'first_ms', 'warm_ms', 'cold_ms']
+
+def set_up_environment(endpoint_url):
+    """
+    Point boto3 at the local stand-in with dummy credentials.
+    """
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-southeast-2')
+    os.environ.setdefault('SPARSE_INDEXES', 'on')  # benchmark.create_tables creates every sparse index
+    if endpoint_url:
+        os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = endpoint_url
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+    else:
+        os.environ['AWS_ACCESS_KEY_ID'] = 'testing'
+        os.environ['AWS_SECRET_ACCESS_KEY'] = 'testing'
+
+def measure_import(module_dir):
+    """
+    Child process: time importing lambda_function from module_dir.
+    """
+    sys.path.insert(0, module_dir)
+    start = time.perf_counter()
+    importlib.import_module('lambda_function')
+    return {'import_ms': (time.perf_counter() - start) * 1000}
+
+def measure_invocations(module_dir, endpoint_url, size, case, segments):
+    """
+    Child process: seed the stand-in (moto only), then time the first and a warm invocation.
+    """
+    import contextlib
+    import io
+
+    import benchmark
+
+    if not endpoint_url:
+        # moto only intercepts clients created after it starts, so it starts before the import
+        import boto3
+        from moto import mock_aws
+        mock_aws().start()
+        benchmark.seed_corpus(boto3.resource('dynamodb'), size)
+
+    sys.path.insert(0, module_dir)
+    import lambda_function
+    lambda_function.ITEMS_PER_SEGMENT = max(1, -(-size // segments))
+
+    event = {'queryStringParameters': dict(benchmark.CASES[case]), 'headers': {}}
+    timings = {}
+    for name in ('first_ms', 'warm_ms'):
+        # Written against the cache attributes every --compare revision has
+        lambda_function.result_cache.entries.clear()
+        lambda_function.result_cache.total_bytes = 0
+        if hasattr(lambda_function, 'postings_cache'):
+            lambda_function.postings_cache.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = lambda_function.lambda_handler(event, None)
+        timings[name] = (time.perf_counter() - start) * 1000
+        if response['statusCode'] != 200:
+            raise RuntimeError(f"Case {case} failed: {response['body']}")
+    timings['plan'] = response['headers'].get('X-Query-Plan', '')
+    return timings
+
+def run_child(args, mode, module_dir):
+    """
+    Run one measurement in a fresh interpreter and return its result.
+    """
+    command = [
+        sys.executable, os.path.abspath(__file__), '--child', mode, '--module-dir', module_dir,
+        '--size', str(args.size), '--case', args.case, '--segments', str(args.segments)
+    ]
+    if args.endpoint_url:
+        command += ['--endpoint-url', args.endpoint_url]
+    output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=LAMBDA_DIR).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def export_revision(ref, directory):
+    """
+    Write lambda_function.py as of a git revision into directory.
+    """
+    source = subprocess.run(
+        ['git', 'show', f'{ref}:./lambda_function.py'], check=True, capture_output=True, text=True, cwd=LAMBDA_DIR
+    ).stdout
+    with open(os.path.join(directory, 'lambda_function.py'), 'w', encoding='utf-8') as module_file:
+        module_file.write(source)
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+def main():
+    """
+    Measure cold starts of the working tree's lambda_function (and optionally a git revision).
+    """
+    parser = argparse.ArgumentParser(description='Measure lambda_function cold start times')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Cold starts per version')
+    parser.add_argument('--compare', help='Also measure lambda_function.py at this git revision')
+    parser.add_argument('--case', default=DEFAULT_CASE, help='benchmark.py query case for the invocations')
+    parser.add_argument('--segments', type=int, default=DEFAULT_SEGMENTS, help='Parallel scan segments for scan cases')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help='Synthetic corpus size')
+    parser.add_argument('--endpoint-url', help='DynamoDB Local endpoint (default: moto in each process)')
+    parser.add_argument('--child', choices=['import', 'invoke'], help=argparse.SUPPRESS)
+    parser.add_argument('--module-dir', default=LAMBDA_DIR, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    set_up_environment(args.endpoint_url)
+    if args.child == 'import':
+        print(json.dumps(measure_import(args.module_dir)))
+        return
+    if args.child == 'invoke':
+        print(json.dumps(measure_invocations(args.module_dir, args.endpoint_url, args.size, args.case, args.segments)))
+        return
+
+    if args.endpoint_url:
+        # DynamoDB Local keeps its tables, so the corpus is seeded once for all runs
+        import boto3
+        import benchmark
+        benchmark.seed_corpus(boto3.resource('dynamodb'), args.size)
+
+    with tempfile.TemporaryDirectory() as compare_dir:
+        versions = {'working tree': LAMBDA_DIR}
+        if args.compare:
+            export_revision(args.compare, compare_dir)
+            versions = {args.compare: compare_dir, **versions}
+
+        results = {version: {metric: [] for metric in METRICS} for version in versions}
+        plans = {}
+        for run in range(args.runs):
+            for version, module_dir in versions.items():
+                imported = run_child(args, 'import', module_dir)
+                invoked = run_child(args, 'invoke', module_dir)
+                results[version]['import_ms'].append(imported['import_ms'])
+                results[version]['first_ms'].append(invoked['first_ms'])
+                results[version]['warm_ms'].append(invoked['warm_ms'])
+                results[version]['cold_ms'].append(imported['import_ms'] + invoked['first_ms'])
+                plans[version] = invoked['plan']
+            print(f"Run {run + 1}/{args.runs} done", file=sys.stderr)
+
+    print(f"Median of {args.runs} cold starts, case {args.case} ({args.size} articles)")
+    print(f"{'version':<16}" + ''.join(f"{metric:>12}" for metric in METRICS) + '  plan')
+    for version in versions:
+        print(f"{version:<16}" + ''.join(f"{median(results[version][metric]):>12.1f}" for metric in METRICS) + f"  {plans[version]}")
+
+if __name__ == "__main__":
+    main()
@@ -29,97 +29,775 @@ v1.17.0 - Enhanced DynamoDB error handling
 v1.18.0 - Added filter expression debugging
 v1.19.0 - Optimized scan operations
 v1.20.0 - Added comprehensive logging system
+v1.21.0 - Added query planner using source and date bucket secondary indexes
+v1.22.0 - Added inverted index search with AND/OR and phrase matching
+v1.23.0 - Added warm container result cache with TTL and LRU eviction
+v1.24.0 - Added signed cursor pagination and configurable page limit
+v1.25.0 - Added parallel segmented scan for filters that no index can serve
+v1.26.0 - Added projection expressions (fields parameter) and lightweight graph mode
+v1.27.0 - Added ids parameter for fetching articles by articleId with BatchGetItem
+v1.28.0 - Added gzip/brotli response compression, compact encoding and NDJSON output
+v1.29.0 - Added near-duplicate cluster attributes (clusterId, isCanonical) to fields and graph mode
+v1.30.0 - Added precomputed similarity neighbours (neighbors) to fields and graph mode
+v1.31.0 - Added aggregate endpoint answering summary counts from the lazone-aggregates rollups
+v1.32.0 - Added claims endpoint serving claim co-occurrence and timelines from monthly rollups
+v1.33.0 - Replaced request logging with per-phase timing spans and DynamoDB page metrics (embedded metric format)
+v1.34.0 - Cold start: lazily created low-level DynamoDB client with tuned connection settings, import time metric
+v1.35.0 - Added sparse claim and think tank indexes to the query planner, and claimsMatch=all;
+          fixed broadClaims filters of three or more claims matching only the first two
+v1.35.1 - Query planner only uses the source and date bucket indexes once they are active
+v1.35.2 - Sparse index plans switched off unless SPARSE_INDEXES=on
+v1.35.3 - Stopwords are not searched, posting lists cached per container across pages
+v1.35.4 - Responses without fields only return ARTICLE_FIELDS (no internal index or upload attributes)
+v1.35.5 - The built-in cursor secret is only used outside Lambda; without CURSOR_SECRET cursors fail closed
+v1.35.6 - boto3 imported on first use instead of at module load
 """
 
-import boto3
+import time
+
+MODULE_LOAD_STARTED = time.perf_counter()  # Import duration is reported by the container's first invocation
+
+import base64
+import functools
+import gzip
+import hashlib
+import heapq
+import hmac
+import itertools
 import json
+import os
+import random
+import re
+import threading
 import traceback
-from boto3.dynamodb.conditions import Attr, And, Or
+# boto3 (and botocore's session and config machinery) is most of the import time, so it is
+# imported by the functions that build conditions or the client, on a container's first request
 from botocore.exceptions import ClientError
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
-# Initialize DynamoDB resource and table
-dynamodb = boto3.resource('dynamodb')
+try:
+    import brotli  # Optional: only used when packaged with the function
+except ImportError:
+    brotli = None
+
+# DynamoDB tables are read through one low-level client (see get_client), created on first use
 table_name = 'lazone'
-table = dynamodb.Table(table_name)
-MAX_ITEMS = 128  # Maximum number of items to return in a single request
+MAX_ITEMS = 128  # Default number of items to return in a single request
+MAX_LIMIT = 500  # Upper bound for the limit query parameter
+
+# Key used to sign pagination cursors so clients cannot forge table positions. The local
+# fallback is published in this file, so it is only used outside Lambda; a deployed function
+# without CURSOR_SECRET refuses to sign or accept cursors (see get_cursor_secret)
+LOCAL_CURSOR_SECRET = 'lazone-local-cursor-secret'
+CURSOR_SECRET = os.environ.get('CURSOR_SECRET') or (None if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else LOCAL_CURSOR_SECRET)
+if CURSOR_SECRET is None:
+    print("WARNING: CURSOR_SECRET is not set; requests that need a pagination cursor will fail")
+
+# Secondary indexes used by the query planner (see lazone-template.yaml)
+SOURCE_INDEX = 'source-dateTime-index'
+DATE_BUCKET_INDEX = 'dateBucket-dateTime-index'
+MAX_DATE_BUCKETS = 60  # Wider date ranges fall back to a Scan
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Sparse indexes keyed by marker attributes that push_to_dynamodb.py writes only on articles
+# with a broad claim (claim_<key>) or a think tank reference (hasThinkTank)
+CLAIM_MARKER_PREFIX = 'claim_'
+THINK_TANK_MARKER = 'hasThinkTank'
+MARKER_VALUE = 'true'
+SPARSE_INDEX_SUFFIX = '-dateTime-index'
+# Off until the stack has created every sparse index (set by lazone-template.yaml)
+SPARSE_INDEXES_ENABLED = os.environ.get('SPARSE_INDEXES', 'off') == 'on'
+CLAIMS_MATCH_OPTIONS = ['any', 'all']
+
+# Attributes that can be requested with the fields parameter
+ARTICLE_FIELDS = [
+    'articleId', 'title', 'dateTime', 'authors', 'image', 'body', 'source', 'url',
+    'uri', 'isDuplicate', 'clusterId', 'isCanonical', 'neighbors', 'broadClaims', 'subClaims', 'think_tank_ref'
+]
+# Attributes the 3D particle view needs to lay out nodes (mode=graph)
+GRAPH_FIELDS = [
+    'articleId', 'uri', 'source', 'dateTime', 'isDuplicate', 'clusterId', 'isCanonical', 'neighbors',
+    'broadClaims', 'subClaims', 'think_tank_ref'
+]
+CLAIM_FIELDS = ['broadClaims', 'subClaims']
+
+# Parallel scan sizing: one segment per ITEMS_PER_SEGMENT items, up to MAX_SCAN_SEGMENTS
+ITEMS_PER_SEGMENT = 10000
+MAX_SCAN_SEGMENTS = 16
+TABLE_SIZE_REFRESH_SECONDS = 3600  # DynamoDB only refreshes ItemCount every ~6 hours
+
+# Worker threads outlive a single invocation so warm containers reuse their connections
+scan_executor = ThreadPoolExecutor(max_workers=MAX_SCAN_SEGMENTS)
+table_size = {'item_count': None, 'indexes': {}, 'checked_at': 0}
+
+# Client settings: keep-alive connections, a pool large enough for every scan segment plus
+# the requests of the invocation's own thread, timeouts well inside the 20 second function
+# timeout, and standard-mode retries (with backoff) for throttling and transient errors
+DYNAMODB_CONFIG = dict(
+    connect_timeout=2,
+    read_timeout=5,
+    retries={'mode': 'standard', 'max_attempts': 4},
+    max_pool_connections=MAX_SCAN_SEGMENTS + 4,
+    tcp_keepalive=True
+)
+# Shared by every invocation and worker thread of a container (low-level clients are thread safe)
+dynamodb_client = {'client': None, 'tables': {}, 'lock': threading.Lock()}
+
+# Inverted index of article body tokens, built by data/database/push_to_dynamodb.py
+postings_table_name = 'lazone-postings'
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Words in nearly every article are not indexed (must match STOPWORDS in push_to_dynamodb.py)
+STOPWORDS = frozenset([
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+    'can', 'could', 'did', 'do', 'for', 'from', 'had', 'has', 'have', 'he', 'her', 'his', 'i', 'if',
+    'in', 'into', 'is', 'it', 'its', 'more', 'not', 'of', 'on', 'or', 'our', 'said', 'she', 'so',
+    'than', 'that', 'the', 'their', 'them', 'there', 'these', 'they', 'this', 'those', 'to', 'up',
+    'was', 'we', 'were', 'what', 'when', 'which', 'who', 'will', 'with', 'would', 'you'
+])
+SEARCH_TERM_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+BATCH_GET_SIZE = 100  # DynamoDB BatchGetItem key limit
+BATCH_GET_MAX_RETRIES = 8  # Retries for UnprocessedKeys before giving up
+BATCH_GET_BACKOFF_SECONDS = 0.05  # Base delay, doubled on each retry (with full jitter)
+BATCH_GET_MAX_BACKOFF_SECONDS = 2
+# Posting lists read by a warm container are reused by later pages of the same search
+POSTINGS_CACHE_MAX_ENTRIES = 1024
+POSTINGS_CACHE_MAX_BYTES = 16 * 1024 * 1024
+POSTING_BYTES = 400  # Approximate in-memory size of a posting, plus POSITION_BYTES per position
+POSITION_BYTES = 80
+
+# Dashboard rollups maintained by aggregate_stream.py (see its docstring for the row layout)
+aggregates_table_name = os.environ.get('AGGREGATES_TABLE', 'lazone-aggregates')
+AGGREGATE_ALL_BUCKET = 'ALL'
+AGGREGATE_GROUPS = ['day', 'month', 'source']
+MAX_AGGREGATE_DAY_BUCKETS = 24  # Months of day rows read for groupBy=day
+# Claim co-occurrence rollups written by data/database/claim_matrix.py (one row per source and month)
+CLAIM_ROLLUP_PREFIX = 'COOCCURRENCE#'
+CLAIM_ROLLUP_ALL_SOURCES = '*'
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Brotli's default (11) is too slow for per-request compression
+
+# Result cache limits, per warm Lambda container
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTL_SECONDS = 300
+
+# Timing spans and DynamoDB page metrics are logged as CloudWatch embedded metric format lines
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'LaZone')
+# Query parameters that make up the FilterType metric dimension ('date' covers startDate and endDate)
+FILTER_TYPE_PARAMETERS = [
+    ('ids', 'ids'), ('startDate', 'date'), ('endDate', 'date'), ('search', 'search'), ('sources', 'sources'),
+    ('publisher', 'publisher'), ('thinkTankRef', 'thinkTankRef'), ('broadClaims', 'broadClaims')
+]
 
 class DecimalEncoder(json.JSONEncoder):
     """
     Custom JSON encoder to handle Decimal types returned by DynamoDB
-    Added in v1.10.0 to properly handle numeric data types
+    Added in v1.10.0 to properly handle numeric data types, integers kept as integers in v1.28.0
     """
     def default(self, obj):
         if isinstance(obj, Decimal):
-            return float(obj)
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def create_response(status_code, body):
+# Shared compact encoder. Decimals are rare in articles (articleId), so the C encoder's
+# default hook is cheaper than converting every item to plain Python types first.
+json_encoder = DecimalEncoder(separators=(',', ':'))
+
+class InvalidParameterError(Exception):
     """
-    Creates standardized API response with CORS headers
-    Added in v1.0.0, enhanced CORS support in v1.14.0
+    Raised for query parameters that fail validation (answered with HTTP 400)
+    Added in v1.24.0
+    """
+
+class ResultCache:
+    """
+    In-process cache of serialized responses, shared by invocations of a warm container
+    Added in v1.23.0
+    
+    Entries expire after ttl_seconds and the least recently used entries are evicted
+    once either max_entries or max_bytes is exceeded.
+    """
+    def __init__(self, max_entries, max_bytes, ttl_seconds):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (expires_at, value, size)
+        self.total_bytes = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, size = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.total_bytes -= size
+
+result_cache = ResultCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+postings_cache = ResultCache(POSTINGS_CACHE_MAX_ENTRIES, POSTINGS_CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+
+class ClientTable:
+    """
+    Table-like wrapper around the shared low-level client, with the read operations used here
+    Added in v1.34.0
+    
+    Replaces boto3's Table resource, whose resource model loading and per-thread sessions
+    made cold starts and the first parallel scan of a container slow. Requests and
+    responses use the same Key/Attr conditions and Python values as the resource layer.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def query(self, **kwargs):
+        return get_client().query(TableName=self.name, **kwargs)
+
+    def scan(self, **kwargs):
+        return get_client().scan(TableName=self.name, **kwargs)
+
+    def describe(self):
+        return get_client().describe_table(TableName=self.name)['Table']
+
+# Spans of the invocation in progress (a container handles one invocation at a time;
+# scan worker threads add their pages under the lock)
+request_trace = {'started': 0, 'filter_type': None, 'phases': [], 'pages': [], 'returned': None, 'lock': threading.Lock()}
+
+# Whether the next invocation is the container's first, and how long importing this module took
+container_state = {'cold': True, 'import_duration': (time.perf_counter() - MODULE_LOAD_STARTED) * 1000}
+
+def create_raw_response(status_code, body, headers=None, is_base64_encoded=False):
+    """
+    Creates standardized API response with CORS headers around an already encoded body
+    Added in v1.23.0 so cached bodies are not re-serialized, binary bodies in v1.28.0
     
     Args:
         status_code (int): HTTP status code
-        body (dict): Response body to be JSON encoded
+        body (str): Encoded response body (base64 text for compressed bodies)
+        headers (dict): Optional additional response headers (e.g. X-Query-Plan)
+        is_base64_encoded (bool): Whether API Gateway must base64-decode the body
     
     Returns:
         dict: Formatted API Gateway response
     """
+    response_headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST',
+        'Access-Control-Expose-Headers': 'X-Query-Plan,X-Cache,X-Next-Cursor',
+        'Vary': 'Accept-Encoding'
+    }
+    if headers:
+        response_headers.update(headers)
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-            'Access-Control-Allow-Methods': 'OPTIONS,GET,POST'
-        },
-        'body': json.dumps(body, cls=DecimalEncoder)
+        'headers': response_headers,
+        'body': body,
+        'isBase64Encoded': is_base64_encoded
     }
 
-def scan_all():
+def create_response(status_code, body, headers=None):
+    """
+    Creates standardized API response with CORS headers
+    Added in v1.0.0, enhanced CORS support in v1.14.0, extra headers in v1.21.0
+    
+    Args:
+        status_code (int): HTTP status code
+        body (dict): Response body to be JSON encoded
+        headers (dict): Optional additional response headers (e.g. X-Query-Plan)
+    
+    Returns:
+        dict: Formatted API Gateway response
+    """
+    return create_raw_response(status_code, json_encoder.encode(body), headers)
+
+def get_accepted_encoding(event_headers):
+    """
+    Picks a response compression from the request's Accept-Encoding header
+    Added in v1.28.0
+    
+    Args:
+        event_headers (dict): Request headers from the API Gateway event (any case)
+    
+    Returns:
+        str: 'br' (if the brotli module is available), 'gzip', or None for no compression
+    """
+    accept_encoding = next((value for name, value in (event_headers or {}).items() if name.lower() == 'accept-encoding'), '')
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+def encode_items(items, output_format):
+    """
+    Serializes result items as a JSON array or newline-delimited JSON
+    Added in v1.28.0
+    
+    Args:
+        items (list): Items to return
+        output_format (str): 'json' or 'ndjson'
+    
+    Returns:
+        str: Encoded body
+    """
+    if output_format == 'ndjson':
+        return ''.join(json_encoder.encode(item) + '\n' for item in items)
+    return json_encoder.encode(items)
+
+def compress_body(body, encoding):
+    """
+    Compresses a response body for API Gateway, which expects binary bodies base64 encoded
+    Added in v1.28.0
+    
+    Args:
+        body (str): Encoded response body
+        encoding (str): 'br', 'gzip' or None
+    
+    Returns:
+        tuple: (body, content encoding or None, whether the body is base64 encoded)
+    """
+    data = body.encode('utf-8')
+    if encoding is None or len(data) < MIN_COMPRESS_BYTES:
+        return body, None, False
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return base64.b64encode(compressed).decode('ascii'), encoding, True
+
+def get_output_format(output_format):
+    """
+    Validates the format query parameter
+    Added in v1.28.0
+    
+    Args:
+        output_format (str): 'json', 'ndjson' or None
+    
+    Returns:
+        str: Output format, 'json' by default
+    """
+    if output_format is None:
+        return 'json'
+    if output_format not in ('json', 'ndjson'):
+        raise InvalidParameterError("format must be 'json' or 'ndjson'")
+    return output_format
+
+def get_filter_type(event):
+    """
+    Classifies a request by the filters it uses, for the FilterType metric dimension
+    Added in v1.33.0
+    
+    Args:
+        event (dict): API Gateway event
+    
+    Returns:
+        str: e.g. 'date+sources', 'search', 'all' (no filters), 'aggregate' or 'claims'
+    """
+    path = event.get('resource') or event.get('path') or ''
+    for endpoint in ('aggregate', 'claims'):
+        if path.endswith(f'/{endpoint}'):
+            return endpoint
+    query_params = event.get('queryStringParameters') or {}
+    filters = [name for parameter, name in FILTER_TYPE_PARAMETERS if query_params.get(parameter)]
+    return '+'.join(dict.fromkeys(filters)) or 'all'
+
+def start_trace(filter_type):
+    """
+    Resets the spans recorded for the invocation
+    Added in v1.33.0
+    
+    Args:
+        filter_type (str): Value returned by get_filter_type
+    """
+    request_trace['started'] = time.perf_counter()
+    request_trace['filter_type'] = filter_type
+    request_trace['phases'] = []
+    request_trace['pages'] = []
+    request_trace['returned'] = None
+
+@contextmanager
+def span(phase):
+    """
+    Times one phase of the invocation (parse, plan, query, serialise, or client on a cold start)
+    Added in v1.33.0
+    
+    Args:
+        phase (str): Phase name, used as the Phase metric dimension
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_trace['phases'].append((phase, (time.perf_counter() - started) * 1000))
+
+def read_page(read, **kwargs):
+    """
+    Makes one DynamoDB read request and records it as a page span
+    Added in v1.33.0
+    
+    Consumed capacity is requested for every page, so scan efficiency (items returned
+    against items read) and read cost are visible per filter type.
+    
+    Args:
+        read: Bound read method, e.g. get_table().query, get_table().scan or get_client().batch_get_item
+        **kwargs: Request parameters
+    
+    Returns:
+        dict: DynamoDB response
+    """
+    started = time.perf_counter()
+    response = read(ReturnConsumedCapacity='TOTAL', **kwargs)
+    duration = (time.perf_counter() - started) * 1000
+
+    # Query and Scan return one ConsumedCapacity, BatchGetItem a list (one per table)
+    capacity = response.get('ConsumedCapacity') or []
+    if isinstance(capacity, dict):
+        capacity = [capacity]
+    if 'Count' in response:
+        count = response['Count']
+    else:
+        count = sum(len(items) for items in response.get('Responses', {}).values())
+    page = {
+        'Operation': read.__name__,
+        'Table': ','.join(sorted({entry.get('TableName', '') for entry in capacity})),
+        'Duration': duration,
+        'ConsumedCapacity': float(sum(entry.get('CapacityUnits', 0) for entry in capacity)),
+        'ScannedCount': response.get('ScannedCount', count),
+        'Count': count
+    }
+    with request_trace['lock']:
+        request_trace['pages'].append(page)
+    return response
+
+def emit_metrics(response, context=None):
+    """
+    Logs the invocation's spans as CloudWatch embedded metric format lines
+    Added in v1.33.0
+    
+    One line per phase (Duration by FilterType and Phase), one per DynamoDB page
+    (Duration, ConsumedCapacity, ScannedCount and Count by FilterType and Operation) and
+    a summary line (Latency, totals and ScanEfficiency by FilterType), so latency
+    percentiles and scan efficiency per filter type can be graphed without parsing logs.
+    The summary also has ColdStart, and on a container's first invocation the module's
+    ImportDuration (v1.34.0).
+    
+    Args:
+        response (dict): API Gateway response returned to the client
+        context: Lambda context, used for the request id
+    """
+    timestamp = int(time.time() * 1000)
+    filter_type = request_trace['filter_type']
+
+    def emit(dimensions, metrics, properties):
+        record = {
+            '_aws': {
+                'Timestamp': timestamp,
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['FilterType'] + dimensions],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+                }]
+            },
+            'FilterType': filter_type
+        }
+        record.update({name: value for name, (value, _) in metrics.items()})
+        record.update(properties)
+        print(json.dumps(record, separators=(',', ':')))
+
+    for phase, duration in request_trace['phases']:
+        emit(['Phase'], {'Duration': (round(duration, 3), 'Milliseconds')}, {'Phase': phase})
+    pages = request_trace['pages']
+    for number, page in enumerate(pages):
+        emit(['Operation'], {
+            'Duration': (round(page['Duration'], 3), 'Milliseconds'),
+            'ConsumedCapacity': (page['ConsumedCapacity'], 'Count'),
+            'ScannedCount': (page['ScannedCount'], 'Count'),
+            'Count': (page['Count'], 'Count')
+        }, {'Operation': page['Operation'], 'Table': page['Table'], 'Page': number})
+
+    headers = response.get('headers', {})
+    scanned = sum(page['ScannedCount'] for page in pages)
+    metrics = {
+        'Latency': (round((time.perf_counter() - request_trace['started']) * 1000, 3), 'Milliseconds'),
+        'Pages': (len(pages), 'Count'),
+        'ConsumedCapacity': (sum(page['ConsumedCapacity'] for page in pages), 'Count'),
+        'ScannedCount': (scanned, 'Count')
+    }
+    if scanned:
+        metrics['ScanEfficiency'] = (round(100 * sum(page['Count'] for page in pages) / scanned, 3), 'Percent')
+    if request_trace['returned'] is not None:
+        metrics['ReturnedCount'] = (request_trace['returned'], 'Count')
+    metrics['ColdStart'] = (1 if container_state['cold'] else 0, 'Count')
+    if container_state['cold']:
+        metrics['ImportDuration'] = (round(container_state['import_duration'], 3), 'Milliseconds')
+        container_state['cold'] = False
+    emit([], metrics, {
+        'StatusCode': response.get('statusCode'),
+        'QueryPlan': headers.get('X-Query-Plan'),
+        'Cache': headers.get('X-Cache'),
+        'RequestId': getattr(context, 'aws_request_id', None)
+    })
+
+def scan_all(limit=MAX_ITEMS, start_key=None, projection=None):
     """
     Retrieves all items from DynamoDB with pagination support
-    Added in v1.0.0, enhanced with pagination in v1.11.0
+    Added in v1.0.0, enhanced with pagination in v1.11.0, resumable in v1.24.0
+    
+    Args:
+        limit (int): Maximum number of items to return
+        start_key (dict): Optional ExclusiveStartKey to resume from
+        projection (list): Optional attribute names to read
+    
+    Returns:
+        tuple: (items, LastEvaluatedKey or None when the table is exhausted)
+    """
+    return scan_specific(None, limit, start_key, projection)
+
+def scan_specific(filter_expression, limit=MAX_ITEMS, start_key=None, projection=None):
+    """
+    Performs filtered scan of DynamoDB with pagination
+    Added in v1.3.0, enhanced with multiple filters in v1.13.0, resumable in v1.24.0,
+    result logging replaced by page metrics in v1.33.0
+    
+    Each page is limited to the number of items still needed, so the returned
+    LastEvaluatedKey resumes exactly after the last item returned.
+    
+    Args:
+        filter_expression: DynamoDB filter expression, or None for an unfiltered scan
+        limit (int): Maximum number of items to return
+        start_key (dict): Optional ExclusiveStartKey to resume from
+        projection (list): Optional attribute names to read
     
     Returns:
-        list: List of items from DynamoDB, limited to MAX_ITEMS
+        tuple: (items, LastEvaluatedKey or None when the table is exhausted)
     """
     items = []
-    response = table.scan(Limit=MAX_ITEMS)
+    scan_kwargs = {'Limit': limit, **get_projection_kwargs(projection)}
+    if filter_expression is not None:
+        scan_kwargs['FilterExpression'] = filter_expression
+    if start_key:
+        scan_kwargs['ExclusiveStartKey'] = start_key
+    response = read_page(get_table().scan, **scan_kwargs)
     items.extend(response.get('Items', []))
-    while 'LastEvaluatedKey' in response and len(items) < MAX_ITEMS:
-        response = table.scan(
-            ExclusiveStartKey=response['LastEvaluatedKey'],
-            Limit=MAX_ITEMS - len(items)
-        )
+    while 'LastEvaluatedKey' in response and len(items) < limit:
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        scan_kwargs['Limit'] = limit - len(items)
+        response = read_page(get_table().scan, **scan_kwargs)
         items.extend(response.get('Items', []))
-    return items[:MAX_ITEMS]
+    return items[:limit], response.get('LastEvaluatedKey')
 
-def scan_specific(filter_expression):
+def get_projection_kwargs(projection):
     """
-    Performs filtered scan of DynamoDB with pagination
-    Added in v1.3.0, enhanced with multiple filters in v1.13.0
+    Builds ProjectionExpression parameters for a read request
+    Added in v1.26.0
+    
+    A fresh ExpressionAttributeNames dict is returned on every call because boto3 adds
+    the filter expression's placeholders to it in place.
+    
+    Args:
+        projection (list): Attribute names to read, or None for whole items
+    
+    Returns:
+        dict: ProjectionExpression and ExpressionAttributeNames, or empty if no projection
+    """
+    if not projection:
+        return {}
+    names = {f'#f{index}': attribute for index, attribute in enumerate(projection)}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+def get_client():
+    """
+    Returns the container's low-level DynamoDB client, creating it on first use
+    Added in v1.34.0
+    
+    The client is created on the first request rather than at import, and kept for
+    every later invocation of the container. It is given the request and response
+    transformations boto3 registers for Table resources, so Key/Attr conditions and
+    plain Python values work as they did with the resource layer.
+    
+    Returns:
+        DynamoDB.Client: Client configured with the DYNAMODB_CONFIG settings
+    """
+    if dynamodb_client['client'] is None:
+        with dynamodb_client['lock'], span('client'):
+            if dynamodb_client['client'] is None:
+                import boto3
+                from boto3.dynamodb.transform import TransformationInjector, copy_dynamodb_params
+                from botocore.config import Config
+                client = boto3.session.Session().client('dynamodb', config=Config(**DYNAMODB_CONFIG))
+                injector = TransformationInjector()
+                events = client.meta.events
+                events.register('provide-client-params.dynamodb', copy_dynamodb_params, unique_id='dynamodb-create-params-copy')
+                # The injector's condition builder numbers placeholders in shared state, so
+                # parallel scan threads each build their expressions with a fresh one
+                events.register(
+                    'before-parameter-build.dynamodb',
+                    lambda params, model, **kwargs: TransformationInjector().inject_condition_expressions(params, model, **kwargs),
+                    unique_id='dynamodb-condition-expression'
+                )
+                events.register('before-parameter-build.dynamodb', injector.inject_attribute_value_input, unique_id='dynamodb-attr-value-input')
+                events.register('after-call.dynamodb', injector.inject_attribute_value_output, unique_id='dynamodb-attr-value-output')
+                dynamodb_client['client'] = client
+    return dynamodb_client['client']
+
+def get_table(name=table_name):
+    """
+    Returns a table on the shared client
+    Added in v1.34.0 (replaces the per-thread resources of get_thread_table)
+    
+    Args:
+        name (str): Table name, the lazone table by default
+    
+    Returns:
+        ClientTable: Table wrapper, safe to use from any thread
+    """
+    if name not in dynamodb_client['tables']:
+        dynamodb_client['tables'][name] = ClientTable(name)
+    return dynamodb_client['tables'][name]
+
+def get_table_size():
+    """
+    Returns the approximate item counts of the lazone table and its active indexes
+    Added in v1.35.0 (moved out of get_scan_segments), refreshed every TABLE_SIZE_REFRESH_SECONDS
+    
+    Returns:
+        dict: {'item_count': n, 'indexes': {index name: item count}, 'checked_at': t}
+    """
+    if table_size['item_count'] is None or time.monotonic() - table_size['checked_at'] > TABLE_SIZE_REFRESH_SECONDS:
+        description = get_table().describe()
+        table_size['item_count'] = description['ItemCount']
+        # Indexes still being created (backfilling) cannot serve queries yet
+        table_size['indexes'] = {
+            index['IndexName']: index.get('ItemCount', 0)
+            for index in description.get('GlobalSecondaryIndexes', [])
+            if index.get('IndexStatus') == 'ACTIVE'
+        }
+        table_size['checked_at'] = time.monotonic()
+    return table_size
+
+def get_scan_segments():
+    """
+    Chooses the number of parallel scan segments from the table's approximate item count
+    Added in v1.25.0
+    
+    Returns:
+        int: Segment count between 1 and MAX_SCAN_SEGMENTS
+    """
+    segments = -(-get_table_size()['item_count'] // ITEMS_PER_SEGMENT)
+    return max(1, min(MAX_SCAN_SEGMENTS, segments))
+
+def scan_segment(filter_expression, segment, total_segments, start_key, page_size, progress, projection=None):
+    """
+    Scans one segment of a parallel scan until it is exhausted or enough items are found
+    Added in v1.25.0
     
     Args:
         filter_expression: DynamoDB filter expression
+        segment (int): Segment number
+        total_segments (int): Total number of segments
+        start_key (dict): Optional ExclusiveStartKey to resume the segment from
+        page_size (int): Items evaluated per Scan call
+        progress (dict): Shared counter and stop event used for early termination
+        projection (list): Optional attribute names to read
     
     Returns:
-        list: Filtered list of items, limited to MAX_ITEMS
+        tuple: (items in segment order, key to resume from, whether the segment is exhausted)
     """
+    segment_table = get_table()
+    scan_kwargs = {
+        'FilterExpression': filter_expression,
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'Limit': page_size,
+        **get_projection_kwargs(projection)
+    }
+    if start_key:
+        scan_kwargs['ExclusiveStartKey'] = start_key
     items = []
-    response = table.scan(FilterExpression=filter_expression, Limit=MAX_ITEMS)
-    items.extend(response.get('Items', []))
-    print(items)
-    while 'LastEvaluatedKey' in response and len(items) < MAX_ITEMS:
-        response = table.scan(
-            FilterExpression=filter_expression,
-            ExclusiveStartKey=response['LastEvaluatedKey'],
-            Limit=MAX_ITEMS - len(items)
-        )
+    while not progress['stop'].is_set():
+        response = read_page(segment_table.scan, **scan_kwargs)
         items.extend(response.get('Items', []))
-    return items[:MAX_ITEMS]
+        if 'LastEvaluatedKey' not in response:
+            return items, None, True
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        with progress['lock']:
+            progress['found'] += len(response.get('Items', []))
+            if progress['found'] >= progress['limit']:
+                progress['stop'].set()
+    return items, scan_kwargs.get('ExclusiveStartKey'), False
+
+def parallel_scan(filter_expression, total_segments, limit=MAX_ITEMS, state=None, projection=None):
+    """
+    Performs a filtered Scan split into segments that are read concurrently
+    Added in v1.25.0
+    
+    Segments stop reading once the combined number of matches reaches the limit. Items
+    beyond the limit are dropped, and the segment resumes after the last item kept,
+    so no item is skipped or returned twice across pages.
+    
+    Args:
+        filter_expression: DynamoDB filter expression
+        total_segments (int): Number of segments
+        limit (int): Maximum number of items to return
+        state (dict): Optional state from a previous page ({'segments': n, 'keys': [...]})
+        projection (list): Optional attribute names to read
+    
+    Returns:
+        tuple: (items, next page state or None when every segment is exhausted)
+    """
+    start_keys = state['keys'] if state else [None] * total_segments
+    progress = {'found': 0, 'limit': limit, 'lock': threading.Lock(), 'stop': threading.Event()}
+    futures = {
+        segment: scan_executor.submit(scan_segment, filter_expression, segment, total_segments, start_key, limit, progress, projection)
+        for segment, start_key in enumerate(start_keys) if start_key != 'done'
+    }
+
+    items = []
+    next_keys = list(start_keys)
+    for segment, future in futures.items():
+        segment_items, last_key, exhausted = future.result()
+        kept = segment_items[:limit - len(items)]
+        items.extend(kept)
+        if len(kept) == len(segment_items):
+            next_keys[segment] = 'done' if exhausted else last_key
+        elif kept:
+            next_keys[segment] = {'articleId': kept[-1]['articleId']}
+
+    if all(key == 'done' for key in next_keys):
+        return items, None
+    return items, {'segments': total_segments, 'keys': next_keys}
 
 def get_filter_expression(filter_expression_list):
     """
@@ -166,6 +844,1163 @@ def filter_by_publisher(publisher):
             'foxnews.com'
         ]
 
+def get_date_key_condition(start_date, end_date):
+    """
+    Builds the dateTime sort key condition shared by all index queries
+    Added in v1.21.0
+    
+    Args:
+        start_date (str): Optional inclusive lower bound (ISO 8601)
+        end_date (str): Optional inclusive upper bound (ISO 8601)
+    
+    Returns:
+        Key condition on dateTime, or None if no bounds were given
+    """
+    from boto3.dynamodb.conditions import Key
+    if start_date and end_date:
+        return Key('dateTime').between(start_date, end_date)
+    if start_date:
+        return Key('dateTime').gte(start_date)
+    if end_date:
+        return Key('dateTime').lte(end_date)
+    return None
+
+def get_date_buckets(start_date, end_date):
+    """
+    Lists the monthly dateBucket partitions (YYYY-MM) covering a date range, newest first
+    Added in v1.21.0
+    
+    Args:
+        start_date (str): Inclusive lower bound (ISO 8601)
+        end_date (str): Optional inclusive upper bound, defaults to the current month
+    
+    Returns:
+        list: Bucket values, or None if the range spans more than MAX_DATE_BUCKETS months
+    """
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT) if end_date else datetime.now(timezone.utc)
+    year, month = end.year, end.month
+    buckets = []
+    while (year, month) >= (start.year, start.month):
+        buckets.append(f"{year:04d}-{month:02d}")
+        if len(buckets) > MAX_DATE_BUCKETS:
+            return None
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return buckets
+
+def get_residual_filters(criteria, include_search=True):
+    """
+    Builds filter expressions for the parameters that no index key can serve
+    Added in v1.22.0 (moved out of lambda_handler)
+    
+    Args:
+        criteria (dict): Parsed query parameters
+        include_search (bool): Whether to add the body contains filter for search
+    
+    Returns:
+        list: DynamoDB filter expressions
+    """
+    from boto3.dynamodb.conditions import And, Attr, Or
+    filter_expressions = []
+
+    # Text search filter
+    if include_search and criteria['search']:
+        filter_expressions.append(Attr('body').contains(criteria['search']))
+
+    # Think tank reference filter
+    if criteria['think_tank_ref'] == 'true':
+        filter_expressions.append(Attr('think_tank_ref').exists())
+    if criteria['think_tank_ref'] == 'false':
+        filter_expressions.append(Attr('think_tank_ref').not_exists())
+
+    # Broad claims filter (any of the claims, or all of them with claimsMatch=all)
+    claims_list = criteria['claims_list']
+    if claims_list:
+        if len(claims_list) > 1:
+            # And/Or only format their first two operands, so longer lists are folded pairwise
+            combine = And if criteria['claims_match'] == 'all' else Or
+            filter_expressions.append(functools.reduce(combine, [Attr(f'broadClaims.{claim}').exists() for claim in claims_list]))
+        else:
+            filter_expressions.append(Attr(f'broadClaims.{claims_list[0]}').exists())
+
+    return filter_expressions
+
+def item_matches(item, criteria):
+    """
+    Evaluates the think tank and broad claims filters in Python
+    Added in v1.22.0 for items fetched by key, where no FilterExpression can be applied
+    
+    Args:
+        item (dict): Article item
+        criteria (dict): Parsed query parameters
+    
+    Returns:
+        bool: True if the item passes the filters
+    """
+    if criteria['think_tank_ref'] == 'true' and 'think_tank_ref' not in item:
+        return False
+    if criteria['think_tank_ref'] == 'false' and 'think_tank_ref' in item:
+        return False
+    claims_list = criteria['claims_list']
+    match = all if criteria['claims_match'] == 'all' else any
+    if claims_list and not match(claim in item.get('broadClaims', {}) for claim in claims_list):
+        return False
+    return True
+
+def plan_query(criteria):
+    """
+    Chooses the cheapest access path for the parsed query parameters
+    Added in v1.21.0 to avoid full table scans for source and date filters
+    
+    Plans, in order of preference:
+    - ids: articles requested by articleId, read with BatchGetItem
+    - postings: search terms looked up in the inverted index, then BatchGetItem
+    - source-dateTime-index: one Query per source, merged newest first by dateTime
+    - sparse claim/think tank indexes: thinkTankRef=true or broadClaims, see plan_sparse_query
+    - dateBucket-dateTime-index: one Query per month bucket in the date range, newest first
+    - scan: filtered (or unfiltered) Scan when no index applies, segmented for filtered scans
+    
+    Args:
+        criteria (dict): Parsed query parameters
+    
+    Returns:
+        dict: Query plan describing the access path and remaining filter expression
+    """
+    from boto3.dynamodb.conditions import Attr
+    start_date = criteria['start_date']
+    end_date = criteria['end_date']
+    source_list = criteria['source_list']
+
+    if criteria['ids']:
+        return {'type': 'ids', 'ids': criteria['ids'], 'filter': None}
+
+    if criteria['search']:
+        search_clauses = parse_search(criteria['search'])
+        if not search_clauses and tokenize(criteria['search']):
+            raise InvalidParameterError('search must include a word other than common stopwords (e.g. the, of, and)')
+        if search_clauses:
+            return {
+                'type': 'postings',
+                'clauses': search_clauses,
+                'criteria': criteria,
+                'filter': get_filter_expression(get_residual_filters(criteria, include_search=False))
+            }
+
+    residual_filters = get_residual_filters(criteria)
+    key_condition = get_date_key_condition(start_date, end_date)
+    residual_filter = get_filter_expression(residual_filters)
+
+    # Indexes are added to an existing table one stack update at a time, so each is used once active
+    indexes = get_table_size()['indexes']
+
+    if source_list and SOURCE_INDEX in indexes:
+        return {
+            'type': 'query',
+            'index': SOURCE_INDEX,
+            'partition_key': 'source',
+            'partitions': source_list,
+            'merge': True,
+            'key_condition': key_condition,
+            'filter': residual_filter
+        }
+
+    sparse_plan = plan_sparse_query(criteria, key_condition, residual_filter)
+    if sparse_plan:
+        return sparse_plan
+
+    if start_date and DATE_BUCKET_INDEX in indexes:
+        buckets = get_date_buckets(start_date, end_date)
+        if buckets:
+            return {
+                'type': 'query',
+                'index': DATE_BUCKET_INDEX,
+                'partition_key': 'dateBucket',
+                'partitions': buckets,
+                'merge': False,  # Buckets are disjoint, so reading them newest first is already ordered
+                'key_condition': key_condition,
+                'filter': residual_filter
+            }
+
+    # No usable index: every filter, including sources and dates, is evaluated during the Scan
+    scan_filters = list(residual_filters)
+    if source_list:
+        scan_filters.append(Attr('source').is_in(source_list))
+    if start_date:
+        scan_filters.append(Attr('dateTime').gte(start_date))
+    if end_date:
+        scan_filters.append(Attr('dateTime').lte(end_date))
+    return {
+        'type': 'scan',
+        'filter': get_filter_expression(scan_filters),
+        # Unfiltered scans fill a page from the first segment, so only filtered scans run in parallel
+        'segments': get_scan_segments() if scan_filters else 1
+    }
+
+def plan_sparse_query(criteria, key_condition, residual_filter):
+    """
+    Plans a Query of the sparse claim and think tank indexes, when they can serve the filters
+    Added in v1.35.0
+    
+    Each filter is a requirement met by the articles of one or more sparse indexes:
+    thinkTankRef=true by hasThinkTank-dateTime-index, broadClaims by the union of its
+    claims' indexes, or with claimsMatch=all each claim by its own index. The requirement
+    whose indexes hold the fewest articles is queried, and the residual filter (which
+    repeats every requirement) intersects the results with the others, so the items read
+    are proportional to the smallest match set rather than the table.
+    
+    The union's streams are made disjoint (each index skips articles carrying an earlier
+    stream's marker) so an article with several of the claims is returned once.
+    
+    Args:
+        criteria (dict): Parsed query parameters
+        key_condition: dateTime key condition for the date range, or None
+        residual_filter: Filter expression for the parameters no index key serves
+    
+    Returns:
+        dict: Query plan, or None if sparse plans are switched off or a needed index does not exist (yet)
+    """
+    from boto3.dynamodb.conditions import Attr
+    if not SPARSE_INDEXES_ENABLED:
+        return None
+
+    requirements = []
+    if criteria['think_tank_ref'] == 'true':
+        requirements.append([THINK_TANK_MARKER])
+    if criteria['claims_list']:
+        markers = sorted({f'{CLAIM_MARKER_PREFIX}{claim}' for claim in criteria['claims_list']})
+        if criteria['claims_match'] == 'all':
+            requirements.extend([marker] for marker in markers)
+        else:
+            requirements.append(markers)
+    if not requirements:
+        return None
+
+    indexes = get_table_size()['indexes']
+    usable = [markers for markers in requirements if all(f'{marker}{SPARSE_INDEX_SUFFIX}' in indexes for marker in markers)]
+    if not usable:
+        return None
+    markers = min(usable, key=lambda markers: sum(indexes[f'{marker}{SPARSE_INDEX_SUFFIX}'] for marker in markers))
+    return {
+        'type': 'query',
+        'index': '+'.join(f'{marker}{SPARSE_INDEX_SUFFIX}' for marker in markers),
+        'sparse': True,
+        'partitions': markers,
+        'partition_filters': {
+            marker: get_filter_expression([Attr(earlier).not_exists() for earlier in markers[:position]])
+            for position, marker in enumerate(markers)
+        },
+        'merge': True,
+        'key_condition': key_condition,
+        'filter': residual_filter
+    }
+
+def get_fields(fields, mode):
+    """
+    Validates the fields and mode query parameters
+    Added in v1.26.0
+    
+    Args:
+        fields (str): Comma-separated attribute names, or None
+        mode (str): 'graph' for the lightweight particle view response, or None
+    
+    Returns:
+        list: Requested attribute names, or None for whole items
+    """
+    if mode is not None and mode != 'graph':
+        raise InvalidParameterError("mode must be 'graph'")
+    if mode == 'graph':
+        if fields:
+            raise InvalidParameterError('fields cannot be used with mode=graph')
+        return list(GRAPH_FIELDS)
+    if not fields:
+        return None
+    field_list = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in field_list if field not in ARTICLE_FIELDS]
+    if unknown:
+        raise InvalidParameterError(f"Unknown fields: {', '.join(unknown)}")
+    return field_list
+
+def get_projection(fields, plan):
+    """
+    Adds the attributes a plan needs internally (keys, sort order, Python filters) to the requested fields
+    Added in v1.26.0
+    
+    Requests without fields read ARTICLE_FIELDS rather than whole items, so the index
+    markers, date bucket and upload bookkeeping attributes are never read.
+    
+    Args:
+        fields (list): Requested attribute names, or None for every article field
+        plan (dict): Plan returned by plan_query
+    
+    Returns:
+        list: Attribute names for the ProjectionExpression
+    """
+    if fields is None:
+        fields = ARTICLE_FIELDS
+    required = ['articleId']
+    if plan['type'] == 'query':
+        required += ['dateTime'] + (plan['partitions'] if plan.get('sparse') else [plan['partition_key']])
+    if plan['type'] == 'postings':
+        required += ['dateTime', 'think_tank_ref', 'broadClaims']
+    return sorted(set(fields) | set(required))
+
+def shape_items(items, fields, mode):
+    """
+    Removes attributes that were read for internal use but not requested
+    Added in v1.26.0
+    
+    In graph mode claim maps keep their keys but drop the supporting sentences,
+    which the particle view does not display.
+    
+    Args:
+        items (list): Items read with get_projection's attributes
+        fields (list): Requested attribute names, or None for every article field
+        mode (str): Response mode
+    
+    Returns:
+        list: Items to return to the client
+    """
+    if fields is None:
+        fields = ARTICLE_FIELDS
+    shaped = []
+    for item in items:
+        shaped_item = {field: item[field] for field in fields if field in item}
+        if mode == 'graph':
+            for claim_field in CLAIM_FIELDS:
+                if claim_field in shaped_item:
+                    shaped_item[claim_field] = {claim: '' for claim in shaped_item[claim_field]}
+        shaped.append(shaped_item)
+    return shaped
+
+def describe_plan(plan):
+    """
+    Summarises a query plan for logging and the X-Query-Plan response header
+    Added in v1.21.0
+    
+    Args:
+        plan (dict): Plan returned by plan_query
+    
+    Returns:
+        str: e.g. 'query:source-dateTime-index x3 +filter', 'parallel-scan x8 +filter' or 'scan'
+    """
+    if plan['type'] == 'query':
+        description = f"query:{plan['index']} x{len(plan['partitions'])}"
+    elif plan['type'] == 'ids':
+        description = f"batch-get x{len(plan['ids'])}"
+    elif plan['type'] == 'postings':
+        tokens = {token for clause in plan['clauses'] for phrase in clause for token in phrase if token not in STOPWORDS}
+        description = f"postings:{postings_table_name} x{len(tokens)}"
+    elif plan['segments'] > 1:
+        description = f"parallel-scan x{plan['segments']}"
+    else:
+        description = 'scan'
+    if plan['filter'] is not None:
+        description += ' +filter'
+    return description
+
+def query_partition(plan, partition_value, start_key=None):
+    """
+    Lazily yields items from one index partition, newest first
+    Added in v1.21.0, resumable in v1.24.0, sparse indexes in v1.35.0
+    
+    Args:
+        plan (dict): Query plan
+        partition_value (str): Value of the index partition key (a source or dateBucket),
+            or for sparse plans the marker attribute whose index is read
+        start_key (dict): Optional ExclusiveStartKey to resume from
+    
+    Yields:
+        dict: Items in descending dateTime order
+    """
+    from boto3.dynamodb.conditions import Key
+    index_name = plan['index']
+    filter_expression = plan['filter']
+    if plan.get('sparse'):
+        # Each marker has its own index, keyed by the marker attribute
+        index_name = f'{partition_value}{SPARSE_INDEX_SUFFIX}'
+        key_condition = Key(partition_value).eq(MARKER_VALUE)
+        filter_expression = get_filter_expression([
+            expression for expression in (plan['partition_filters'][partition_value], plan['filter']) if expression is not None
+        ])
+    else:
+        key_condition = Key(plan['partition_key']).eq(partition_value)
+    if plan['key_condition'] is not None:
+        key_condition = key_condition & plan['key_condition']
+    query_kwargs = {
+        'IndexName': index_name,
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': False,
+        'Limit': MAX_ITEMS,
+        **get_projection_kwargs(plan.get('projection'))
+    }
+    if filter_expression is not None:
+        query_kwargs['FilterExpression'] = filter_expression
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+    while True:
+        response = read_page(get_table().query, **query_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def query_index(plan, limit=MAX_ITEMS, state=None):
+    """
+    Executes an index query plan, fanning out across partitions
+    Added in v1.21.0, resumable in v1.24.0
+    
+    The pagination state maps each partition to the index key of the last item
+    returned from it, or 'done' once the partition is exhausted.
+    
+    Args:
+        plan (dict): Query plan with type 'query'
+        limit (int): Maximum number of items to return
+        state (dict): Optional state from a previous page's cursor
+    
+    Returns:
+        tuple: (items newest first, next page state or None when no items remain)
+    """
+    state = state or {}
+    exhausted = []
+
+    def tagged_stream(value):
+        for item in query_partition(plan, value, state.get(value)):
+            yield item, value
+        exhausted.append(value)
+
+    streams = [tagged_stream(value) for value in plan['partitions'] if state.get(value) != 'done']
+    if plan['merge']:
+        # k-way merge of the per-partition streams, each already sorted by dateTime
+        entries = heapq.merge(*streams, key=lambda entry: entry[0]['dateTime'], reverse=True)
+    else:
+        entries = itertools.chain(*streams)
+
+    # Read one item past the page to learn whether another page exists
+    page = list(itertools.islice(entries, limit + 1))
+    items = [item for item, _ in page[:limit]]
+    if len(page) <= limit:
+        return items, None
+
+    next_state = dict(state)
+    for item, value in page[:limit]:
+        partition_key = value if plan.get('sparse') else plan['partition_key']
+        next_state[value] = {
+            'articleId': item['articleId'],
+            partition_key: item[partition_key],
+            'dateTime': item['dateTime']
+        }
+    for value in exhausted:
+        next_state[value] = 'done'
+    return items, next_state
+
+def tokenize(text):
+    """
+    Splits text into lowercase alphanumeric tokens
+    Added in v1.22.0, must match tokenize in data/database/push_to_dynamodb.py
+    
+    Args:
+        text (str): Text to tokenize
+    
+    Returns:
+        list: Tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def parse_search(search):
+    """
+    Parses the search parameter into OR clauses of AND-ed phrases
+    Added in v1.22.0
+    
+    'and'/'or' (any case) are operators, with and binding tighter than or. Consecutive
+    words, or words in double quotes, form a phrase that must appear in order, so
+    'climate change' still matches the exact phrase as before. Stopwords are not indexed:
+    they keep their place in a phrase, and phrases made only of stopwords are dropped.
+    
+    Args:
+        search (str): Raw search parameter, e.g. 'arson or "climate change" and greens'
+    
+    Returns:
+        list: Clauses, each a list of phrases, each a list of tokens; empty if no tokens
+    """
+    clauses = [[]]
+    phrase = []
+    for quoted, word in SEARCH_TERM_PATTERN.findall(search):
+        operator = word.lower() if word else None
+        if operator in ('and', 'or'):
+            if phrase:
+                clauses[-1].append(phrase)
+                phrase = []
+            if operator == 'or' and clauses[-1]:
+                clauses.append([])
+        elif quoted:
+            if phrase:
+                clauses[-1].append(phrase)
+                phrase = []
+            if tokenize(quoted):
+                clauses[-1].append(tokenize(quoted))
+        else:
+            phrase.extend(tokenize(word))
+    if phrase:
+        clauses[-1].append(phrase)
+    clauses = [[phrase for phrase in clause if not STOPWORDS.issuperset(phrase)] for clause in clauses]
+    return [clause for clause in clauses if clause]
+
+def get_postings(token):
+    """
+    Reads the full posting list for a token from the inverted index
+    Added in v1.22.0, cached per container in v1.35.3 so later pages do not read it again
+    
+    Args:
+        token (str): Search token
+    
+    Returns:
+        dict: articleId -> posting item (positions, dateTime, source)
+    """
+    from boto3.dynamodb.conditions import Key
+    postings = postings_cache.get(token)
+    if postings is not None:
+        return postings
+
+    postings = {}
+    query_kwargs = {'KeyConditionExpression': Key('token').eq(token)}
+    while True:
+        response = read_page(get_table(postings_table_name).query, **query_kwargs)
+        for posting in response.get('Items', []):
+            postings[posting['articleId']] = posting
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    size = sum(POSTING_BYTES + POSITION_BYTES * len(posting['positions']) for posting in postings.values())
+    postings_cache.put(token, postings, size)
+    return postings
+
+def match_phrase(phrase, postings_by_token):
+    """
+    Finds articles containing every token of a phrase at consecutive positions
+    Added in v1.22.0, stopwords skipped (but still counted as positions) in v1.35.3
+    
+    Args:
+        phrase (list): Tokens in order, with at least one that is not a stopword
+        postings_by_token (dict): token -> postings returned by get_postings
+    
+    Returns:
+        dict: articleId -> posting of the first token, for matching articles
+    """
+    indexed = [(offset, token) for offset, token in enumerate(phrase) if token not in STOPWORDS]
+    first_offset, first_token = indexed[0]
+    first = postings_by_token[first_token]
+    candidates = set(first)
+    for _, token in indexed[1:]:
+        candidates &= set(postings_by_token[token])
+    if len(indexed) == 1:
+        return {article_id: first[article_id] for article_id in candidates}
+
+    matches = {}
+    for article_id in candidates:
+        following = [
+            (offset - first_offset, set(postings_by_token[token][article_id]['positions']))
+            for offset, token in indexed[1:]
+        ]
+        for start in first[article_id]['positions']:
+            if all(start + distance in positions for distance, positions in following):
+                matches[article_id] = first[article_id]
+                break
+    return matches
+
+def batch_get_articles(article_ids, projection=None):
+    """
+    Fetches articles by articleId using BatchGetItem
+    Added in v1.22.0, UnprocessedKeys backoff and caller ordering in v1.27.0
+    
+    Ids are requested in chunks of BATCH_GET_SIZE. Keys DynamoDB leaves unprocessed
+    (throttling or the 16 MB response limit) are retried with exponential backoff,
+    giving up after BATCH_GET_MAX_RETRIES calls in a row return nothing.
+    
+    Args:
+        article_ids (list): Article ids to fetch (duplicates are fetched once)
+        projection (list): Optional attribute names to read
+    
+    Returns:
+        list: Items found, in the order of article_ids; ids with no article are skipped
+    """
+    unique_ids = list(dict.fromkeys(article_ids))
+    found = {}
+    for start in range(0, len(unique_ids), BATCH_GET_SIZE):
+        request_items = {table_name: {
+            'Keys': [{'articleId': article_id} for article_id in unique_ids[start:start + BATCH_GET_SIZE]],
+            **get_projection_kwargs(projection)
+        }}
+        attempt = 0
+        while request_items:
+            response = read_page(get_client().batch_get_item, RequestItems=request_items)
+            returned = response.get('Responses', {}).get(table_name, [])
+            for item in returned:
+                found[item['articleId']] = item
+            request_items = response.get('UnprocessedKeys')
+            if returned:
+                attempt = 0  # Only consecutive calls that make no progress count towards the limit
+            if request_items:
+                if attempt == BATCH_GET_MAX_RETRIES:
+                    raise RuntimeError('BatchGetItem still had unprocessed keys after retrying')
+                time.sleep(random.uniform(0, min(BATCH_GET_MAX_BACKOFF_SECONDS, BATCH_GET_BACKOFF_SECONDS * 2 ** attempt)))
+                attempt += 1
+    return [found[article_id] for article_id in unique_ids if article_id in found]
+
+def get_article_ids(ids):
+    """
+    Validates the ids query parameter
+    Added in v1.27.0
+    
+    Args:
+        ids (str): Comma-separated articleIds
+    
+    Returns:
+        list: Article ids as integers, in the order given
+    """
+    id_list = [article_id.strip() for article_id in ids.split(',') if article_id.strip()]
+    if not id_list or not all(article_id.isdigit() for article_id in id_list):
+        raise InvalidParameterError('ids must be a comma-separated list of integer articleIds')
+    if len(id_list) > MAX_LIMIT:
+        raise InvalidParameterError(f'At most {MAX_LIMIT} ids can be requested at once')
+    return [int(article_id) for article_id in id_list]
+
+def search_postings(plan, limit=MAX_ITEMS, state=None):
+    """
+    Executes a postings plan: evaluates the search against the inverted index, applies
+    date and source filters to the postings, then fetches only the matching articles
+    Added in v1.22.0, resumable in v1.24.0
+    
+    Args:
+        plan (dict): Query plan with type 'postings'
+        limit (int): Maximum number of items to return
+        state (dict): Optional state from a previous page's cursor ({'after': [dateTime, articleId]})
+    
+    Returns:
+        tuple: (items newest first, next page state or None when no items remain)
+    """
+    criteria = plan['criteria']
+    tokens = {token for clause in plan['clauses'] for phrase in clause for token in phrase if token not in STOPWORDS}
+    postings_by_token = {token: get_postings(token) for token in tokens}
+
+    # OR of clauses, each clause an AND of phrases
+    matches = {}
+    for clause in plan['clauses']:
+        clause_matches = match_phrase(clause[0], postings_by_token)
+        for phrase in clause[1:]:
+            phrase_matches = match_phrase(phrase, postings_by_token)
+            clause_matches = {article_id: posting for article_id, posting in clause_matches.items() if article_id in phrase_matches}
+        matches.update(clause_matches)
+
+    # Postings carry dateTime and source so these filters need no article reads
+    candidates = [
+        posting for posting in matches.values()
+        if (not criteria['start_date'] or posting['dateTime'] >= criteria['start_date'])
+        and (not criteria['end_date'] or posting['dateTime'] <= criteria['end_date'])
+        and (not criteria['source_list'] or posting['source'] in criteria['source_list'])
+    ]
+    candidates.sort(key=lambda posting: (posting['dateTime'], posting['articleId']), reverse=True)
+    if state:
+        after = (state['after'][0], Decimal(state['after'][1]))
+        candidates = [posting for posting in candidates if (posting['dateTime'], posting['articleId']) < after]
+
+    items = []
+    for start in range(0, len(candidates), BATCH_GET_SIZE):
+        batch_ids = [posting['articleId'] for posting in candidates[start:start + BATCH_GET_SIZE]]
+        for item in batch_get_articles(batch_ids, plan.get('projection')):
+            if item_matches(item, criteria):
+                items.append(item)
+                if len(items) == limit:
+                    if candidates[-1]['articleId'] == item['articleId']:
+                        return items, None
+                    return items, {'after': [item['dateTime'], item['articleId']]}
+    return items, None
+
+def execute_plan(plan, limit=MAX_ITEMS, state=None):
+    """
+    Runs a query plan against DynamoDB
+    Added in v1.21.0, resumable in v1.24.0
+    
+    Args:
+        plan (dict): Plan returned by plan_query
+        limit (int): Maximum number of items to return
+        state (dict): Optional pagination state decoded from a cursor
+    
+    Returns:
+        tuple: (items, next page state or None when no items remain)
+    """
+    if plan['type'] == 'ids':
+        return batch_get_articles(plan['ids'], plan.get('projection')), None
+    if plan['type'] == 'postings':
+        return search_postings(plan, limit, state)
+    if plan['type'] == 'query':
+        return query_index(plan, limit, state)
+    # A cursor keeps the segment count it was issued with, even if the table has grown since
+    total_segments = state['segments'] if state and 'segments' in state else plan['segments']
+    if total_segments > 1 and not (state and 'key' in state):
+        return parallel_scan(plan['filter'], total_segments, limit, state, plan.get('projection'))
+    start_key = state.get('key') if state else None
+    if plan['filter'] is None:
+        items, last_key = scan_all(limit, start_key, plan.get('projection'))
+    else:
+        items, last_key = scan_specific(plan['filter'], limit, start_key, plan.get('projection'))
+    return items, {'key': last_key} if last_key else None
+
+def get_plan_kind(plan):
+    """
+    Identifies the access path a cursor's state belongs to
+    Added in v1.25.0 (segment counts may change between pages, so describe_plan is not used)
+    
+    Args:
+        plan (dict): Plan returned by plan_query
+    
+    Returns:
+        str: Plan type and index name
+    """
+    return f"{plan['type']}:{plan.get('index', '')}"
+
+def get_aggregate_queries(start_date, end_date, group_by):
+    """
+    Chooses the lazone-aggregates key ranges that cover a date range
+    Added in v1.31.0
+    
+    Whole months are read from the month rows of the ALL partition in a single Query;
+    only partly covered months (or every month, for groupBy=day) need their day rows.
+    Rollups are daily, so the time of day of startDate and endDate is ignored.
+    
+    Args:
+        start_date (str): Optional inclusive lower bound (ISO 8601)
+        end_date (str): Optional inclusive upper bound (ISO 8601), defaults to today
+        group_by (str): 'day', 'month', 'source' or None
+    
+    Returns:
+        list: (bucket, lowest key, highest key) tuples, one Query each
+    """
+    if not start_date and not end_date:
+        if group_by == 'day':
+            raise InvalidParameterError('groupBy=day requires startDate')
+        if group_by == 'month':
+            return [(AGGREGATE_ALL_BUCKET, '0000-00#', '9999-99$')]
+        return [(AGGREGATE_ALL_BUCKET, '*#', '*$')]
+
+    # '#' separates the period from the rest of the key, and '$' sorts straight after it
+    end_day = end_date[:10] if end_date else datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    start_day = start_date[:10] if start_date else None
+    if start_day and start_day > end_day:
+        return []
+
+    if group_by == 'day':
+        months = get_date_buckets(f"{start_day}T00:00:00Z", f"{end_day}T00:00:00Z")
+        if months is None or len(months) > MAX_AGGREGATE_DAY_BUCKETS:
+            raise InvalidParameterError(f'groupBy=day is limited to {MAX_AGGREGATE_DAY_BUCKETS} months')
+        return [
+            (month, f"{max(start_day, month + '-01')}#", f"{min(end_day, month + '-31')}$")
+            for month in reversed(months)
+        ]
+
+    # Months partly covered at either end of the range are read day by day
+    queries = []
+    first_full = '0000-01'
+    if start_day:
+        first_full = start_day[:7] if start_day.endswith('-01') else get_next_month(start_day[:7])
+        if start_day[:7] < first_full:
+            queries.append((start_day[:7], f"{start_day}#", f"{min(end_day, start_day[:7] + '-31')}$"))
+    next_day = (datetime.strptime(end_day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    last_full = end_day[:7] if next_day.endswith('-01') else get_previous_month(end_day[:7])
+    if end_day[:7] > last_full and not (queries and queries[0][0] == end_day[:7]):
+        queries.append((end_day[:7], f"{end_day[:7]}-01#", f"{end_day}$"))
+    if first_full <= last_full:
+        queries.append((AGGREGATE_ALL_BUCKET, f"{first_full}#", f"{last_full}$"))
+    return queries
+
+def get_next_month(month):
+    """
+    Returns the month after a YYYY-MM month
+    Added in v1.31.0
+    """
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year:04d}-{number + 1:02d}" if number < 12 else f"{year + 1:04d}-01"
+
+def get_previous_month(month):
+    """
+    Returns the month before a YYYY-MM month
+    Added in v1.31.0
+    """
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year:04d}-{number - 1:02d}" if number > 1 else f"{year - 1:04d}-12"
+
+def query_aggregates(bucket, low, high):
+    """
+    Reads one key range of the lazone-aggregates table
+    Added in v1.31.0
+    
+    Args:
+        bucket (str): Partition ('ALL' or a YYYY-MM month)
+        low (str): Lowest sort key
+        high (str): Highest sort key
+    
+    Returns:
+        list: Aggregate rows
+    """
+    from boto3.dynamodb.conditions import Key
+    aggregates_table = get_table(aggregates_table_name)
+    query_kwargs = {'KeyConditionExpression': Key('bucket').eq(bucket) & Key('key').between(low, high)}
+    rows = []
+    while True:
+        response = read_page(aggregates_table.query, **query_kwargs)
+        rows.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return rows
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def summarize_aggregates(rows, source_list, group_by):
+    """
+    Adds up aggregate rows into totals, optionally grouped
+    Added in v1.31.0
+    
+    Args:
+        rows (list): Rows returned by query_aggregates
+        source_list (list): Optional sources to count (all sources if None)
+        group_by (str): 'day', 'month', 'source' or None
+    
+    Returns:
+        dict: {'totals': summary, 'groups': {group: summary}} (groups only with group_by),
+              where a summary is {'articles': n, 'thinkTankRefs': n, 'broadClaims': {claim: n}}
+    """
+    def empty_summary():
+        return {'articles': 0, 'thinkTankRefs': 0, 'broadClaims': {}}
+
+    sources = set(source_list) if source_list else None
+    totals = empty_summary()
+    groups = {}
+    for row in rows:
+        count = int(row['count'])
+        period, metric, source = row['key'].split('#', 2)
+        if not count or (sources is not None and source not in sources):
+            continue
+        summaries = [totals]
+        if group_by:
+            group = source if group_by == 'source' else period[:7] if group_by == 'month' else period
+            summaries.append(groups.setdefault(group, empty_summary()))
+        for summary in summaries:
+            if metric == '*':
+                summary['articles'] += count
+            elif metric == 'think_tank_ref':
+                summary['thinkTankRefs'] += count
+            elif metric.startswith('broadClaims.'):
+                claim = metric[len('broadClaims.'):]
+                summary['broadClaims'][claim] = summary['broadClaims'].get(claim, 0) + count
+
+    result = {'totals': totals}
+    if group_by:
+        result['groups'] = dict(sorted(groups.items()))
+    return result
+
+def get_aggregate_response(query_params, encoding):
+    """
+    Answers a summary query on the aggregate endpoint from the precomputed rollups
+    Added in v1.31.0
+    
+    Supported query parameters: startDate, endDate, sources, publisher and groupBy
+    ('day', 'month' or 'source'). A handful of Query calls are made whatever the size
+    of the corpus.
+    
+    Args:
+        query_params (dict): Request query parameters
+        encoding (str): Response encoding chosen by get_accepted_encoding
+    
+    Returns:
+        dict: API Gateway response with the summary counts
+    """
+    with span('parse'):
+        start_date = query_params.get('startDate')
+        end_date = query_params.get('endDate')
+        sources = query_params.get('sources')
+        publisher = query_params.get('publisher')
+        group_by = query_params.get('groupBy')
+
+        if start_date:
+            start_date = datetime.strptime(start_date, DATE_FORMAT).strftime(DATE_FORMAT)
+        if end_date:
+            end_date = datetime.strptime(end_date, DATE_FORMAT).strftime(DATE_FORMAT)
+        if group_by and group_by not in AGGREGATE_GROUPS:
+            raise InvalidParameterError(f"groupBy must be one of: {', '.join(AGGREGATE_GROUPS)}")
+        if sources and publisher:
+            raise InvalidParameterError('sources cannot be combined with publisher')
+        source_list = None
+        if publisher:
+            source_list = filter_by_publisher(publisher.lower())
+            if not source_list:
+                raise InvalidParameterError(f'Unknown publisher: {publisher}')
+        if sources:
+            source_list = [s.strip() for s in sources.split(',')]
+
+    cache_key = json.dumps({
+        'aggregate': True,
+        'start_date': start_date,
+        'end_date': end_date,
+        'source_list': sorted(source_list) if source_list else None,
+        'group_by': group_by,
+        'encoding': encoding
+    }, sort_keys=True)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        body, headers, is_base64_encoded = cached
+        return create_raw_response(200, body, dict(headers, **{'X-Cache': 'HIT'}), is_base64_encoded)
+
+    with span('query'):
+        queries = get_aggregate_queries(start_date, end_date, group_by)
+        rows = [row for rows in scan_executor.map(lambda query: query_aggregates(*query), queries) for row in rows]
+        summary = summarize_aggregates(rows, source_list, group_by)
+
+    with span('serialise'):
+        body, content_encoding, is_base64_encoded = compress_body(json_encoder.encode(summary), encoding)
+        headers = {'X-Query-Plan': f'aggregate:{aggregates_table_name} x{len(queries)}'}
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+    result_cache.put(cache_key, (body, headers, is_base64_encoded), len(body))
+    return create_raw_response(200, body, dict(headers, **{'X-Cache': 'MISS'}), is_base64_encoded)
+
+def query_claim_rollups(source, start_month, end_month):
+    """
+    Reads the claim co-occurrence rollups of one source for a range of months
+    Added in v1.32.0
+    
+    Args:
+        source (str): Source, or '*' for the all sources rows
+        start_month (str): Inclusive first month (YYYY-MM)
+        end_month (str): Inclusive last month (YYYY-MM)
+    
+    Returns:
+        list: Rollup rows written by data/database/claim_matrix.py
+    """
+    from boto3.dynamodb.conditions import Key
+    aggregates_table = get_table(aggregates_table_name)
+    query_kwargs = {
+        'KeyConditionExpression': Key('bucket').eq(f'{CLAIM_ROLLUP_PREFIX}{source}') & Key('key').between(start_month, end_month)
+    }
+    rows = []
+    while True:
+        response = read_page(aggregates_table.query, **query_kwargs)
+        rows.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return rows
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def summarize_claim_rollups(rows):
+    """
+    Adds up claim co-occurrence rollups into frequencies, pair counts and a monthly timeline
+    Added in v1.32.0
+    
+    Args:
+        rows (list): Rows returned by query_claim_rollups
+    
+    Returns:
+        dict: {'articles': n, 'claims': {claim: n}, 'cooccurrence': {'a|b': n},
+               'timeline': {month: {'articles': n, 'claims': {claim: n}}}}
+    """
+    pairs = {}
+    timeline = {}
+    for row in rows:
+        month = timeline.setdefault(row['key'], {'articles': 0, 'claims': {}})
+        month['articles'] += int(row['articles'])
+        for pair, count in row.get('pairs', {}).items():
+            pairs[pair] = pairs.get(pair, 0) + int(count)
+            first, second = pair.split('|', 1)
+            if first == second:
+                month['claims'][first] = month['claims'].get(first, 0) + int(count)
+
+    claims = {}
+    for pair, count in pairs.items():
+        first, second = pair.split('|', 1)
+        if first == second:
+            claims[first] = count
+    return {
+        'articles': sum(month['articles'] for month in timeline.values()),
+        'claims': claims,
+        'cooccurrence': pairs,
+        'timeline': dict(sorted(timeline.items()))
+    }
+
+def get_claims_response(query_params, encoding):
+    """
+    Answers a claim co-occurrence and timeline query on the claims endpoint
+    Added in v1.32.0
+    
+    Supported query parameters: startDate, endDate, sources and publisher. The rollups
+    are monthly, so the months of startDate and endDate are included in full. One Query
+    is made per source (or one for all sources).
+    
+    Args:
+        query_params (dict): Request query parameters
+        encoding (str): Response encoding chosen by get_accepted_encoding
+    
+    Returns:
+        dict: API Gateway response with the claim summary
+    """
+    with span('parse'):
+        start_date = query_params.get('startDate')
+        end_date = query_params.get('endDate')
+        sources = query_params.get('sources')
+        publisher = query_params.get('publisher')
+
+        start_month = datetime.strptime(start_date, DATE_FORMAT).strftime("%Y-%m") if start_date else '0000-00'
+        end_month = datetime.strptime(end_date, DATE_FORMAT).strftime("%Y-%m") if end_date else '9999-99'
+        if sources and publisher:
+            raise InvalidParameterError('sources cannot be combined with publisher')
+        source_list = [CLAIM_ROLLUP_ALL_SOURCES]
+        if publisher:
+            source_list = filter_by_publisher(publisher.lower())
+            if not source_list:
+                raise InvalidParameterError(f'Unknown publisher: {publisher}')
+        if sources:
+            source_list = sorted({s.strip() for s in sources.split(',')})
+
+    # Responses are cached per filter set, so dashboards switching between views stay warm
+    cache_key = json.dumps({
+        'claims': True,
+        'start_month': start_month,
+        'end_month': end_month,
+        'source_list': sorted(source_list),
+        'encoding': encoding
+    }, sort_keys=True)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        body, headers, is_base64_encoded = cached
+        return create_raw_response(200, body, dict(headers, **{'X-Cache': 'HIT'}), is_base64_encoded)
+
+    with span('query'):
+        rows = [
+            row for rows in scan_executor.map(lambda source: query_claim_rollups(source, start_month, end_month), source_list)
+            for row in rows
+        ]
+        summary = summarize_claim_rollups(rows)
+
+    with span('serialise'):
+        body, content_encoding, is_base64_encoded = compress_body(json_encoder.encode(summary), encoding)
+        headers = {'X-Query-Plan': f'claims:{aggregates_table_name} x{len(source_list)}'}
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+    result_cache.put(cache_key, (body, headers, is_base64_encoded), len(body))
+    return create_raw_response(200, body, dict(headers, **{'X-Cache': 'MISS'}), is_base64_encoded)
+
+def encode_cursor(query_key, plan, state):
+    """
+    Encodes pagination state as an opaque, HMAC-signed cursor string
+    Added in v1.24.0
+    
+    Args:
+        query_key (str): Cache key of the query (without page parameters) the cursor belongs to
+        plan (dict): Plan that produced the state
+        state (dict): Pagination state returned by execute_plan
+    
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = {
+        'q': hashlib.sha256(query_key.encode('utf-8')).hexdigest()[:16],
+        'p': get_plan_kind(plan),
+        's': state
+    }
+    # Key values must round-trip exactly; json_encoder keeps integral Decimals (articleId) as integers
+    encoded = base64.urlsafe_b64encode(json_encoder.encode(payload).encode('utf-8')).rstrip(b'=')
+    signature = base64.urlsafe_b64encode(hmac.new(get_cursor_secret(), encoded, hashlib.sha256).digest()).rstrip(b'=')
+    return f"{encoded.decode('ascii')}.{signature.decode('ascii')}"
+
+def get_cursor_secret():
+    """
+    Returns the key pagination cursors are signed with
+    Added in v1.35.5
+    
+    Returns:
+        bytes: CURSOR_SECRET
+    
+    Raises:
+        RuntimeError: If the function runs in Lambda without a CURSOR_SECRET (answered with HTTP 500)
+    """
+    if CURSOR_SECRET is None:
+        raise RuntimeError('CURSOR_SECRET is not configured, so pagination cursors cannot be signed')
+    return CURSOR_SECRET.encode('utf-8')
+
+def decode_cursor(cursor, query_key, plan):
+    """
+    Verifies a cursor and returns the pagination state it carries
+    Added in v1.24.0
+    
+    Args:
+        cursor (str): Cursor from a previous response's X-Next-Cursor header
+        query_key (str): Cache key of the current query (without page parameters)
+        plan (dict): Plan chosen for the current query
+    
+    Returns:
+        dict: Pagination state for execute_plan
+    
+    Raises:
+        InvalidParameterError: If the cursor is malformed, forged or belongs to another query
+    """
+    secret = get_cursor_secret()
+    try:
+        encoded, signature = cursor.encode('ascii').split(b'.')
+        expected = base64.urlsafe_b64encode(hmac.new(secret, encoded, hashlib.sha256).digest()).rstrip(b'=')
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidParameterError('Invalid cursor')
+        payload = json.loads(base64.urlsafe_b64decode(encoded + b'=' * (-len(encoded) % 4)), parse_float=Decimal)
+    except (ValueError, UnicodeError):
+        raise InvalidParameterError('Invalid cursor')
+    if payload['q'] != hashlib.sha256(query_key.encode('utf-8')).hexdigest()[:16] or payload['p'] != get_plan_kind(plan):
+        raise InvalidParameterError('Cursor does not match this query')
+    return payload['s']
+
+def get_page_limit(limit):
+    """
+    Validates the limit query parameter
+    Added in v1.24.0
+    
+    Args:
+        limit (str): Raw limit parameter, or None
+    
+    Returns:
+        int: Page size between 1 and MAX_LIMIT, MAX_ITEMS by default
+    """
+    if limit is None:
+        return MAX_ITEMS
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LIMIT:
+        raise InvalidParameterError(f'limit must be an integer between 1 and {MAX_LIMIT}')
+    return int(limit)
+
+def get_cache_key(criteria, include_page=True):
+    """
+    Builds a canonical cache key so equivalent queries share a cache entry
+    Added in v1.23.0, page parameters added in v1.24.0
+    
+    Sources and claims are sorted, search whitespace is collapsed and dates are
+    expected to be canonicalized by the caller.
+    
+    Args:
+        criteria (dict): Parsed query parameters
+        include_page (bool): Whether limit and cursor are part of the key
+    
+    Returns:
+        str: Cache key
+    """
+    key = {
+        'start_date': criteria['start_date'],
+        'end_date': criteria['end_date'],
+        'search': ' '.join(criteria['search'].lower().split()) if criteria['search'] else None,
+        'source_list': sorted(criteria['source_list']) if criteria['source_list'] else None,
+        'think_tank_ref': criteria['think_tank_ref'],
+        'claims_list': sorted(criteria['claims_list']) if criteria['claims_list'] else None,
+        'claims_match': criteria['claims_match']
+    }
+    key['ids'] = criteria['ids']
+    key['format'] = criteria['format']
+    key['fields'] = criteria['fields']
+    key['mode'] = criteria['mode']
+    if include_page:
+        key['limit'] = criteria['limit']
+        key['cursor'] = criteria['cursor']
+        key['encoding'] = criteria['encoding']
+    return json.dumps(key, sort_keys=True)
+
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -174,20 +2009,55 @@ def lambda_handler(event, context):
     Supported query parameters:
     - startDate: ISO 8601 format (YYYY-MM-DDTHH:MM:SSZ)
     - endDate: ISO 8601 format (YYYY-MM-DDTHH:MM:SSZ)
-    - search: Text to search in article body
+    - search: Search terms for the article body (and/or operators, quoted phrases)
     - sources: Comma-separated list of news sources
     - publisher: Publisher identifier (currently supports 'murdoch media')
     - thinkTankRef: 'true'/'false' to filter articles with/without think tank references
     - broadClaims: Comma-separated list of claim identifiers
+    - claimsMatch: 'any' (default) for articles with any of the broadClaims, 'all' for all of them
+    - limit: Page size, 1 to MAX_LIMIT (default MAX_ITEMS)
+    - cursor: X-Next-Cursor header value from the previous page
+    - fields: Comma-separated attributes to return (ProjectionExpression)
+    - mode: 'graph' returns only what the particle view needs, with claim sentences removed
+    - ids: Comma-separated articleIds to fetch directly (returned in the order given)
+    - format: 'json' (default) or 'ndjson' for one article per line
+    
+    Requests to the /aggregate resource return summary counts instead of articles
+    (see get_aggregate_response), and requests to /claims return claim co-occurrence
+    and timelines (see get_claims_response).
+    
+    Responses are gzip or brotli compressed when the Accept-Encoding header allows it.
+    
+    The access path chosen by plan_query is reported in the X-Query-Plan header, and
+    X-Cache reports whether the response came from the warm container cache (HIT/MISS).
+    X-Next-Cursor is set when more results are available.
+    
+    Phase timings and DynamoDB page metrics are logged in embedded metric format
+    (see emit_metrics) instead of the request parameters and results.
     
     Returns:
         dict: API Gateway response with filtered results
     """
-    print(f"Received event: {event}")
     # Handle OPTIONS request for CORS
     if event.get('requestContext', {}).get('http', {}).get('method') == 'OPTIONS':
         return create_response(200, {})
 
+    start_trace(get_filter_type(event))
+    response = route_request(event)
+    emit_metrics(response, context)
+    return response
+
+def route_request(event):
+    """
+    Answers an API Gateway request (see lambda_handler for the parameters)
+    Split out of lambda_handler in v1.33.0
+    
+    Args:
+        event (dict): API Gateway event
+    
+    Returns:
+        dict: API Gateway response
+    """
     # Extract query parameters
     query_params = event.get('queryStringParameters', {}) or {}
     
@@ -198,71 +2068,95 @@ def lambda_handler(event, context):
     publisher = query_params.get('publisher')
     think_tank_ref = query_params.get('thinkTankRef')
     broad_claims = query_params.get('broadClaims')
-
-    print(f"Start Date: {start_date}")
-    print(f"End Date: {end_date}")
-    print(f"Search: {search}")
-    print(f"Source: {sources}")
+    claims_match = query_params.get('claimsMatch') or 'any'
+    limit = query_params.get('limit')
+    cursor = query_params.get('cursor')
+    fields = query_params.get('fields')
+    mode = query_params.get('mode')
+    ids = query_params.get('ids')
+    output_format = query_params.get('format')
     
     try:
-        # Build filter expressions based on query parameters
-        filter_expressions = []
-        
-        # Date range filters
-        if start_date:
-            datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%SZ")
-            filter_expressions.append(Attr('dateTime').gte(start_date))
-        if end_date:
-            datetime.strptime(end_date, "%Y-%m-%dT%H:%M:%SZ")
-            filter_expressions.append(Attr('dateTime').lte(end_date))
-            
-        # Text search filter
-        if search:
-            filter_expressions.append(Attr('body').contains(search))
-            
-        # Publisher-based source filter
-        if publisher and not sources:
-            publisher_source_list = filter_by_publisher(publisher)
-            filter_expressions.append(Attr('source').is_in(publisher_source_list))
-            
-        # Direct source filter
-        if sources and not publisher:
-            source_list = [s.strip() for s in sources.split(',')]
-            filter_expressions.append(Attr('source').is_in(source_list))
-            
-        # Think tank reference filter
-        if think_tank_ref == 'true':
-            filter_expressions.append(Attr('think_tank_ref').exists())
-        if think_tank_ref == 'false':
-            filter_expressions.append(Attr('think_tank_ref').not_exists())
-            
-        # Broad claims filter
-        if broad_claims:
-            claims_list = [claim.strip() for claim in broad_claims.split(',')]
-            if len(claims_list) > 1:
-                conditions = [Attr(f'broadClaims.{claim}').exists() for claim in claims_list]
-                if conditions:
-                    filter_expressions.append(Or(*conditions))
-            else:
-                filter_expressions.append(Attr(f'broadClaims.{claims_list[0]}').exists())
-
-        # Apply filters if any exist
-        if filter_expressions:
-            if len(filter_expressions) > 1:
-                filter_expression = get_filter_expression(filter_expressions)
-                print("2 filters")
-            else:
-                filter_expression = filter_expressions[0]
-                print("1 filter")
-            
-            print(f"Filter expression: {filter_expression.get_expression()}")
-            items = scan_specific(filter_expression)
-        else:
-            items = scan_all()
-            
-        print(f"Number of Items Returned: {len(items)}")
-        return create_response(200, items)
+        # Summary counts are served from the precomputed rollups
+        if (event.get('resource') or event.get('path') or '').endswith('/aggregate'):
+            return get_aggregate_response(query_params, get_accepted_encoding(event.get('headers')))
+        if (event.get('resource') or event.get('path') or '').endswith('/claims'):
+            return get_claims_response(query_params, get_accepted_encoding(event.get('headers')))
+
+        with span('parse'):
+            # Validate and canonicalize date range parameters; these become index key conditions where possible
+            if start_date:
+                start_date = datetime.strptime(start_date, DATE_FORMAT).strftime(DATE_FORMAT)
+            if end_date:
+                end_date = datetime.strptime(end_date, DATE_FORMAT).strftime(DATE_FORMAT)
+
+            # Publisher or direct source list, served by the source index
+            source_list = None
+            if publisher and not sources:
+                source_list = filter_by_publisher(publisher.lower())
+                if not source_list:
+                    return create_response(400, {'error': f'Unknown publisher: {publisher}'})
+            if sources and not publisher:
+                source_list = [s.strip() for s in sources.split(',')]
+
+            if claims_match not in CLAIMS_MATCH_OPTIONS:
+                raise InvalidParameterError(f"claimsMatch must be one of: {', '.join(CLAIMS_MATCH_OPTIONS)}")
+
+            # Articles by id are fetched directly and cannot be combined with filters
+            if ids and any([start_date, end_date, search, sources, publisher, think_tank_ref, broad_claims, cursor]):
+                raise InvalidParameterError('ids cannot be combined with filter or cursor parameters')
+
+            criteria = {
+                'ids': get_article_ids(ids) if ids else None,
+                'start_date': start_date,
+                'end_date': end_date,
+                'search': search,
+                'source_list': source_list,
+                'think_tank_ref': think_tank_ref,
+                'claims_list': [claim.strip() for claim in broad_claims.split(',')] if broad_claims else None,
+                'claims_match': claims_match,
+                'limit': get_page_limit(limit),
+                'cursor': cursor,
+                'fields': get_fields(fields, mode),
+                'mode': mode,
+                'format': get_output_format(output_format),
+                'encoding': get_accepted_encoding(event.get('headers'))
+            }
+
+        # Serve repeated queries from the warm container cache
+        cache_key = get_cache_key(criteria)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            body, headers, is_base64_encoded = cached
+            return create_raw_response(200, body, dict(headers, **{'X-Cache': 'HIT'}), is_base64_encoded)
+
+        # Pick an access path and run it
+        with span('plan'):
+            plan = plan_query(criteria)
+            plan['projection'] = get_projection(criteria['fields'], plan)
+            plan_description = describe_plan(plan)
+            query_key = get_cache_key(criteria, include_page=False)
+            state = decode_cursor(cursor, query_key, plan) if cursor else None
+        with span('query'):
+            items, next_state = execute_plan(plan, criteria['limit'], state)
+
+        with span('serialise'):
+            items = shape_items(items, criteria['fields'], mode)
+            request_trace['returned'] = len(items)
+            body, content_encoding, is_base64_encoded = compress_body(encode_items(items, criteria['format']), criteria['encoding'])
+            headers = {'X-Query-Plan': plan_description}
+            if criteria['format'] == 'ndjson':
+                headers['Content-Type'] = 'application/x-ndjson'
+            if content_encoding:
+                headers['Content-Encoding'] = content_encoding
+            if next_state:
+                headers['X-Next-Cursor'] = encode_cursor(query_key, plan, next_state)
+        result_cache.put(cache_key, (body, headers, is_base64_encoded), len(body))
+        return create_raw_response(200, body, dict(headers, **{'X-Cache': 'MISS'}), is_base64_encoded)
         
+    except InvalidParameterError as e:
+        print(f"Invalid parameter: {str(e)}")
+        return create_response(400, {'error': str(e)})
     except ValueError as e:
         print(f"Date format error: {str(e)}")
         return create_response(400, {'error': 'Invalid date format. Use ISO 8601 format: YYYY-MM-DDTHH:MM:SSZ'})
@@ -272,4 +2166,4 @@ def lambda_handler(event, context):
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
-        return create_response(500, {'error': 'An unexpected error occurred', 'details': str(e), 'traceback': traceback.format_exc()})
\ No newline at end of file
+        return create_response(500, {'error': 'An unexpected error occurred', 'details': str(e), 'traceback': traceback.format_exc()})
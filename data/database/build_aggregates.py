@@ -0,0 +1,155 @@
+"""
+Aggregate Table Rebuild Script
+
+Recomputes the 'lazone-aggregates' dashboard rollups (article, think tank reference and
+broadClaims counts per day, month and source) from the articles in the 'lazone' table.
+
+The rollups are normally kept up to date by the DynamoDB Stream consumer in
+aws/lambda/aggregate_stream.py, which this script shares its row layout with. Run it once
+after creating the aggregates table, and again whenever the counts may have drifted (the
+stream is delivered at least once, so a retried batch can be counted twice). Rows that no
+longer have any articles are deleted; the claim co-occurrence rows written by claim_matrix.py
+are left alone. Avoid uploading articles while it runs, as their
+stream updates can be overwritten.
+
+Usage:
+    python3 build_aggregates.py [--segments 8] [--dry-run]
+
+Prerequisites:
+- AWS credentials configured with DynamoDB access
+- boto3 library installed
+- DynamoDB tables 'lazone' and 'lazone-aggregates' created in ap-southeast-2 region
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import os
+import sys
+import time
+import boto3
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# The stream consumer defines which rows an article is counted in
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'aws', 'lambda'))
+from aggregate_stream import get_rollup_keys
+
+# Initialize DynamoDB client in Sydney region
+region_name = 'ap-southeast-2'
+table_name = 'lazone'
+aggregates_table_name = 'lazone-aggregates'
+
+# Attributes that decide an article's rollup rows
+ROLLUP_ATTRIBUTES = ['source', 'dateTime', 'think_tank_ref', 'broadClaims']
+DEFAULT_SEGMENTS = 8
+# Claim co-occurrence rollups (ROLLUP_BUCKET_PREFIX in claim_matrix.py) share the table but are not rebuilt here
+CLAIM_ROLLUP_PREFIX = 'COOCCURRENCE#'
+
+def scan_segment(segment, total_segments):
+    """
+    Counts the rollup rows of every article in one segment of a parallel scan.
+
+    Args:
+        segment (int): Segment number
+        total_segments (int): Total number of segments
+
+    Returns:
+        tuple: (Counter of (bucket, key) -> count, number of articles scanned)
+    """
+    # Each thread gets its own session, as boto3 resources are not thread safe
+    table = boto3.session.Session().resource('dynamodb', region_name=region_name).Table(table_name)
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'ProjectionExpression': ', '.join(f'#a{index}' for index in range(len(ROLLUP_ATTRIBUTES))),
+        'ExpressionAttributeNames': {f'#a{index}': name for index, name in enumerate(ROLLUP_ATTRIBUTES)}
+    }
+    counts = Counter()
+    articles = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            counts.update(get_rollup_keys(item))
+            articles += 1
+        if 'LastEvaluatedKey' not in response:
+            return counts, articles
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def count_articles(total_segments):
+    """
+    Computes the rollup counts for the whole lazone table.
+
+    Args:
+        total_segments (int): Number of scan segments read at once
+
+    Returns:
+        tuple: (Counter of (bucket, key) -> count, number of articles scanned)
+    """
+    counts = Counter()
+    articles = 0
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        for segment_counts, segment_articles in executor.map(
+            lambda segment: scan_segment(segment, total_segments), range(total_segments)
+        ):
+            counts.update(segment_counts)
+            articles += segment_articles
+    return counts, articles
+
+def get_existing_rows(aggregates_table):
+    """
+    Lists the keys of every row currently in the aggregates table.
+
+    Returns:
+        set: (bucket, key) tuples
+    """
+    scan_kwargs = {'ProjectionExpression': '#b, #k', 'ExpressionAttributeNames': {'#b': 'bucket', '#k': 'key'}}
+    rows = set()
+    while True:
+        response = aggregates_table.scan(**scan_kwargs)
+        rows.update((item['bucket'], item['key']) for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return rows
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def write_aggregates(aggregates_table, counts, stale_rows):
+    """
+    Replaces the aggregates table contents with the recomputed counts.
+
+    Args:
+        aggregates_table: DynamoDB Table for lazone-aggregates
+        counts (Counter): (bucket, key) -> count
+        stale_rows (set): (bucket, key) rows to delete
+    """
+    # batch_writer groups requests into BatchWriteItem calls and resends unprocessed items
+    with aggregates_table.batch_writer() as batch:
+        for (bucket, key), count in counts.items():
+            batch.put_item(Item={'bucket': bucket, 'key': key, 'count': count})
+        for bucket, key in stale_rows:
+            batch.delete_item(Key={'bucket': bucket, 'key': key})
+
+def main():
+    """
+    Main function to rebuild the aggregates table.
+    """
+    parser = argparse.ArgumentParser(description='Rebuild the lazone-aggregates rollups from the lazone table')
+    parser.add_argument('--segments', type=int, default=DEFAULT_SEGMENTS, help='Parallel scan segments')
+    parser.add_argument('--dry-run', action='store_true', help='Count only, do not write the aggregates table')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    counts, articles = count_articles(max(1, args.segments))
+    print(f"Scanned {articles} articles into {len(counts)} aggregate rows")
+    if args.dry_run:
+        return
+
+    aggregates_table = boto3.resource('dynamodb', region_name=region_name).Table(aggregates_table_name)
+    stale_rows = {
+        row for row in get_existing_rows(aggregates_table)
+        if not row[0].startswith(CLAIM_ROLLUP_PREFIX) and row not in counts
+    }
+    write_aggregates(aggregates_table, counts, stale_rows)
+    print(f"Wrote {len(counts)} rows and deleted {len(stale_rows)} stale rows in {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Static Query Shard Build Script
+
+Precomputes the results of common article queries as static JSON files served with the
+frontend from S3/CloudFront, so these loads need no Lambda invocation or DynamoDB read:
+- all      - the newest articles
+- month    - one shard per publication month (startDate/endDate covering the whole month)
+- source   - one shard per source (sources parameter with a single source)
+- publisher - one shard per publisher (publisher parameter)
+
+Each shard holds what the API's first page returns for the same query: up to MAX_ITEMS
+articles, newest first, with the API's article attributes. File names carry a hash of
+their contents (e.g. source-foxnews.com.3f2a9c1d0b7e.json), so CloudFront and browsers
+can cache them indefinitely and a rebuild never serves a mix of old and new shards.
+CloudFront compresses them (gzip/brotli) at the edge.
+
+manifest.json maps each query to its shard file; fetchArticle in frontend/src/api.ts
+reads it and calls the API for queries that have no shard (or if a shard fails to load).
+Shards hold nothing newer than the manifest's latest dateTime, so fetchArticle treats a
+query without an endDate, or ending after latest (the search modal defaults to today), as
+covered by the shard. Articles uploaded since the build appear once the shards are
+rebuilt, which every frontend build in aws/cicd/buildspec.yml does.
+
+Usage:
+    python3 build_static_shards.py [--output ../../frontend/public/shards] [--file climate_news_data.json]
+
+Without --file, articles are read from the 'lazone' table. If the table cannot be read
+(no credentials or no DynamoDB read permission), an empty manifest is written instead, so
+the frontend build still succeeds and every query goes to the API.
+
+Prerequisites:
+- AWS credentials configured with DynamoDB read access (unless --file is used)
+- boto3 library installed
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+# Initialize DynamoDB client in Sydney region
+region_name = 'ap-southeast-2'
+table_name = 'lazone'
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'frontend', 'public', 'shards')
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+MAX_ITEMS = 128  # Same page size as the lazone lambda's default
+HASH_LENGTH = 12
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Attributes returned by the API (ARTICLE_FIELDS in the lazone lambda)
+ARTICLE_FIELDS = [
+    'articleId', 'title', 'dateTime', 'authors', 'image', 'body', 'source', 'url',
+    'uri', 'isDuplicate', 'clusterId', 'isCanonical', 'neighbors', 'broadClaims', 'subClaims', 'think_tank_ref'
+]
+
+# Publishers and their sources (filter_by_publisher in the lazone lambda)
+PUBLISHERS = {
+    'murdoch media': [
+        'theaustralian.com.au',
+        'news.com.au',
+        'heraldsun.com.au',
+        'skynews.com.au',
+        'dailytelegraph.com.au',
+        'couriermail.com.au',
+        'nypost.com',
+        'wsj.com',
+        'foxnews.com'
+    ]
+}
+
+def scan_articles():
+    """
+    Read every article from the lazone table.
+
+    Returns:
+        list: Articles with the API's attributes
+    """
+    table = boto3.resource('dynamodb', region_name=region_name).Table(table_name)
+    scan_kwargs = {
+        'ProjectionExpression': ', '.join(f'#a{index}' for index in range(len(ARTICLE_FIELDS))),
+        'ExpressionAttributeNames': {f'#a{index}': name for index, name in enumerate(ARTICLE_FIELDS)}
+    }
+    articles = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        articles.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return articles
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def load_articles(path):
+    """
+    Read articles from an upload file (JSON array or NDJSON, DynamoDB JSON or plain JSON).
+
+    Returns:
+        list: Articles with the API's attributes
+    """
+    from push_to_dynamodb import iter_articles, process_value
+
+    return [
+        {key: process_value(value) for key, value in article.items() if key in ARTICLE_FIELDS}
+        for article in iter_articles(path)
+    ]
+
+def valid_date_time(article):
+    """
+    Check that an article has a dateTime the API can range query.
+    """
+    try:
+        datetime.strptime(article.get('dateTime'), DATE_FORMAT)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def group_shards(articles):
+    """
+    Assign articles to the shards they belong to.
+
+    Args:
+        articles (list): Articles sorted newest first
+
+    Returns:
+        dict: Manifest key (e.g. 'month:2019-12', 'source:foxnews.com') -> newest MAX_ITEMS articles
+    """
+    shards = defaultdict(list)
+    publisher_of = {source: publisher for publisher, sources in PUBLISHERS.items() for source in sources}
+    for article in articles:
+        keys = ['all']
+        if valid_date_time(article):
+            keys.append(f"month:{article['dateTime'][:7]}")
+        if article.get('source'):
+            keys.append(f"source:{article['source']}")
+            if article['source'] in publisher_of:
+                keys.append(f"publisher:{publisher_of[article['source']]}")
+        for key in keys:
+            if len(shards[key]) < MAX_ITEMS:
+                shards[key].append(article)
+    return shards
+
+def shard_file_name(key, body):
+    """
+    Build the content-hashed file name of a shard.
+
+    Args:
+        key (str): Manifest key of the shard
+        body (bytes): Encoded shard contents
+
+    Returns:
+        str: File name such as 'publisher-murdoch-media.3f2a9c1d0b7e.json'
+    """
+    kind, _, value = key.partition(':')
+    name = '-'.join(part for part in (kind, value.replace(' ', '-').replace('/', '-')) if part)
+    return f"{name}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}.json"
+
+def write_shards(articles, output_dir):
+    """
+    Write the shard files and manifest, removing shard files from earlier builds.
+
+    Args:
+        articles (list): All articles
+        output_dir (str): Directory served as /shards by the frontend
+
+    Returns:
+        dict: Manifest written to manifest.json
+    """
+    def encode(value):
+        # DynamoDB numbers are Decimals; the API returns integral ones as integers
+        return json.dumps(
+            value, separators=(',', ':'), ensure_ascii=False,
+            default=lambda number: int(number) if number == number.to_integral_value() else float(number)
+        ).encode('utf-8')
+
+    articles = sorted(articles, key=lambda article: (article.get('dateTime') or '', str(article.get('articleId'))), reverse=True)
+    dated = [article['dateTime'] for article in articles if valid_date_time(article)]
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generatedAt': datetime.now(timezone.utc).strftime(DATE_FORMAT),
+        'latest': dated[0] if dated else None,
+        'limit': MAX_ITEMS,
+        'shards': {}
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    for key, shard_articles in sorted(group_shards(articles).items()):
+        body = encode(shard_articles)
+        file_name = shard_file_name(key, body)
+        with open(os.path.join(output_dir, file_name), 'wb') as shard_file:
+            shard_file.write(body)
+        manifest['shards'][key] = file_name
+
+    current = set(manifest['shards'].values())
+    for file_name in os.listdir(output_dir):
+        if file_name.endswith('.json') and file_name != MANIFEST_FILE and file_name not in current:
+            os.remove(os.path.join(output_dir, file_name))
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'wb') as manifest_file:
+        manifest_file.write(encode(manifest))
+    return manifest
+
+def main():
+    """
+    Main function to build the static query shards.
+    """
+    parser = argparse.ArgumentParser(description='Precompute common article queries as static shard files')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Output directory (default: frontend/public/shards)')
+    parser.add_argument('--file', help='Read articles from this file instead of the lazone table')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    if args.file:
+        articles = load_articles(args.file)
+    else:
+        try:
+            articles = scan_articles()
+        except (BotoCoreError, ClientError) as e:
+            # Shards are an optimisation: without table access (e.g. a build role without DynamoDB
+            # read permission) an empty manifest is written and fetchArticle uses the API for everything
+            print(f"Could not read the '{table_name}' table, writing an empty manifest: {e}")
+            articles = []
+    manifest = write_shards(articles, args.output)
+    print(f"Wrote {len(manifest['shards'])} shards for {len(articles)} articles to '{args.output}' "
+          f"in {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Claim Co-occurrence and Timeline Engine
+
+Builds an article x claim incidence matrix from the broadClaims/subClaims maps of the
+articles in the 'lazone' table and computes, for any set of sources and months:
+- claim frequencies (articles making each claim)
+- claim co-occurrence (articles making both claims of each pair)
+- monthly claim frequency series (the timeline)
+
+With X the sparse 0/1 incidence matrix of the selected articles, co-occurrence is X^T X
+(its diagonal holds the frequencies) and the timeline is P X, where P is the sparse
+month x article indicator matrix. Results are cached per filter set.
+
+All of these counts are sums over articles, so the script also stores them per
+(month, source) in the 'lazone-aggregates' table, together with an all sources row per
+month. The lazone lambda's claims endpoint adds up the rows a query covers instead of
+reading articles. Rerun the script after uploading articles to refresh them.
+
+Claims are labelled like the aggregate endpoint's metrics: 'broadClaims.<key>' and
+'subClaims.<key>'. Articles without a valid dateTime are left out.
+
+Usage:
+    matrix = ClaimMatrix()
+    for article in articles:
+        matrix.add(article['dateTime'][:7], article['source'], claim_labels(article))
+    summary = matrix.query(sources=['foxnews.com'], start_month='2019-09', end_month='2020-02')
+
+    python3 claim_matrix.py [--segments 8] [--top 10] [--dry-run]
+
+Prerequisites:
+- AWS credentials configured with DynamoDB access
+- boto3, numpy and scipy libraries installed
+- DynamoDB tables 'lazone' and 'lazone-aggregates' created in ap-southeast-2 region
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import re
+import time
+import boto3
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scipy import sparse
+
+from build_aggregates import get_existing_rows
+
+# Initialize DynamoDB client in Sydney region
+region_name = 'ap-southeast-2'
+table_name = 'lazone'
+aggregates_table_name = 'lazone-aggregates'
+
+CLAIM_FIELDS = ['broadClaims', 'subClaims']
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}")
+DEFAULT_SEGMENTS = 8
+
+# Rollup rows: bucket 'COOCCURRENCE#<source>' (or '#*' for all sources), key 'YYYY-MM'
+ROLLUP_BUCKET_PREFIX = 'COOCCURRENCE#'
+ALL_SOURCES = '*'
+PAIR_SEPARATOR = '|'
+
+def claim_labels(article):
+    """
+    Lists the claims made by an article.
+
+    Args:
+        article (dict): Article item with optional broadClaims/subClaims maps
+
+    Returns:
+        list: Claim labels such as 'broadClaims.gw_not_happening'
+    """
+    labels = []
+    for field in CLAIM_FIELDS:
+        claims = article.get(field)
+        if isinstance(claims, dict):
+            labels.extend(f"{field}.{claim}" for claim in claims)
+    return labels
+
+class ClaimMatrix:
+    """
+    Article x claim incidence matrix with co-occurrence and timeline queries.
+    """
+
+    def __init__(self):
+        self.labels = {}  # claim label -> column
+        self.indices = []  # claim columns of each article
+        self.months = []
+        self.sources = []
+        self._incidence = None
+        self._cache = {}
+
+    def add(self, month, source, labels):
+        """
+        Add an article to the matrix.
+
+        Args:
+            month (str): Publication month (YYYY-MM)
+            source (str): Article source
+            labels (list): Claim labels of the article (see claim_labels)
+        """
+        columns = {self.labels.setdefault(label, len(self.labels)) for label in labels}
+        self.indices.append(np.fromiter(sorted(columns), dtype=np.int32, count=len(columns)))
+        self.months.append(month)
+        self.sources.append(source)
+        self._incidence = None
+        self._cache.clear()
+
+    def claim_names(self):
+        """
+        Returns:
+            list: Claim labels in column order
+        """
+        return sorted(self.labels, key=self.labels.get)
+
+    def incidence(self):
+        """
+        Build the sparse 0/1 incidence matrix (one row per article, one column per claim).
+
+        Returns:
+            scipy.sparse.csr_matrix: Incidence matrix
+        """
+        if self._incidence is None:
+            lengths = np.fromiter((len(indices) for indices in self.indices), dtype=np.int64, count=len(self.indices))
+            indptr = np.concatenate(([0], np.cumsum(lengths)))
+            indices = np.concatenate(self.indices) if self.indices else np.zeros(0, dtype=np.int32)
+            self._incidence = sparse.csr_matrix(
+                (np.ones(len(indices), dtype=np.int64), indices, indptr), shape=(len(self.indices), len(self.labels))
+            )
+        return self._incidence
+
+    def select(self, sources=None, start_month=None, end_month=None):
+        """
+        Select articles by source and month range.
+
+        Args:
+            sources (list): Sources to include (all sources if None)
+            start_month (str): Optional inclusive first month (YYYY-MM)
+            end_month (str): Optional inclusive last month (YYYY-MM)
+
+        Returns:
+            numpy.ndarray: Boolean row mask
+        """
+        months = np.array(self.months)
+        mask = np.ones(len(months), dtype=bool)
+        if sources is not None:
+            mask &= np.isin(np.array(self.sources), list(sources))
+        if start_month:
+            mask &= months >= start_month
+        if end_month:
+            mask &= months <= end_month
+        return mask
+
+    def cooccurrence(self, mask=None):
+        """
+        Count the articles making each pair of claims.
+
+        Args:
+            mask (numpy.ndarray): Optional row mask from select()
+
+        Returns:
+            scipy.sparse.csr_matrix: Symmetric claim x claim counts; the diagonal holds claim frequencies
+        """
+        matrix = self.incidence() if mask is None else self.incidence()[mask]
+        return (matrix.T @ matrix).tocsr()
+
+    def timeline(self, mask=None):
+        """
+        Count the articles making each claim per month.
+
+        Args:
+            mask (numpy.ndarray): Optional row mask from select()
+
+        Returns:
+            tuple: (sorted list of months, months x claims numpy array of counts)
+        """
+        matrix = self.incidence() if mask is None else self.incidence()[mask]
+        months = np.array(self.months) if mask is None else np.array(self.months)[mask]
+        unique_months, rows = np.unique(months, return_inverse=True)
+        indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, np.arange(len(rows)))), shape=(len(unique_months), len(rows))
+        )
+        return [str(month) for month in unique_months], (indicator @ matrix).toarray()
+
+    def query(self, sources=None, start_month=None, end_month=None):
+        """
+        Summarise claim frequencies, co-occurrence and timeline for a filter set (cached).
+
+        Args:
+            sources (list): Sources to include (all sources if None)
+            start_month (str): Optional inclusive first month (YYYY-MM)
+            end_month (str): Optional inclusive last month (YYYY-MM)
+
+        Returns:
+            dict: {'articles': n, 'claims': {claim: n}, 'cooccurrence': {'a|b': n},
+                   'timeline': {month: {'articles': n, 'claims': {claim: n}}}}, the same
+                  shape as the claims endpoint's response
+        """
+        key = (tuple(sorted(sources)) if sources is not None else None, start_month, end_month)
+        if key not in self._cache:
+            mask = self.select(sources, start_month, end_month)
+            names = self.claim_names()
+            pairs = self._pairs(self.cooccurrence(mask), names)
+            months, series = self.timeline(mask)
+            monthly_articles = np.bincount(np.searchsorted(months, np.array(self.months)[mask]), minlength=len(months))
+            self._cache[key] = {
+                'articles': int(mask.sum()),
+                'claims': {
+                    name: pairs[f"{name}{PAIR_SEPARATOR}{name}"]
+                    for name in names if f"{name}{PAIR_SEPARATOR}{name}" in pairs
+                },
+                'cooccurrence': pairs,
+                'timeline': {
+                    month: {
+                        'articles': int(monthly_articles[row]),
+                        'claims': {names[column]: int(series[row, column]) for column in np.flatnonzero(series[row])}
+                    }
+                    for row, month in enumerate(months)
+                }
+            }
+        return self._cache[key]
+
+    @staticmethod
+    def _pairs(counts, names):
+        # Upper triangle only: pairs are stored once, with their labels in sorted order
+        upper = sparse.triu(counts).tocoo()
+        pairs = {}
+        for row, column, count in zip(upper.row, upper.col, upper.data):
+            first, second = sorted((names[row], names[column]))
+            pairs[f"{first}{PAIR_SEPARATOR}{second}"] = int(count)
+        return pairs
+
+    def rollups(self):
+        """
+        Compute the additive per (month, source) rollups stored in lazone-aggregates.
+
+        Each month also gets an all sources row (source '*').
+
+        Returns:
+            list: Items with bucket, key (month), articles and pairs ('a|b' -> count, 'a|a' for frequencies)
+        """
+        if not self.indices:
+            return []
+        names = self.claim_names()
+        months = np.array(self.months)
+        sources = np.array(self.sources)
+        items = []
+        month_names, month_ids = np.unique(months, return_inverse=True)
+        for source_names, source_ids in (np.unique(sources, return_inverse=True), ([ALL_SOURCES], np.zeros(len(months), dtype=np.int64))):
+            # Sort rows by (source, month) so each group is one contiguous slice of the matrix
+            rows = source_ids * len(month_names) + month_ids
+            order = np.argsort(rows, kind='stable')
+            matrix = self.incidence()[order]
+            groups, starts = np.unique(rows[order], return_index=True)
+            stops = np.append(starts[1:], len(order))
+            for group, start, stop in zip(groups, starts, stops):
+                block = matrix[start:stop]
+                items.append({
+                    'bucket': f"{ROLLUP_BUCKET_PREFIX}{source_names[group // len(month_names)]}",
+                    'key': str(month_names[group % len(month_names)]),
+                    'articles': int(stop - start),
+                    'pairs': self._pairs((block.T @ block).tocsr(), names)
+                })
+        return items
+
+def scan_segment(segment, total_segments):
+    """
+    Reads the month, source and claims of every article in one segment of a parallel scan.
+
+    Args:
+        segment (int): Segment number
+        total_segments (int): Total number of segments
+
+    Returns:
+        list: (month, source, claim labels) tuples
+    """
+    # Each thread gets its own session, as boto3 resources are not thread safe
+    table = boto3.session.Session().resource('dynamodb', region_name=region_name).Table(table_name)
+    attributes = ['dateTime', 'source'] + CLAIM_FIELDS
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'ProjectionExpression': ', '.join(f'#a{index}' for index in range(len(attributes))),
+        'ExpressionAttributeNames': {f'#a{index}': name for index, name in enumerate(attributes)}
+    }
+    articles = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            date_time = item.get('dateTime')
+            if isinstance(date_time, str) and MONTH_PATTERN.match(date_time):
+                articles.append((date_time[:7], item.get('source') or 'unknown', claim_labels(item)))
+        if 'LastEvaluatedKey' not in response:
+            return articles
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def load_matrix(total_segments):
+    """
+    Build the claim matrix from the lazone table.
+
+    Args:
+        total_segments (int): Number of scan segments read at once
+
+    Returns:
+        ClaimMatrix: Matrix of every article with a valid dateTime
+    """
+    matrix = ClaimMatrix()
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        for articles in executor.map(lambda segment: scan_segment(segment, total_segments), range(total_segments)):
+            for month, source, labels in articles:
+                matrix.add(month, source, labels)
+    return matrix
+
+def write_rollups(items):
+    """
+    Replace the co-occurrence rollup rows in lazone-aggregates.
+
+    Args:
+        items (list): Rows returned by ClaimMatrix.rollups()
+
+    Returns:
+        int: Number of stale rows deleted
+    """
+    aggregates_table = boto3.resource('dynamodb', region_name=region_name).Table(aggregates_table_name)
+    current = {(item['bucket'], item['key']) for item in items}
+    stale_rows = {
+        row for row in get_existing_rows(aggregates_table)
+        if row[0].startswith(ROLLUP_BUCKET_PREFIX) and row not in current
+    }
+    with aggregates_table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+        for bucket, key in stale_rows:
+            batch.delete_item(Key={'bucket': bucket, 'key': key})
+    return len(stale_rows)
+
+def main():
+    """
+    Main function to compute and store the claim co-occurrence rollups.
+    """
+    parser = argparse.ArgumentParser(description='Compute claim co-occurrence and timeline rollups')
+    parser.add_argument('--segments', type=int, default=DEFAULT_SEGMENTS, help='Parallel scan segments')
+    parser.add_argument('--top', type=int, default=10, help='Number of most frequent claim pairs to print')
+    parser.add_argument('--dry-run', action='store_true', help='Compute only, do not write the aggregates table')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    matrix = load_matrix(max(1, args.segments))
+    summary = matrix.query()
+    print(f"Loaded {summary['articles']} articles with {len(matrix.labels)} distinct claims in {time.time() - start_time:.1f} seconds")
+
+    pairs = [(pair, count) for pair, count in summary['cooccurrence'].items() if len(set(pair.split(PAIR_SEPARATOR))) == 2]
+    for pair, count in sorted(pairs, key=lambda entry: -entry[1])[:args.top]:
+        print(f"{count:8d}  {pair.replace(PAIR_SEPARATOR, ' + ')}")
+
+    items = matrix.rollups()
+    if args.dry_run:
+        print(f"Computed {len(items)} rollup rows")
+        return
+    deleted = write_rollups(items)
+    print(f"Wrote {len(items)} rollup rows and deleted {deleted} stale rows in {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
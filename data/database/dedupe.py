@@ -0,0 +1,222 @@
+"""
+Near-Duplicate Article Detection
+
+Finds syndicated copies of the same story (e.g. one wire article republished by
+news.com.au, heraldsun.com.au and dailytelegraph.com.au) using word shingles, MinHash
+signatures and locality-sensitive hashing (LSH) over the article body.
+
+Each body is reduced to a fixed-size MinHash signature, so memory is O(articles) and
+candidate pairs come only from articles that share an LSH band bucket, which keeps the
+work sub-quadratic. Candidates are confirmed by the estimated Jaccard similarity of their
+signatures before being merged into clusters with union-find.
+
+Every article in a cluster of two or more is mapped to the key of the cluster's canonical
+article (the one with the lowest rank, e.g. the earliest publication), which doubles as
+the cluster id.
+
+Usage:
+    index = DuplicateIndex()
+    for article in articles:
+        index.add(article['uri'], article['body'], rank=(article['dateTime'], article['uri']))
+    clusters = index.clusters()  # key -> canonical key
+
+    # Annotate a collector output file with clusterId/isCanonical (keyed by uri)
+    python3 dedupe.py BushfireRelatedArticlesMERGED.json [--output FILE] [--drop-duplicates]
+
+push_to_dynamodb.py uses the index at ingestion time (--duplicates link|skip).
+
+Prerequisites:
+- numpy library installed
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import json
+import re
+import zlib
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# MinHash/LSH settings: 16 bands of 8 rows puts the LSH threshold near 0.7 Jaccard
+SHINGLE_SIZE = 5  # Words per shingle
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+SIMILARITY_THRESHOLD = 0.8  # Minimum estimated Jaccard similarity to treat articles as duplicates
+MIN_TOKENS = 20  # Shorter bodies are too small to compare reliably and are never clustered
+SEED = 42
+
+class DuplicateIndex:
+    """
+    Collects MinHash signatures for articles and groups near-duplicates.
+    """
+
+    def __init__(self, num_perm=NUM_PERMUTATIONS, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD,
+                 shingle_size=SHINGLE_SIZE, seed=SEED):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd a, in wrapping uint64 arithmetic
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.band_weights = rng.integers(1, 2 ** 63, size=num_perm // bands, dtype=np.uint64)
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.keys = []
+        self.ranks = []
+        self.signatures = []
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Article body
+
+        Returns:
+            numpy.ndarray: uint32 signature, or None if the text is too short to compare
+        """
+        tokens = TOKEN_PATTERN.findall((text or '').lower())
+        if len(tokens) < max(MIN_TOKENS, self.shingle_size):
+            return None
+
+        # Hash words (CRC32 keeps signatures identical between runs), then combine each run of
+        # shingle_size word hashes into one 64-bit shingle hash
+        ids = np.fromiter(map(zlib.crc32, map(str.encode, tokens)), dtype=np.uint64, count=len(tokens))
+        count = len(ids) - self.shingle_size + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            with np.errstate(over='ignore'):
+                shingles = shingles * np.uint64(1000003) + ids[offset:offset + count]
+        shingles = np.unique(shingles)
+
+        with np.errstate(over='ignore'):
+            hashes = (np.multiply.outer(shingles, self.a) + self.b) >> np.uint64(32)
+        return hashes.min(axis=0).astype(np.uint32)
+
+    def add(self, key, text, rank=None):
+        """
+        Add an article to the index.
+
+        Args:
+            key: Identifier returned in clusters() (e.g. articleId or uri)
+            text: Article body
+            rank: Sort key used to pick the canonical article (lowest wins); defaults to key
+
+        Returns:
+            bool: True if the article could be signed, False if its body was too short
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self.keys.append(key)
+        self.ranks.append(key if rank is None else rank)
+        self.signatures.append(signature)
+        return True
+
+    def clusters(self):
+        """
+        Group indexed articles into near-duplicate clusters.
+
+        Returns:
+            dict: key -> canonical key for every article in a cluster of two or more
+        """
+        if len(self.signatures) < 2:
+            return {}
+        signatures = np.vstack(self.signatures)
+        parent = list(range(len(self.keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows = signatures.shape[1] // self.bands
+        for band in range(self.bands):
+            # Hash each band to one 64-bit bucket key; collisions are caught by the similarity check
+            band_rows = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+            with np.errstate(over='ignore'):
+                bucket_keys = (band_rows * self.band_weights).sum(axis=1, dtype=np.uint64)
+            order = np.argsort(bucket_keys, kind='stable')
+            sorted_keys = bucket_keys[order]
+
+            # Compare every bucket member with the bucket's first member (linear per band)
+            starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+            first = order[np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))]
+            members = ~starts
+            left, right = first[members], order[members]
+            if not len(left):
+                continue
+            similarity = (signatures[left] == signatures[right]).mean(axis=1)
+            for i, j in zip(left[similarity >= self.threshold], right[similarity >= self.threshold]):
+                root_i, root_j = find(int(i)), find(int(j))
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+        groups = {}
+        for i in range(len(self.keys)):
+            groups.setdefault(find(i), []).append(i)
+
+        result = {}
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            canonical = self.keys[min(members, key=lambda i: self.ranks[i])]
+            for i in members:
+                result[self.keys[i]] = canonical
+        return result
+
+def annotate_articles(articles, drop_duplicates=False):
+    """
+    Mark near-duplicate articles in a list of collected articles (collector output format).
+    
+    Articles in a cluster get clusterId (the canonical article's uri) and isCanonical.
+    
+    Args:
+        articles: List of article dictionaries with 'uri', 'body' and 'dateTime'
+        drop_duplicates: Remove non-canonical articles instead of only marking them
+        
+    Returns:
+        list: Annotated articles
+    """
+    index = DuplicateIndex()
+    for article in articles:
+        index.add(article['uri'], article.get('body', ''), rank=(article.get('dateTime', ''), article['uri']))
+    clusters = index.clusters()
+
+    annotated = []
+    for article in articles:
+        canonical_uri = clusters.get(article['uri'])
+        if canonical_uri is not None:
+            if drop_duplicates and canonical_uri != article['uri']:
+                continue
+            article = dict(article, clusterId=canonical_uri, isCanonical=canonical_uri == article['uri'])
+        annotated.append(article)
+
+    print(f"Found {len(clusters)} articles in {len(set(clusters.values()))} near-duplicate clusters")
+    return annotated
+
+def main():
+    """
+    Annotate (or filter) near-duplicates in a collected articles JSON file.
+    """
+    parser = argparse.ArgumentParser(description='Detect near-duplicate articles with MinHash/LSH')
+    parser.add_argument('input', help='JSON file of collected articles')
+    parser.add_argument('--output', help='Output file (default: overwrite the input)')
+    parser.add_argument('--drop-duplicates', action='store_true', help='Keep only the canonical article of each cluster')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as input_file:
+        articles = json.load(input_file)
+
+    annotated = annotate_articles(articles, args.drop_duplicates)
+
+    with open(args.output or args.input, 'w', encoding='utf-8') as output_file:
+        json.dump(annotated, output_file, indent=4, ensure_ascii=False)
+    print(f"Saved {len(annotated)} of {len(articles)} articles to '{args.output or args.input}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Columnar Corpus Snapshot Export
+
+Writes the article corpus to a columnar snapshot for offline analysis and benchmarking,
+and loads it back. Parsing the indented JSON files (or the DynamoDB JSON mock data)
+takes far longer and several times the memory of reading the same articles as columns.
+
+Layout of a snapshot directory:
+    manifest.json                      - format, columns, claim keys and rows per month
+    month=YYYY-MM/articles.arrow       - one file per publication month (month=unknown
+                                         for articles without a valid dateTime)
+
+Columns:
+- articleId, title, dateTime (UTC timestamp), authors, image, body, source, url, uri,
+  isDuplicate, clusterId, isCanonical, neighbors, think_tank_ref
+- one boolean column per claim key, named like the API metrics ('broadClaims.<key>',
+  'subClaims.<key>'); the claim sentences are not exported
+- body, title, authors, source and think_tank_ref are dictionary encoded, so syndicated
+  copies and repeated sources are stored once per file
+
+Export reads the input file twice, so the corpus is never held in memory: the first pass
+collects the claim keys (which fix the snapshot's columns), the second streams articles
+into one Arrow IPC stream per month in batches of at most BUFFERED_ROWS articles across
+all months. Each month is then rewritten as its snapshot file, one month at a time.
+
+The default format is the Arrow IPC file format without compression, which load_snapshot
+memory-maps: columns are read straight from the page cache and only the columns and
+months asked for are touched. --format parquet writes smaller zstd-compressed Parquet
+files instead (for archiving or other tools), which have to be decompressed on load.
+
+Usage:
+    python3 export_snapshot.py [--file climate_news_data.json] [--output snapshot] [--format arrow|parquet]
+
+    from export_snapshot import load_snapshot
+    table = load_snapshot('snapshot', columns=['source', 'broadClaims.impacts_not_bad'], months=['2019-12'])
+
+The input file may be a JSON array or NDJSON, in DynamoDB JSON (like the upload file) or
+plain JSON (like the collector output).
+
+Prerequisites:
+- pyarrow library installed
+
+Author: Oisin Aeonn
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from push_to_dynamodb import iter_articles, process_value
+
+CLAIM_FIELDS = ['broadClaims', 'subClaims']
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+UNKNOWN_MONTH = 'unknown'
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_VERSION = 1
+
+# Article attributes and their column types (claim columns are added per snapshot)
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+ARTICLE_COLUMNS = [
+    ('articleId', pa.int64()),
+    ('title', DICTIONARY_STRING),
+    ('dateTime', pa.timestamp('s', tz='UTC')),
+    ('authors', DICTIONARY_STRING),
+    ('image', pa.string()),
+    ('body', DICTIONARY_STRING),
+    ('source', DICTIONARY_STRING),
+    ('url', pa.string()),
+    ('uri', pa.string()),
+    ('isDuplicate', pa.bool_()),
+    ('clusterId', pa.string()),
+    ('isCanonical', pa.bool_()),
+    ('neighbors', pa.list_(pa.int64())),
+    ('think_tank_ref', DICTIONARY_STRING),
+]
+FILE_EXTENSIONS = {'arrow': 'arrow', 'parquet': 'parquet'}
+BUFFERED_ROWS = 10000  # Articles held in memory (across all months) before they are spilled
+
+def parse_date_time(value):
+    """
+    Parse an article dateTime.
+
+    Args:
+        value (str): ISO 8601 dateTime, or None
+
+    Returns:
+        datetime: Timezone-aware UTC datetime, or None if missing or invalid
+    """
+    try:
+        return datetime.strptime(value, DATE_FORMAT).replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+def read_claim_keys(articles):
+    """
+    Collect the claim keys used by the corpus (the export's first pass).
+
+    Args:
+        articles: Iterable of articles in DynamoDB JSON or plain JSON
+
+    Returns:
+        dict: Claim field -> set of claim keys
+    """
+    claim_keys = {field: set() for field in CLAIM_FIELDS}
+    for article in articles:
+        for field in CLAIM_FIELDS:
+            claims = process_value(article[field]) if field in article else None
+            if isinstance(claims, dict):
+                claim_keys[field].update(claims)
+    return claim_keys
+
+def plain_article(article):
+    """
+    Convert an article to plain values with a parsed dateTime.
+
+    Args:
+        article (dict): Article in DynamoDB JSON or plain JSON
+
+    Returns:
+        tuple: (publication month or 'unknown', plain article)
+    """
+    article = {key: process_value(value) for key, value in article.items()}
+    date_time = parse_date_time(article.get('dateTime'))
+    article['dateTime'] = date_time
+    return (date_time.strftime("%Y-%m") if date_time else UNKNOWN_MONTH), article
+
+class MonthSpill:
+    """
+    One month's articles, written to an Arrow IPC stream as they arrive.
+
+    Every batch carries its own dictionaries, which the stream format allows but the
+    snapshot's file formats do not, so a month is rewritten once all of it has been read.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.sink = pa.OSFile(path, 'wb')
+        self.writer = pa.ipc.new_stream(self.sink, schema)
+
+    def write(self, articles):
+        """
+        Append plain articles as one record batch.
+        """
+        self.writer.write_table(to_table(articles, self.schema))
+
+    def read(self):
+        """
+        Close the stream and read the month back with unified dictionaries.
+
+        Returns:
+            pyarrow.Table: The month's articles as a single chunk
+        """
+        self.writer.close()
+        self.sink.close()
+        with pa.OSFile(self.path, 'rb') as source:
+            table = pa.ipc.open_stream(source).read_all().combine_chunks()
+        os.remove(self.path)
+        return table
+
+def get_schema(claim_keys):
+    """
+    Build the snapshot schema for a set of claim keys.
+
+    Args:
+        claim_keys (dict): Claim field -> set of claim keys
+
+    Returns:
+        pyarrow.Schema: Article columns followed by one boolean column per claim
+    """
+    fields = [pa.field(name, column_type) for name, column_type in ARTICLE_COLUMNS]
+    for field in CLAIM_FIELDS:
+        fields.extend(pa.field(f"{field}.{claim}", pa.bool_()) for claim in sorted(claim_keys[field]))
+    return pa.schema(fields)
+
+def to_table(articles, schema):
+    """
+    Convert a month of articles to an Arrow table.
+
+    Args:
+        articles (list): Plain articles (from plain_article)
+        schema (pyarrow.Schema): Snapshot schema
+
+    Returns:
+        pyarrow.Table: Articles in snapshot column layout
+    """
+    columns = []
+    for field in schema:
+        if '.' in field.name and field.name.split('.', 1)[0] in CLAIM_FIELDS:
+            claim_field, claim = field.name.split('.', 1)
+            values = [claim in (article.get(claim_field) or {}) for article in articles]
+        elif field.name == 'clusterId':
+            # Ingestion uses the canonical articleId, the collector the canonical uri
+            values = [None if article.get('clusterId') is None else str(article['clusterId']) for article in articles]
+        else:
+            values = [article.get(field.name) for article in articles]
+
+        if pa.types.is_dictionary(field.type):
+            columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            columns.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+def write_snapshot(articles, claim_keys, output_dir, output_format='arrow'):
+    """
+    Write articles to a snapshot directory (the export's second pass).
+
+    Articles are spilled per month in batches, so memory use is bounded by BUFFERED_ROWS
+    articles while reading and by the largest month while writing the snapshot files.
+
+    Args:
+        articles: Iterable of articles in DynamoDB JSON or plain JSON
+        claim_keys (dict): Claim field -> set of claim keys (from read_claim_keys)
+        output_dir (str): Snapshot directory (created if needed)
+        output_format (str): 'arrow' (memory-mappable) or 'parquet'
+
+    Returns:
+        dict: Manifest written to manifest.json
+    """
+    schema = get_schema(claim_keys)
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'format': output_format,
+        'columns': schema.names,
+        'claims': {field: sorted(claim_keys[field]) for field in CLAIM_FIELDS},
+        'months': {}
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    spill_dir = tempfile.mkdtemp(prefix='.spill-', dir=output_dir)
+    try:
+        spills = {}
+        buffered = {}
+        buffered_rows = 0
+        for article in articles:
+            month, article = plain_article(article)
+            buffered.setdefault(month, []).append(article)
+            buffered_rows += 1
+            if buffered_rows >= BUFFERED_ROWS:
+                spill_months(buffered, spills, spill_dir, schema)
+                buffered_rows = 0
+        spill_months(buffered, spills, spill_dir, schema)
+
+        for month in sorted(spills):
+            manifest['months'][month] = write_month(spills[month].read(), month, output_dir, output_format)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    return manifest
+
+def spill_months(buffered, spills, spill_dir, schema):
+    """
+    Write every month's buffered articles to its spill and empty the buffers.
+
+    Args:
+        buffered (dict): Month -> list of plain articles (cleared)
+        spills (dict): Month -> MonthSpill (new months are added)
+        spill_dir (str): Directory for the spill streams
+        schema (pyarrow.Schema): Snapshot schema
+    """
+    for month, month_articles in buffered.items():
+        if month not in spills:
+            spills[month] = MonthSpill(os.path.join(spill_dir, f"{month}.arrows"), schema)
+        spills[month].write(month_articles)
+    buffered.clear()
+
+def write_month(table, month, output_dir, output_format):
+    """
+    Write one month's snapshot file.
+
+    Args:
+        table (pyarrow.Table): The month's articles
+        month (str): Month (YYYY-MM or 'unknown')
+        output_dir (str): Snapshot directory
+        output_format (str): 'arrow' or 'parquet'
+
+    Returns:
+        dict: The month's manifest entry (path and rows)
+    """
+    relative_path = f"month={month}/articles.{FILE_EXTENSIONS[output_format]}"
+    path = os.path.join(output_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if output_format == 'parquet':
+        pq.write_table(table, path, compression='zstd', use_dictionary=True)
+    else:
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return {'path': relative_path, 'rows': table.num_rows}
+
+def load_snapshot(snapshot_dir, columns=None, months=None):
+    """
+    Load a snapshot, memory-mapping Arrow files.
+
+    Args:
+        snapshot_dir (str): Snapshot directory written by write_snapshot
+        columns (list): Optional columns to load (all columns if None)
+        months (list): Optional months (YYYY-MM or 'unknown') to load (all months if None)
+
+    Returns:
+        pyarrow.Table: Articles of the selected months; each month is one chunk
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+    selected = sorted(manifest['months'] if months is None else set(months) & set(manifest['months']))
+
+    tables = []
+    for month in selected:
+        path = os.path.join(snapshot_dir, manifest['months'][month]['path'])
+        if manifest['format'] == 'parquet':
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            # Zero copy: the table's buffers point into the mapped file
+            table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            if columns is not None:
+                table = table.select(columns)
+        tables.append(table)
+
+    if not tables:
+        schema = pa.schema([field for field in get_schema({
+            field: set(manifest['claims'][field]) for field in CLAIM_FIELDS
+        }) if columns is None or field.name in columns])
+        return schema.empty_table()
+    return pa.concat_tables(tables)
+
+def snapshot_articles(table):
+    """
+    Convert snapshot rows back to article dictionaries (the lazone table's item layout).
+
+    Claim maps are rebuilt with empty sentences, as in the API's graph mode.
+
+    Args:
+        table (pyarrow.Table): Table returned by load_snapshot
+
+    Yields:
+        dict: Article with the attributes present in the table
+    """
+    claim_columns = [name for name in table.column_names if name.split('.', 1)[0] in CLAIM_FIELDS and '.' in name]
+    for batch in table.to_batches():
+        for row in batch.to_pylist():
+            article = {}
+            for name, value in row.items():
+                if name in claim_columns or value is None:
+                    continue
+                if name == 'dateTime':
+                    value = value.strftime(DATE_FORMAT)
+                article[name] = value
+            for name in claim_columns:
+                claim_field, claim = name.split('.', 1)
+                if row[name]:
+                    article.setdefault(claim_field, {})[claim] = ''
+            yield article
+
+def main():
+    """
+    Export an articles JSON file to a columnar snapshot.
+    """
+    parser = argparse.ArgumentParser(description='Export the article corpus to a columnar snapshot')
+    parser.add_argument('--file', default='climate_news_data.json', help='JSON array or NDJSON articles file')
+    parser.add_argument('--output', default='snapshot', help='Snapshot directory')
+    parser.add_argument('--format', choices=sorted(FILE_EXTENSIONS), default='arrow', help='File format (default: arrow)')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    claim_keys = read_claim_keys(iter_articles(args.file))
+    manifest = write_snapshot(iter_articles(args.file), claim_keys, args.output, args.format)
+    total = sum(month['rows'] for month in manifest['months'].values())
+    print(f"Exported {total} articles in {len(manifest['months'])} months with "
+          f"{len(manifest['columns'])} columns to '{args.output}' in {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -3,32 +3,287 @@ DynamoDB Data Upload Script
 
 This script loads climate news data from a JSON file and uploads it to AWS DynamoDB.
 It includes data processing, error handling, and upload verification functionality.
+Each article body is also tokenized into the 'lazone-postings' inverted index used by
+the API search parameter. When an article that is already in the table is uploaded again,
+its stored body is read first and the postings of tokens it no longer contains are deleted,
+so search does not keep matching the old text. Stopwords (STOPWORDS) are not indexed;
+postings written for them before they were excluded are removed by an upload with
+--no-resume.
+
+By default items are written with BatchWriteItem (25 put requests per call) from a pool
+of worker threads. Use --mode serial for the original one put_item per article upload.
+
+The input file is read incrementally, either as a JSON array of articles or as
+newline-delimited JSON (one article per line), so memory use does not grow with file size.
+
+Batch uploads are resumable. A checkpoint journal records the offset in the input file
+below which every article (and its postings) has been written, so a rerun after a crash
+continues from there. Each article also carries a contentHash attribute, and a local
+manifest of articleId -> contentHash lets reruns skip articles that have not changed.
+
+Syndicated copies of the same story can be detected before upload (see dedupe.py). With
+--duplicates link every article in a near-duplicate cluster is stored with clusterId (the
+articleId of the cluster's earliest article) and isCanonical; with --duplicates skip only
+the canonical article of each cluster is uploaded. This reads the input file twice.
+
+With --neighbors K each article is stored with a 'neighbors' list: the articleIds of its K
+most similar articles by TF-IDF over body and claim keys (see similarity.py). The graph
+view draws these as edges instead of searching for neighbours in the browser.
+
+Each article is also stored with marker attributes (claim_<key> per broad claim,
+hasThinkTank) that key the sparse indexes the API queries for the broadClaims and
+thinkTankRef filters. Articles uploaded before the markers existed get a new contentHash,
+so rerunning the upload adds them.
+
+Stopwords get no postings. Postings tables written before that still hold stopword
+postings, which --purge-stopword-postings deletes once (it uploads nothing).
+
+Usage:
+    python3 push_to_dynamodb.py [--file climate_news_data.json] [--mode batch|serial] [--workers 8]
+                                [--checkpoint FILE] [--manifest FILE] [--no-resume]
+                                [--duplicates keep|link|skip] [--neighbors K]
+    python3 push_to_dynamodb.py --purge-stopword-postings
 
 Prerequisites:
 - AWS credentials configured with DynamoDB access
 - boto3 library installed
+- numpy library installed (only for --duplicates link/skip and --neighbors)
+- scipy library installed (only for --neighbors)
 - Valid climate_news_data.json file in the same directory
-- DynamoDB table 'lazone' created in ap-southeast-2 region
+- DynamoDB tables 'lazone' and 'lazone-postings' created in ap-southeast-2 region
 
 Author: Oisin Aeonn
 Last Updated: 30/10/2024
 """
 
+import argparse
+import hashlib
+import itertools
 import json
+import os
+import random
+import re
+import threading
+import time
 import boto3
-from botocore.exceptions import ClientError
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeSerializer
 
 # Initialize DynamoDB client in Sydney region
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
+region_name = 'ap-southeast-2'
+dynamodb = boto3.resource('dynamodb', region_name=region_name)
 
 # Configure target DynamoDB table
 table_name = 'lazone'
 table = dynamodb.Table(table_name)
 
-# Load JSON data from local file
-with open('climate_news_data.json', 'r') as file:
-    data = json.load(file)
+# Configure inverted index table (token -> articleId postings with word positions)
+postings_table_name = 'lazone-postings'
+postings_table = dynamodb.Table(postings_table_name)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Words in nearly every article are not indexed (must match STOPWORDS in aws/lambda/lambda_function.py)
+STOPWORDS = frozenset([
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+    'can', 'could', 'did', 'do', 'for', 'from', 'had', 'has', 'have', 'he', 'her', 'his', 'i', 'if',
+    'in', 'into', 'is', 'it', 'its', 'more', 'not', 'of', 'on', 'or', 'our', 'said', 'she', 'so',
+    'than', 'that', 'the', 'their', 'them', 'there', 'these', 'they', 'this', 'those', 'to', 'up',
+    'was', 'we', 'were', 'what', 'when', 'which', 'who', 'will', 'with', 'would', 'you'
+])
+
+# Marker attributes keying the sparse claim and think tank indexes (see lazone-template.yaml)
+CLAIM_MARKER_PREFIX = 'claim_'
+THINK_TANK_MARKER = 'hasThinkTank'
+MARKER_VALUE = 'true'
+
+# Batch upload settings
+BATCH_SIZE = 25  # DynamoDB BatchWriteItem request limit
+DEFAULT_WORKERS = 8
+MAX_BATCH_RETRIES = 10  # Attempts for unprocessed items before they are counted as failed
+MIN_BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 5
+PROGRESS_INTERVAL_SECONDS = 5
+
+# Streaming reader settings
+READ_CHUNK_SIZE = 1 << 20  # Characters read from the input file at a time
+
+# Stored articles are read this many at a time to find stale postings
+GET_BATCH_SIZE = 100  # DynamoDB BatchGetItem request limit
+
+# Checkpoint settings
+DEFAULT_MANIFEST = 'upload_manifest.json'
+CHECKPOINT_INTERVAL_SECONDS = 30
+
+def iter_articles(path):
+    """
+    Yield articles one at a time from a JSON array or NDJSON file.
+    
+    The file is read in chunks and decoded with JSONDecoder.raw_decode, so only the
+    article being decoded (plus one chunk) is held in memory.
+    
+    Args:
+        path: Path to a JSON array or newline-delimited JSON file
+        
+    Yields:
+        dict: Article in DynamoDB JSON format
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as file:
+        buffer = ''
+        position = 0
+        eof = False
+        in_array = None
+
+        def fill():
+            # Drop consumed text and append the next chunk; returns False at end of file
+            nonlocal buffer, position, eof
+            chunk = file.read(READ_CHUNK_SIZE)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+            return not eof
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or not fill():
+                    return
+
+        skip_whitespace()
+        if position < len(buffer) and buffer[position] == '[':
+            in_array = True
+            position += 1
+        else:
+            in_array = False
+
+        while True:
+            skip_whitespace()
+            if position >= len(buffer):
+                if in_array:
+                    raise ValueError(f"Unexpected end of file in JSON array: {path}")
+                return
+            if in_array and buffer[position] == ']':
+                return
+
+            while True:
+                try:
+                    article, end = decoder.raw_decode(buffer, position)
+                    # A value ending exactly at the buffer edge may be truncated
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+            position = end
+            yield article
+
+            if in_array:
+                skip_whitespace()
+                if position < len(buffer) and buffer[position] == ',':
+                    position += 1
+                elif position >= len(buffer) or buffer[position] != ']':
+                    raise ValueError(f"Expected ',' or ']' after article in {path}")
+
+def find_duplicates(path):
+    """
+    Cluster near-duplicate articles in an input file by the MinHash similarity of their bodies.
+    
+    Args:
+        path: Path to a JSON array or NDJSON file of articles in DynamoDB JSON format
+        
+    Returns:
+        dict: articleId -> articleId of the cluster's canonical (earliest published) article,
+              for articles in clusters of two or more
+    """
+    from dedupe import DuplicateIndex  # numpy is only needed when deduplicating
+
+    index = DuplicateIndex()
+    for item in iter_articles(path):
+        if 'articleId' not in item:
+            continue
+        article_id = process_value(item['articleId'])
+        index.add(article_id, process_value(item.get('body', {'S': ''})),
+                  rank=(process_value(item.get('dateTime', {'S': ''})), article_id))
+    clusters = index.clusters()
+    print(f"Found {len(clusters)} articles in {len(set(clusters.values()))} near-duplicate clusters")
+    return clusters
+
+def apply_duplicates(data, clusters, mode):
+    """
+    Link or drop near-duplicate articles as they stream past.
+    
+    Args:
+        data: Iterable of articles in DynamoDB JSON format
+        clusters: Mapping from find_duplicates()
+        mode: 'link' to add clusterId/isCanonical attributes, 'skip' to drop non-canonical articles
+        
+    Yields:
+        dict: Articles in DynamoDB JSON format
+    """
+    for item in data:
+        article_id = process_value(item['articleId']) if 'articleId' in item else None
+        canonical_id = clusters.get(article_id)
+        if canonical_id is not None:
+            if mode == 'skip' and canonical_id != article_id:
+                continue
+            if mode == 'link':
+                item = dict(item, clusterId={'N': str(canonical_id)}, isCanonical={'BOOL': canonical_id == article_id})
+        yield item
+
+def find_neighbors(path, k, clusters=None, skip_duplicates=False):
+    """
+    Compute each article's most similar articles in an input file.
+    
+    Args:
+        path: Path to a JSON array or NDJSON file of articles in DynamoDB JSON format
+        k: Number of neighbours per article
+        clusters: Optional mapping from find_duplicates()
+        skip_duplicates: Leave non-canonical duplicates out (they will not be uploaded)
+        
+    Returns:
+        dict: articleId -> list of neighbouring articleIds, most similar first
+    """
+    from similarity import SimilarityIndex  # numpy/scipy are only needed for neighbours
+
+    index = SimilarityIndex()
+    for item in iter_articles(path):
+        if 'articleId' not in item:
+            continue
+        article_id = process_value(item['articleId'])
+        if skip_duplicates and clusters and clusters.get(article_id, article_id) != article_id:
+            continue
+        claim_keys = [
+            claim
+            for claim_field in ('broadClaims', 'subClaims')
+            for claim, sentence in process_value(item.get(claim_field, {'M': {}})).items() if sentence
+        ]
+        index.add(article_id, process_value(item.get('body', {'S': ''})), claim_keys)
+    neighbors = index.neighbors(k)
+    print(f"Computed up to {k} neighbours for {len(neighbors)} articles")
+    return neighbors
+
+def apply_neighbors(data, neighbors):
+    """
+    Attach the neighbours list to articles as they stream past.
+    
+    Args:
+        data: Iterable of articles in DynamoDB JSON format
+        neighbors: Mapping from find_neighbors()
+        
+    Yields:
+        dict: Articles in DynamoDB JSON format
+    """
+    for item in data:
+        article_id = process_value(item['articleId']) if 'articleId' in item else None
+        if article_id in neighbors:
+            item = dict(item, neighbors={'L': [{'N': str(neighbor)} for neighbor in neighbors[article_id]]})
+        yield item
 
 def process_value(value):
     """
@@ -47,6 +302,8 @@ def process_value(value):
             return int(value['N'])
         elif 'BOOL' in value:  # Boolean type
             return value['BOOL']
+        elif 'L' in value:  # List type
+            return [process_value(item) for item in value['L']]
         elif 'M' in value:  # Map type
             return {k: process_value(v) for k, v in value['M'].items()}
         else:  # Generic dictionary
@@ -56,6 +313,563 @@ def process_value(value):
     else:
         return value
 
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens.
+    Must match tokenize in aws/lambda/lambda_function.py so search terms line up.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        list: Tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def build_postings(item):
+    """
+    Build inverted index entries for an article body.
+    
+    Each posting stores the token positions for phrase matching, plus the article's
+    dateTime and source so the API can apply those filters without reading the article.
+    Stopwords get no postings but still count as positions, so phrases containing them
+    match at the right distance.
+    
+    Args:
+        item: Cleaned article item
+        
+    Returns:
+        list: Posting items, one per distinct token
+    """
+    positions = defaultdict(list)
+    for position, token in enumerate(tokenize(item.get('body', ''))):
+        if token not in STOPWORDS:
+            positions[token].append(position)
+
+    return [
+        {
+            'token': token,
+            'articleId': item['articleId'],
+            'positions': token_positions,
+            'dateTime': item.get('dateTime', ''),
+            'source': item.get('source', '')
+        }
+        for token, token_positions in positions.items()
+    ]
+
+def get_stored_tokens(article_ids):
+    """
+    Read the tokens of articles already stored in the table.
+    
+    Args:
+        article_ids: articleIds to look up (at most GET_BATCH_SIZE)
+        
+    Returns:
+        dict: articleId -> set of indexed tokens in the stored body (articles not in the table are missing)
+    """
+    request_items = {table_name: {
+        'Keys': [{'articleId': article_id} for article_id in dict.fromkeys(article_ids)],
+        'ProjectionExpression': '#i, #b',
+        'ExpressionAttributeNames': {'#i': 'articleId', '#b': 'body'}
+    }}
+    stored = {}
+    delay = MIN_BACKOFF_SECONDS
+    for attempt in range(MAX_BATCH_RETRIES):
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        for item in response['Responses'].get(table_name, []):
+            # Stopwords never get postings (build_postings), so there is nothing of theirs to delete
+            stored[item['articleId']] = set(tokenize(item.get('body', ''))) - STOPWORDS
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items:
+            return stored
+        time.sleep(random.uniform(delay / 2, delay))
+        delay = min(MAX_BACKOFF_SECONDS, delay * 2)
+    raise RuntimeError(f"Could not read {len(request_items[table_name]['Keys'])} stored articles")
+
+def get_stale_tokens(stored_tokens, postings):
+    """
+    Tokens of the stored copy of an article that its new postings no longer cover.
+    """
+    return sorted(stored_tokens - {posting['token'] for posting in postings})
+
+def upload_postings(item):
+    """
+    Write an article's postings to the inverted index table in batches.
+    
+    Args:
+        item: Cleaned article item
+    """
+    with postings_table.batch_writer(overwrite_by_pkeys=['token', 'articleId']) as batch:
+        for posting in build_postings(item):
+            batch.put_item(Item=posting)
+
+def delete_postings(article_id, tokens):
+    """
+    Delete an article's postings for the given tokens in batches.
+    
+    Args:
+        article_id: articleId of the article
+        tokens: Tokens whose postings are deleted
+    """
+    with postings_table.batch_writer() as batch:
+        for token in tokens:
+            batch.delete_item(Key={'token': token, 'articleId': article_id})
+
+def purge_stopword_postings():
+    """
+    Delete every posting of a stopword, left by uploads from before stopwords were skipped.
+    
+    Returns:
+        int: Number of postings deleted
+    """
+    deleted = 0
+    with postings_table.batch_writer() as batch:
+        for token in sorted(STOPWORDS):
+            query_kwargs = {'KeyConditionExpression': Key('token').eq(token), 'ProjectionExpression': 'articleId'}
+            while True:
+                response = postings_table.query(**query_kwargs)
+                for posting in response['Items']:
+                    batch.delete_item(Key={'token': token, 'articleId': posting['articleId']})
+                deleted += len(response['Items'])
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return deleted
+
+def clean_item(item):
+    """
+    Convert a DynamoDB JSON article to plain Python types and add derived attributes.
+    
+    Args:
+        item: Article in DynamoDB JSON format
+        
+    Returns:
+        dict: Cleaned article item
+    """
+    cleaned_item = {key: process_value(value) for key, value in item.items()}
+
+    # Monthly partition key for the dateBucket-dateTime-index used by the API query planner
+    if cleaned_item.get('dateTime'):
+        cleaned_item['dateBucket'] = cleaned_item['dateTime'][:7]
+
+    # One marker per broad claim and for think tank references. Only articles with a marker
+    # appear in its sparse index, so the API can Query the articles making a claim instead
+    # of scanning the table.
+    broad_claims = cleaned_item.get('broadClaims')
+    if isinstance(broad_claims, dict) and broad_claims:
+        for claim in broad_claims:
+            cleaned_item[f'{CLAIM_MARKER_PREFIX}{claim}'] = MARKER_VALUE
+    # thinkTankRef=true matches any article with the attribute (Attr exists), even an empty one
+    if 'think_tank_ref' in cleaned_item:
+        cleaned_item[THINK_TANK_MARKER] = MARKER_VALUE
+
+    cleaned_item['contentHash'] = content_hash(cleaned_item)
+    return cleaned_item
+
+def content_hash(item):
+    """
+    Hash an article's attributes so unchanged articles can be detected on later uploads.
+    
+    Args:
+        item: Cleaned article item (without contentHash)
+        
+    Returns:
+        str: Hex SHA-256 digest of the item's canonical JSON form
+    """
+    payload = json.dumps(item, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class Checkpoint:
+    """
+    Tracks upload progress so an interrupted run can resume and unchanged articles are skipped.
+    
+    Batches complete out of order, so the journal stores a watermark: the lowest input
+    offset whose article has not been fully written. Offsets completed above it are held
+    in memory until the gap closes. The manifest maps articleId to the contentHash that
+    was last written and is only updated once the article and all its postings succeed.
+    Both files are written atomically every CHECKPOINT_INTERVAL_SECONDS and on close.
+    """
+
+    def __init__(self, source_path, journal_path, manifest_path, resume=True, options=None):
+        stat = os.stat(source_path)
+        self.source = {'file': os.path.abspath(source_path), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                       'options': options or {}}
+        self.journal_path = journal_path
+        self.manifest_path = manifest_path
+        self.lock = threading.Lock()
+        self.watermark = 0
+        self.manifest = {}
+        self.pending = {}  # offset -> [remaining write requests, articleId, contentHash, all succeeded]
+        self.completed = set()  # Offsets finished above the watermark
+        self.resumed = 0
+        self.unchanged = 0
+        self.last_save = time.monotonic()
+
+        if resume:
+            journal = self._load(journal_path)
+            # Offsets only mean something for the exact file (and options) that was being uploaded
+            if journal.get('source') == self.source and journal.get('table') == table_name:
+                self.watermark = journal.get('watermark', 0)
+            manifest = self._load(manifest_path)
+            if manifest.get('table') == table_name:
+                self.manifest = manifest.get('articles', {})
+        self.resume_from = self.watermark
+
+    def already_written(self, offset):
+        """
+        Check whether an input offset was completed by a previous run.
+        """
+        if offset < self.resume_from:
+            self.resumed += 1
+            return True
+        return False
+
+    def is_unchanged(self, offset, item):
+        """
+        Check the manifest for an identical copy of this article, marking the offset done if found.
+        """
+        if self.manifest.get(str(item['articleId'])) == item['contentHash']:
+            self.unchanged += 1
+            self.finish(offset)
+            return True
+        return False
+
+    def begin(self, offset, item, requests):
+        """
+        Register an article whose put requests are about to be queued.
+        
+        Args:
+            offset: Position of the article in the input file
+            item: Cleaned article item
+            requests: Number of write requests (article, postings and stale posting deletes) queued for it
+        """
+        with self.lock:
+            self.pending[offset] = [requests, str(item['articleId']), item['contentHash'], True]
+
+    def finish(self, offset):
+        """
+        Mark an offset as done without recording a write (skipped or invalid articles).
+        """
+        with self.lock:
+            self.completed.add(offset)
+            self._advance()
+
+    def record(self, offsets, succeeded):
+        """
+        Record the outcome of a written batch; called from uploader worker threads.
+        
+        Args:
+            offsets: Input offset of each put request in the batch
+            succeeded: Whether every request in the batch was written
+        """
+        with self.lock:
+            for offset in offsets:
+                entry = self.pending[offset]
+                entry[0] -= 1
+                entry[3] = entry[3] and succeeded
+                if entry[0] == 0:
+                    del self.pending[offset]
+                    # Failed articles stay below the watermark so the next run retries them
+                    if entry[3]:
+                        self.manifest[entry[1]] = entry[2]
+                        self.completed.add(offset)
+            self._advance()
+        if time.monotonic() - self.last_save >= CHECKPOINT_INTERVAL_SECONDS:
+            self.save()
+
+    def save(self):
+        """
+        Atomically write the journal and manifest files.
+        """
+        with self.lock:
+            self.last_save = time.monotonic()
+            journal = {'table': table_name, 'source': self.source, 'watermark': self.watermark}
+            manifest = {'table': table_name, 'articles': dict(self.manifest)}
+        self._write(self.journal_path, journal)
+        self._write(self.manifest_path, manifest)
+
+    def _advance(self):
+        while self.watermark in self.completed:
+            self.completed.remove(self.watermark)
+            self.watermark += 1
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            print(f"Ignoring unreadable checkpoint file: {path}")
+            return {}
+
+    @staticmethod
+    def _write(path, data):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(data, file, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+class BatchUploader:
+    """
+    Writes items with BatchWriteItem from a pool of worker threads.
+    
+    Put and delete requests are grouped into batches of 25 (articles and postings can share
+    a batch).
+    Unprocessed items are retried with a shared, adaptive backoff: the delay doubles
+    whenever DynamoDB pushes back and halves after each fully processed batch, so all
+    workers slow down together while the table is throttling.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, on_batch_written=None):
+        # Low-level clients are thread safe; the adaptive retry mode also rate limits throttled calls
+        self.client = boto3.client('dynamodb', region_name=region_name, config=Config(
+            max_pool_connections=workers,
+            retries={'max_attempts': 10, 'mode': 'adaptive'}
+        ))
+        self.serializer = TypeSerializer()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers * 2)  # Bounds batches waiting in memory
+        self.lock = threading.Lock()
+        self.batch = []
+        self.batch_keys = set()
+        self.delay = 0
+        self.written = defaultdict(int)
+        self.failed = defaultdict(int)
+        self.on_batch_written = on_batch_written  # Called with (tags, succeeded) after each batch
+        self.started_at = time.monotonic()
+        self.last_report = self.started_at
+
+    def put(self, target_table, item, key, tag=None):
+        """
+        Queue a put request, sending the current batch once it is full.
+        
+        Args:
+            target_table: Name of the table to write to
+            item: Cleaned item
+            key: Tuple identifying the item, used to keep duplicate keys out of one batch
+            tag: Optional value passed back to on_batch_written once the item's batch completes
+        """
+        self._queue(target_table, 'PutRequest', item, key, tag)
+
+    def delete(self, target_table, key_item, key, tag=None):
+        """
+        Queue a delete request, sending the current batch once it is full.
+        
+        Args:
+            target_table: Name of the table to delete from
+            key_item: Primary key attributes of the item
+            key: Tuple identifying the item, used to keep duplicate keys out of one batch
+            tag: Optional value passed back to on_batch_written once the item's batch completes
+        """
+        self._queue(target_table, 'DeleteRequest', key_item, key, tag)
+
+    def flush(self):
+        """
+        Hand the current batch to a worker thread.
+        """
+        if not self.batch:
+            return
+        batch = self.batch
+        self.batch = []
+        self.batch_keys = set()
+        self.slots.acquire()
+        future = self.executor.submit(self._write_batch, batch)
+        future.add_done_callback(self._worker_done)
+
+    def close(self):
+        """
+        Flush remaining items, wait for all workers and print the throughput report.
+        
+        Returns:
+            tuple: (written counts per table, failed counts per table)
+        """
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self._report(final=True)
+        return dict(self.written), dict(self.failed)
+
+    def _queue(self, target_table, request_type, item, key, tag):
+        if (target_table, key) in self.batch_keys:
+            self.flush()
+        self.batch.append((target_table, request_type, item, tag))
+        self.batch_keys.add((target_table, key))
+        if len(self.batch) == BATCH_SIZE:
+            self.flush()
+
+    def _worker_done(self, future):
+        self.slots.release()
+        # _write_batch handles its own errors, so this is only reached by a failing on_batch_written
+        if future.exception() is not None:
+            print(f"Error finishing batch: {future.exception()!r}")
+
+    def _write_batch(self, batch):
+        # Requests not yet written per table; whatever is left when the batch gives up has failed
+        remaining = defaultdict(int)
+        for target_table, _, _, _ in batch:
+            remaining[target_table] += 1
+        try:
+            succeeded = self._send_batch(batch, remaining)
+        except Exception as e:
+            # Serialisation errors and anything else unexpected fail the batch instead of stalling the checkpoint
+            print(f"Error writing batch: {e!r}")
+            succeeded = False
+        if not succeeded:
+            with self.lock:
+                for target_table, count in remaining.items():
+                    self.failed[target_table] += count
+        self._batch_done(batch, succeeded)
+
+    def _send_batch(self, batch, remaining):
+        request_items = defaultdict(list)
+        for target_table, request_type, item, _ in batch:
+            attributes = {key: self.serializer.serialize(value) for key, value in item.items()}
+            request_items[target_table].append(
+                {request_type: {'Item' if request_type == 'PutRequest' else 'Key': attributes}}
+            )
+        request_items = dict(request_items)
+
+        for attempt in range(MAX_BATCH_RETRIES):
+            if self.delay:
+                time.sleep(random.uniform(self.delay / 2, self.delay))
+            try:
+                response = self.client.batch_write_item(RequestItems=request_items)
+            except ClientError as e:
+                print(f"Error writing batch: {e.response['Error']['Message']}")
+                return False
+            except BotoCoreError as e:
+                # Connection errors and timeouts that outlasted the client's own retries back off and retry
+                print(f"Error writing batch (attempt {attempt + 1}): {e}")
+                with self.lock:
+                    self.delay = min(MAX_BACKOFF_SECONDS, max(MIN_BACKOFF_SECONDS, self.delay * 2))
+                continue
+
+            unprocessed = response.get('UnprocessedItems') or {}
+            with self.lock:
+                for target_table, requests in request_items.items():
+                    self.written[target_table] += len(requests) - len(unprocessed.get(target_table, []))
+                if unprocessed:
+                    self.delay = min(MAX_BACKOFF_SECONDS, max(MIN_BACKOFF_SECONDS, self.delay * 2))
+                else:
+                    self.delay = self.delay / 2 if self.delay > MIN_BACKOFF_SECONDS else 0
+                remaining.clear()
+                remaining.update((target_table, len(requests)) for target_table, requests in unprocessed.items())
+            if not unprocessed:
+                return True
+            request_items = unprocessed
+        return False
+
+    def _batch_done(self, batch, succeeded):
+        if self.on_batch_written:
+            self.on_batch_written([tag for _, _, _, tag in batch], succeeded)
+        self._report()
+
+    def _report(self, final=False):
+        now = time.monotonic()
+        with self.lock:
+            if not final and now - self.last_report < PROGRESS_INTERVAL_SECONDS:
+                return
+            self.last_report = now
+            elapsed = max(now - self.started_at, 1e-9)
+            total_written = sum(self.written.values())
+            articles = self.written.get(table_name, 0)
+            print(f"{'Finished' if final else 'Progress'}: {articles} articles, {total_written} items written "
+                  f"in {elapsed:.1f}s ({articles / elapsed:.1f} articles/s, {total_written / elapsed:.1f} writes/s)")
+
+def upload_batched(data, workers=DEFAULT_WORKERS, checkpoint=None):
+    """
+    Upload articles and their postings with batched, parallel writes.
+    
+    Articles are consumed lazily; at most a few batches per worker are held in memory.
+    With a checkpoint, articles before the resume offset and articles whose contentHash
+    matches the manifest are skipped without being written. Articles to be written are
+    looked up GET_BATCH_SIZE at a time so the postings of stored copies' removed tokens
+    are deleted with them.
+    
+    Args:
+        data: Iterable of articles in DynamoDB JSON format
+        workers: Number of concurrent BatchWriteItem calls
+        checkpoint: Optional Checkpoint used to resume and skip unchanged articles
+        
+    Returns:
+        tuple: (successful article uploads, failed article uploads)
+    """
+    uploader = BatchUploader(workers, checkpoint.record if checkpoint else None)
+    skipped = 0
+    stale_postings = 0
+    pending = []  # (offset, cleaned item, postings) waiting for their stored copies to be read
+
+    def queue_pending():
+        nonlocal stale_postings
+        stored = get_stored_tokens([cleaned_item['articleId'] for _, cleaned_item, _ in pending])
+        for offset, cleaned_item, postings in pending:
+            article_id = cleaned_item['articleId']
+            stale = get_stale_tokens(stored.get(article_id, set()), postings)
+            stale_postings += len(stale)
+            if checkpoint:
+                checkpoint.begin(offset, cleaned_item, 1 + len(postings) + len(stale))
+            uploader.put(table_name, cleaned_item, (article_id,), offset)
+            for posting in postings:
+                uploader.put(postings_table_name, posting, (posting['token'], article_id), offset)
+            for token in stale:
+                uploader.delete(postings_table_name, {'token': token, 'articleId': article_id}, (token, article_id), offset)
+        pending.clear()
+
+    for offset, item in enumerate(data):
+        if checkpoint and checkpoint.already_written(offset):
+            continue
+        if 'articleId' not in item:
+            print(f"Skipping item: Missing articleId")
+            skipped += 1
+            if checkpoint:
+                checkpoint.finish(offset)
+            continue
+        try:
+            cleaned_item = clean_item(item)
+            postings = build_postings(cleaned_item)
+        except Exception as e:
+            print(f"Unexpected error processing article {item.get('articleId', {}).get('N', 'unknown')}: {str(e)}")
+            skipped += 1
+            if checkpoint:
+                checkpoint.finish(offset)
+            continue
+        if checkpoint and checkpoint.is_unchanged(offset, cleaned_item):
+            continue
+        pending.append((offset, cleaned_item, postings))
+        if len(pending) == GET_BATCH_SIZE:
+            queue_pending()
+    if pending:
+        queue_pending()
+
+    written, failed = uploader.close()
+    if checkpoint:
+        checkpoint.save()
+        print(f"Resumed past {checkpoint.resumed} articles, skipped {checkpoint.unchanged} unchanged articles "
+              f"(checkpoint offset {checkpoint.watermark})")
+    print(f"Postings written: {written.get(postings_table_name, 0)}, failed: {failed.get(postings_table_name, 0)} "
+          f"(including {stale_postings} stale postings deleted)")
+    return written.get(table_name, 0), failed.get(table_name, 0) + skipped
+
+def upload_serial(data):
+    """
+    Upload articles one put_item call at a time (original behaviour).
+    
+    Args:
+        data: Iterable of articles in DynamoDB JSON format
+        
+    Returns:
+        tuple: (successful article uploads, failed article uploads)
+    """
+    successful_uploads = 0
+    failed_uploads = 0
+    for item in data:
+        if upload_item(item):
+            successful_uploads += 1
+        else:
+            failed_uploads += 1
+    return successful_uploads, failed_uploads
+
 def upload_item(item):
     """
     Upload a single item to DynamoDB with error handling.
@@ -73,10 +887,14 @@ def upload_item(item):
             return False
 
         # Clean and process item data
-        cleaned_item = {key: process_value(value) for key, value in item.items()}
+        cleaned_item = clean_item(item)
+        stored_tokens = get_stored_tokens([cleaned_item['articleId']]).get(cleaned_item['articleId'], set())
         
         # Perform DynamoDB put_item operation
         table.put_item(Item=cleaned_item)
+        upload_postings(cleaned_item)
+        # Tokens removed from an updated article's body must no longer find it
+        delete_postings(cleaned_item['articleId'], get_stale_tokens(stored_tokens, build_postings(cleaned_item)))
         print(f"Successfully uploaded article {cleaned_item['articleId']}")
         return True
 
@@ -87,39 +905,87 @@ def upload_item(item):
         print(f"Unexpected error uploading article {item.get('articleId', {}).get('N', 'unknown')}: {str(e)}")
         return False
 
-# Main execution block: Upload all items and track statistics
-successful_uploads = 0
-failed_uploads = 0
+def verify_upload(sample_id):
+    """
+    Verify the upload by querying a sample article.
+    
+    Args:
+        sample_id: articleId of an uploaded article
+    """
+    try:
+        response = table.query(
+            KeyConditionExpression=Key('articleId').eq(sample_id)
+        )
+        
+        if response['Items']:
+            print(f"\nVerification successful: Found article with ID {sample_id}")
+            print(f"Number of items found: {len(response['Items'])}")
+            print("Sample item structure:")
+            print(json.dumps(response['Items'][0], indent=2, default=str))
+        else:
+            print(f"\nVerification failed: No article found with ID {sample_id}")
+
+    except ClientError as e:
+        print(f"\nError querying table: {e.response['Error']['Message']}")
+    except Exception as e:
+        print(f"\nUnexpected error during verification: {str(e)}")
 
-for item in data:
-    if upload_item(item):
-        successful_uploads += 1
+def main():
+    """
+    Main execution block: Upload all items and track statistics.
+    """
+    parser = argparse.ArgumentParser(description='Upload climate news articles to DynamoDB')
+    parser.add_argument('--file', default='climate_news_data.json', help='DynamoDB JSON file of articles')
+    parser.add_argument('--mode', choices=['batch', 'serial'], default='batch', help='Upload with BatchWriteItem or put_item')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Concurrent batch writers (batch mode)')
+    parser.add_argument('--checkpoint', help='Checkpoint journal path (default: <file>.checkpoint.json)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='Content hash manifest path')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore existing checkpoint and manifest and rewrite everything')
+    parser.add_argument('--duplicates', choices=['keep', 'link', 'skip'], default='keep',
+                        help='Upload near-duplicates as-is, link them to a canonical article, or skip them')
+    parser.add_argument('--neighbors', type=int, default=0, metavar='K',
+                        help='Store the K most similar articles on each article (0 disables)')
+    parser.add_argument('--purge-stopword-postings', action='store_true',
+                        help='Only delete the stopword postings written by earlier versions, then exit')
+    args = parser.parse_args()
+
+    if args.purge_stopword_postings:
+        print(f"Deleted {purge_stopword_postings()} stopword postings from {postings_table_name}")
+        return
+
+    clusters = find_duplicates(args.file) if args.duplicates != 'keep' else {}
+    neighbors = find_neighbors(args.file, args.neighbors, clusters, args.duplicates == 'skip') if args.neighbors > 0 else {}
+
+    # Stream articles from the local file
+    data = iter_articles(args.file)
+    if clusters:
+        data = apply_duplicates(data, clusters, args.duplicates)
+    if neighbors:
+        data = apply_neighbors(data, neighbors)
+    first_item = next(data, None)
+    if first_item is not None:
+        data = itertools.chain([first_item], data)
+
+    started_at = time.monotonic()
+    if args.mode == 'batch':
+        checkpoint = Checkpoint(args.file, args.checkpoint or f"{args.file}.checkpoint.json", args.manifest,
+                                resume=not args.no_resume,
+                                options={'duplicates': args.duplicates, 'neighbors': args.neighbors})
+        successful_uploads, failed_uploads = upload_batched(data, args.workers, checkpoint)
     else:
-        failed_uploads += 1
+        successful_uploads, failed_uploads = upload_serial(data)
+    elapsed = time.monotonic() - started_at
 
-# Print upload statistics
-print(f"\nUpload Summary:")
-print(f"Successfully uploaded: {successful_uploads}")
-print(f"Failed uploads: {failed_uploads}")
-print(f"Total items processed: {len(data)}")
+    # Print upload statistics
+    print(f"\nUpload Summary:")
+    print(f"Successfully uploaded: {successful_uploads}")
+    print(f"Failed uploads: {failed_uploads}")
+    print(f"Total items processed: {successful_uploads + failed_uploads}")
+    print(f"Elapsed time: {elapsed:.1f}s ({successful_uploads / max(elapsed, 1e-9):.1f} articles/s)")
 
-# Verify upload by querying a sample item
-try:
     # Use first article's ID as verification sample
-    sample_id = int(data[0]['articleId']['N'])
-    response = table.query(
-        KeyConditionExpression=Key('articleId').eq(sample_id)
-    )
-    
-    if response['Items']:
-        print(f"\nVerification successful: Found article with ID {sample_id}")
-        print(f"Number of items found: {len(response['Items'])}")
-        print("Sample item structure:")
-        print(json.dumps(response['Items'][0], indent=2))
-    else:
-        print(f"\nVerification failed: No article found with ID {sample_id}")
+    if first_item is not None and 'articleId' in first_item:
+        verify_upload(int(first_item['articleId']['N']))
 
-except ClientError as e:
-    print(f"\nError querying table: {e.response['Error']['Message']}")
-except Exception as e:
-    print(f"\nUnexpected error during verification: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Article Similarity Neighbours
+
+Computes each article's most similar articles so the graph view can draw edges without
+comparing every pair of particles in the browser.
+
+Articles are vectorised with hashed TF-IDF features over body words plus their claim keys
+(broadClaims/subClaims with a value), L2-normalised, and compared by cosine similarity.
+The similarity matrix is never materialised: rows are processed in blocks with a sparse
+matrix product against all articles, and only the top-k columns of each row are kept, so
+memory is bounded by the block size rather than the square of the article count.
+
+Usage:
+    index = SimilarityIndex()
+    for article in articles:
+        index.add(article['articleId'], article['body'], claim_keys)
+    neighbors = index.neighbors(k=5)  # key -> list of up to k most similar keys
+
+push_to_dynamodb.py stores the result as the 'neighbors' attribute (--neighbors).
+
+Prerequisites:
+- numpy and scipy libraries installed
+
+Author: Oisin Aeonn
+"""
+
+import re
+import zlib
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Feature settings
+HASH_FEATURES = 1 << 18  # Hashed vocabulary size
+CLAIM_WEIGHT = 5  # Term count given to each claim key, so shared claims pull articles together
+MIN_TOKEN_LENGTH = 3  # Shorter words are mostly stop words
+MAX_DOCUMENT_FREQUENCY = 0.5  # Features in more than this share of articles carry no signal
+MAX_TERMS = 64  # Highest-weighted features kept per article; keeps the matrix product sparse
+
+# Neighbour search settings
+DEFAULT_NEIGHBORS = 5
+MIN_SIMILARITY = 0.05  # Weaker matches are not worth drawing as edges
+BLOCK_CELLS = 1 << 24  # Similarity scores computed at once (rows per block = BLOCK_CELLS // articles)
+
+class SimilarityIndex:
+    """
+    Collects hashed term counts for articles and finds their nearest neighbours.
+    """
+
+    def __init__(self, features=HASH_FEATURES):
+        self.features = features
+        self.keys = []
+        self.indices = []
+        self.counts = []
+
+    def add(self, key, text, claim_keys=()):
+        """
+        Add an article to the index.
+
+        Args:
+            key: Identifier returned by neighbors() (e.g. articleId)
+            text: Article body
+            claim_keys: Keys of the claims present in the article
+        """
+        tokens = [token for token in TOKEN_PATTERN.findall((text or '').lower()) if len(token) >= MIN_TOKEN_LENGTH]
+        tokens.extend(f"claim:{claim}" for claim in claim_keys for _ in range(CLAIM_WEIGHT))
+        hashed = np.fromiter(map(zlib.crc32, map(str.encode, tokens)), dtype=np.int64, count=len(tokens))
+        indices, counts = np.unique(hashed % self.features, return_counts=True)
+        self.keys.append(key)
+        self.indices.append(indices.astype(np.int32))
+        self.counts.append(counts.astype(np.float32))
+
+    def matrix(self):
+        """
+        Build the L2-normalised TF-IDF matrix (one row per article).
+
+        Returns:
+            scipy.sparse.csr_matrix: Article vectors
+        """
+        lengths = np.fromiter((len(indices) for indices in self.indices), dtype=np.int64, count=len(self.indices))
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate(self.indices) if self.indices else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate(self.counts) if self.counts else np.zeros(0, dtype=np.float32)
+
+        article_count = len(self.keys)
+        document_frequency = np.bincount(indices, minlength=self.features)
+        idf = np.log((1 + article_count) / (1 + document_frequency)).astype(np.float32) + 1
+        idf[document_frequency > MAX_DOCUMENT_FREQUENCY * article_count] = 0
+
+        weights = (1 + np.log(counts)) * idf[indices]
+        vectors = sparse.csr_matrix((weights, indices, indptr), shape=(article_count, self.features))
+        vectors = self._prune(vectors)
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags((1 / norms).astype(np.float32)).dot(vectors).tocsr()
+
+    @staticmethod
+    def _prune(vectors):
+        # Common words appear in many articles and make the product dense, while the
+        # distinctive (high TF-IDF) terms decide who the nearest neighbours are
+        lengths = np.diff(vectors.indptr)
+        if not len(lengths) or lengths.max() <= MAX_TERMS:
+            return vectors
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        # Rank each row's entries by descending weight and keep the first MAX_TERMS
+        order = np.lexsort((-vectors.data, rows))
+        rank = np.arange(len(order)) - np.repeat(vectors.indptr[:-1], lengths)
+        keep = order[rank < MAX_TERMS]
+        keep.sort()
+        return sparse.csr_matrix(
+            (vectors.data[keep], (rows[keep], vectors.indices[keep])), shape=vectors.shape
+        )
+
+    def neighbors(self, k=DEFAULT_NEIGHBORS):
+        """
+        Find each article's k most similar articles.
+
+        Returns:
+            dict: key -> list of up to k keys, most similar first
+        """
+        article_count = len(self.keys)
+        if article_count < 2:
+            return {key: [] for key in self.keys}
+        k = min(k, article_count - 1)
+        vectors = self.matrix()
+        vectors_t = vectors.T.tocsr()
+        block_rows = max(1, BLOCK_CELLS // article_count)
+
+        result = {}
+        for start in range(0, article_count, block_rows):
+            stop = min(start + block_rows, article_count)
+            scores = vectors[start:stop].dot(vectors_t).toarray()
+            scores[np.arange(stop - start), np.arange(start, stop)] = -1  # Exclude self matches
+
+            # argpartition finds the top k per row in linear time; only those k are sorted
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row in range(stop - start):
+                result[self.keys[start + row]] = [
+                    self.keys[column] for column, score in zip(top[row], top_scores[row]) if score >= MIN_SIMILARITY
+                ]
+        return result
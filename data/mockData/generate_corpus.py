@@ -0,0 +1,382 @@
+# Author: Oisin Aeonn
+
+"""
+Scalable Mock Corpus Generator
+
+Generates synthetic articles in the lazone table's item layout at load testing scale
+(millions of articles), reproducibly from a seed. Unlike generate_mock_articles.py,
+which builds 500 articles in memory, the corpus is split into shards that worker
+processes generate and stream to disk (or to a DynamoDB table) one article at a time, so
+memory use does not grow with the corpus size.
+
+Every shard has its own seed derived from the corpus seed and the shard number, and
+articleIds are assigned by position, so the same seed and shard count give the same
+corpus whatever the number of processes.
+
+Distributions (all configurable with --config, see DEFAULT_CONFIG):
+- Source popularity is Zipfian: the source of rank r is picked with weight 1 / r^s
+- dateTime is bursty: a share of articles follows news events, decaying exponentially
+  after each event date, on top of a uniform background over the date range
+- Claims co-occur: each source leans sceptical with its own probability; sceptical
+  articles make each broad claim at its base rate, and claim pairs add the second claim
+  with a conditional rate. Think tank references are more common in sceptical articles
+- Duplicate syndication: a share of articles republish a recent article's title and body
+  under another source a few hours later (isDuplicate true)
+
+Output formats (one file per shard, newline-delimited):
+- ndjson   - plain JSON articles (like the collector output)
+- dynamodb - DynamoDB JSON articles (like mock_climate_news_data.json)
+Both can be uploaded with data/database/push_to_dynamodb.py --file.
+
+With --seed-table the articles (and their lazone-postings entries) are written straight
+into a table instead, e.g. DynamoDB Local with --endpoint-url.
+
+Usage:
+    python3 generate_corpus.py --articles 1000000 --output corpus [--format ndjson|dynamodb]
+                               [--shards 64] [--processes 8] [--seed 42] [--config distributions.json]
+    python3 generate_corpus.py --articles 100000 --seed-table lazone --endpoint-url http://localhost:8000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from generate_mock_articles import claims, objects, random_words, sources, subjects, verbs
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DEFAULT_SEED = 42
+DEFAULT_SHARDS = 16
+FORMAT_EXTENSIONS = {'ndjson': 'ndjson', 'dynamodb': 'ddb.ndjson'}
+
+DEFAULT_CONFIG = {
+    'start_date': '2019-07-01T00:00:00Z',
+    'end_date': '2020-06-30T23:59:59Z',
+    # Zipf exponent of source popularity (0 = uniform)
+    'source_zipf': 1.1,
+    # Share of articles tied to an event, and the events (date, decay in days, relative weight)
+    'burst_share': 0.6,
+    'events': [
+        {'date': '2019-11-08T00:00:00Z', 'decay_days': 4, 'weight': 1.0},
+        {'date': '2019-11-12T00:00:00Z', 'decay_days': 3, 'weight': 1.5},
+        {'date': '2019-12-21T00:00:00Z', 'decay_days': 3, 'weight': 1.0},
+        {'date': '2019-12-31T00:00:00Z', 'decay_days': 6, 'weight': 3.0},
+        {'date': '2020-01-04T00:00:00Z', 'decay_days': 5, 'weight': 2.5},
+        {'date': '2020-02-10T00:00:00Z', 'decay_days': 7, 'weight': 1.0}
+    ],
+    # Probability that a source's articles lean sceptical is drawn from [min, max] per source
+    'sceptic_share_range': [0.05, 0.9],
+    # Base rate of each broad claim in sceptical articles (non-sceptical articles: rate * non_sceptic_factor)
+    'claim_rates': {
+        'gw_not_happening': 0.25,
+        'not_caused_by_human': 0.35,
+        'impacts_not_bad': 0.3,
+        'solutions_wont_work': 0.4,
+        'science_movement_unrel': 0.3,
+        'individual_action': 0.1
+    },
+    'non_sceptic_factor': 0.1,
+    # [first, second, rate]: articles making the first claim also make the second at this rate
+    'claim_pairs': [
+        ['not_caused_by_human', 'science_movement_unrel', 0.5],
+        ['gw_not_happening', 'not_caused_by_human', 0.4],
+        ['solutions_wont_work', 'impacts_not_bad', 0.3]
+    ],
+    'think_tank_rate': 0.4,
+    'non_sceptic_think_tank_rate': 0.05,
+    # Share of articles that republish a recent article, how recent, and the republishing delay
+    'duplicate_rate': 0.15,
+    'duplicate_window': 500,
+    'duplicate_max_delay_hours': 12,
+    'paragraphs': [2, 5]
+}
+
+class ShardGenerator:
+    """
+    Generates the articles of one shard from its own random stream.
+    """
+
+    def __init__(self, config, seed, shard):
+        self.config = config
+        self.rng = random.Random(f"{seed}:{shard}")
+        self.start = datetime.strptime(config['start_date'], DATE_FORMAT)
+        self.end = datetime.strptime(config['end_date'], DATE_FORMAT)
+        self.span_seconds = (self.end - self.start).total_seconds()
+        self.events = [
+            (datetime.strptime(event['date'], DATE_FORMAT), event['decay_days'] * 86400) for event in config['events']
+        ]
+        self.event_weights = [event['weight'] for event in config['events']]
+        self.recent = deque(maxlen=config['duplicate_window'])  # Candidates for syndication
+
+        # Source ranks and leanings come from the corpus seed so every shard agrees on them
+        corpus_rng = random.Random(f"{seed}:sources")
+        self.sources = corpus_rng.sample(sources, len(sources))
+        self.source_weights = [1 / (rank + 1) ** config['source_zipf'] for rank in range(len(self.sources))]
+        low, high = config['sceptic_share_range']
+        self.sceptic_share = {source: corpus_rng.uniform(low, high) for source in self.sources}
+
+    def pick(self, words):
+        # Cheaper than rng.choice, which dominates the generation time
+        return words[int(self.rng.random() * len(words))]
+
+    def sentence(self):
+        text = f"{self.pick(subjects)} {self.pick(verbs)} that {self.pick(objects)}."
+        if self.rng.random() < 0.3:
+            text += f" this {self.pick(random_words)} finding has sparked debate in the scientific community."
+        return text
+
+    def paragraph(self):
+        return ' '.join(self.sentence() for _ in range(self.rng.randint(3, 6)))
+
+    def date_time(self):
+        """
+        Pick a publication time: after an event (exponential decay) or uniformly in the range.
+        """
+        rng = self.rng
+        if self.events and rng.random() < self.config['burst_share']:
+            event, decay_seconds = rng.choices(self.events, self.event_weights)[0]
+            offset = (event - self.start).total_seconds() + rng.expovariate(1 / decay_seconds)
+            if 0 <= offset <= self.span_seconds:
+                return self.start + timedelta(seconds=int(offset))
+        return self.start + timedelta(seconds=rng.randrange(int(self.span_seconds) + 1))
+
+    def claims(self, source):
+        """
+        Pick the broad claims, subclaims and think tank reference of an article.
+        """
+        rng = self.rng
+        config = self.config
+        sceptical = rng.random() < self.sceptic_share[source]
+        factor = 1 if sceptical else config['non_sceptic_factor']
+        broad = {claim for claim, rate in config['claim_rates'].items() if rng.random() < rate * factor}
+        for first, second, rate in config['claim_pairs']:
+            if first in broad and rng.random() < rate:
+                broad.add(second)
+
+        broad_claims = {}
+        sub_claims = {}
+        for claim in sorted(broad):
+            broad_claims[claim] = self.paragraph()
+            subclaims = claims.get(claim, {}).get('subclaims', [])
+            for subclaim in rng.sample(subclaims, min(len(subclaims), rng.randint(1, 2))):
+                sub_claims[subclaim] = self.paragraph()
+        think_tank_rate = config['think_tank_rate'] if sceptical else config['non_sceptic_think_tank_rate']
+        think_tank_ref = self.sentence() if rng.random() < think_tank_rate else None
+        return broad_claims, sub_claims, think_tank_ref
+
+    def article(self, article_id):
+        """
+        Generate one article.
+
+        Args:
+            article_id (int): articleId of the article
+
+        Returns:
+            dict: Article in the lazone item layout (plain JSON values)
+        """
+        rng = self.rng
+        config = self.config
+        source = rng.choices(self.sources, self.source_weights)[0]
+
+        if self.recent and rng.random() < config['duplicate_rate']:
+            # Syndicated copy: same story under another source, published a little later
+            original = rng.choice(self.recent)
+            published = min(self.end, datetime.strptime(original['dateTime'], DATE_FORMAT) + timedelta(
+                seconds=rng.randrange(int(config['duplicate_max_delay_hours'] * 3600) + 1)
+            ))
+            title, body, is_duplicate = original['title'], original['body'], True
+        else:
+            published = self.date_time()
+            title = self.sentence().capitalize()
+            body = '\n\n'.join(self.paragraph() for _ in range(rng.randint(*config['paragraphs'])))
+            is_duplicate = False
+
+        broad_claims, sub_claims, think_tank_ref = self.claims(source)
+        uri = f"uri-{article_id:08x}"
+        article = {
+            'articleId': article_id,
+            'title': title,
+            'dateTime': published.strftime(DATE_FORMAT),
+            'authors': f"{rng.choice(['john', 'jane', 'alex', 'sam', 'morgan', 'taylor', 'jordan', 'casey'])} "
+                       f"{rng.choice(['smith', 'doe', 'johnson', 'brown', 'lee', 'garcia', 'martinez', 'rodriguez'])}",
+            'image': f"https://{source}/images/climate-{article_id}.jpg",
+            'body': body,
+            'source': source,
+            'url': f"https://{source}/article-{article_id}",
+            'uri': uri,
+            'isDuplicate': is_duplicate,
+            'broadClaims': broad_claims,
+            'subClaims': sub_claims
+        }
+        if think_tank_ref:
+            article['think_tank_ref'] = think_tank_ref
+        if not is_duplicate:
+            self.recent.append(article)
+        return article
+
+def to_dynamodb_json(value):
+    """
+    Convert a plain value to DynamoDB JSON.
+
+    Args:
+        value: str, bool, int, dict or list
+
+    Returns:
+        dict: Typed attribute value
+    """
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, int):
+        return {'N': str(value)}
+    if isinstance(value, dict):
+        return {'M': {key: to_dynamodb_json(item) for key, item in value.items()}}
+    if isinstance(value, list):
+        return {'L': [to_dynamodb_json(item) for item in value]}
+    return {'S': str(value)}
+
+def shard_range(articles, shards, shard):
+    """
+    Return the articleIds [start, stop) that belong to a shard.
+    """
+    return shard * articles // shards, (shard + 1) * articles // shards
+
+def write_shard(task):
+    """
+    Generate one shard to a file and/or a table (runs in a worker process).
+
+    Args:
+        task (dict): Shard number, corpus settings and destinations
+
+    Returns:
+        tuple: (shard number, articles written)
+    """
+    shard = task['shard']
+    generator = ShardGenerator(task['config'], task['seed'], shard)
+    start, stop = shard_range(task['articles'], task['shards'], shard)
+
+    output_file = None
+    uploader = None
+    if task['output']:
+        path = os.path.join(task['output'], f"articles-{shard:05d}.{FORMAT_EXTENSIONS[task['format']]}")
+        output_file = open(path, 'w', encoding='utf-8')
+    if task['seed_table']:
+        uploader = TableSeeder(task['seed_table'], task['endpoint_url'], task['postings'])
+
+    try:
+        for article_id in range(start, stop):
+            article = generator.article(article_id)
+            if output_file:
+                record = article if task['format'] == 'ndjson' else {key: to_dynamodb_json(value) for key, value in article.items()}
+                output_file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                output_file.write('\n')
+            if uploader:
+                uploader.put(article)
+    finally:
+        if output_file:
+            output_file.close()
+        if uploader:
+            uploader.close()
+    return shard, stop - start
+
+class TableSeeder:
+    """
+    Writes generated articles (and their postings) to DynamoDB tables with batched writes.
+    """
+
+    def __init__(self, table_name, endpoint_url=None, postings=True):
+        import boto3
+
+        # push_to_dynamodb adds the derived attributes (dateBucket, contentHash) and postings
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+        from push_to_dynamodb import build_postings, clean_item, postings_table_name, region_name
+
+        self.clean_item = clean_item
+        self.build_postings = build_postings if postings else None
+        dynamodb = boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url)
+        self.articles = dynamodb.Table(table_name).batch_writer()
+        self.postings = dynamodb.Table(postings_table_name).batch_writer(overwrite_by_pkeys=['token', 'articleId']) if postings else None
+
+    def put(self, article):
+        item = self.clean_item(article)
+        self.articles.put_item(Item=item)
+        if self.postings:
+            for posting in self.build_postings(item):
+                self.postings.put_item(Item=posting)
+
+    def close(self):
+        # Leaving the batch writers flushes their buffered items
+        self.articles.__exit__(None, None, None)
+        if self.postings:
+            self.postings.__exit__(None, None, None)
+
+def load_config(path):
+    """
+    Merge a JSON file of distribution settings over DEFAULT_CONFIG.
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        with open(path, 'r', encoding='utf-8') as config_file:
+            overrides = json.load(config_file)
+        unknown = set(overrides) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown settings in {path}: {', '.join(sorted(unknown))}")
+        config.update(overrides)
+    return config
+
+def main():
+    """
+    Generate the corpus shards in parallel.
+    """
+    parser = argparse.ArgumentParser(description='Generate a large synthetic article corpus')
+    parser.add_argument('--articles', type=int, required=True, help='Number of articles')
+    parser.add_argument('--output', help='Directory for the shard files')
+    parser.add_argument('--format', choices=sorted(FORMAT_EXTENSIONS), default='ndjson', help='Shard file format')
+    parser.add_argument('--shards', type=int, help=f'Number of shards (default: {DEFAULT_SHARDS}, fewer for small corpora)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Corpus seed')
+    parser.add_argument('--config', help='JSON file overriding the distribution settings')
+    parser.add_argument('--seed-table', help='Also write the articles to this DynamoDB table (e.g. lazone)')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint for --seed-table (e.g. DynamoDB Local)')
+    parser.add_argument('--no-postings', action='store_true', help='Do not write lazone-postings entries with --seed-table')
+    args = parser.parse_args()
+
+    if not args.output and not args.seed_table:
+        parser.error('Specify --output and/or --seed-table')
+    config = load_config(args.config)
+    shards = args.shards or max(1, min(DEFAULT_SHARDS, math.ceil(args.articles / 10000)))
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    tasks = [
+        {
+            'shard': shard,
+            'shards': shards,
+            'articles': args.articles,
+            'seed': args.seed,
+            'config': config,
+            'output': args.output,
+            'format': args.format,
+            'seed_table': args.seed_table,
+            'endpoint_url': args.endpoint_url,
+            'postings': not args.no_postings
+        }
+        for shard in range(shards)
+    ]
+
+    start_time = time.time()
+    written = 0
+    with Pool(processes=max(1, min(args.processes or 1, shards))) as pool:
+        for shard, count in pool.imap_unordered(write_shard, tasks):
+            written += count
+            print(f"Shard {shard + 1}/{shards} done ({written} of {args.articles} articles)")
+    elapsed = time.time() - start_time
+    print(f"Generated {written} articles in {shards} shards in {elapsed:.1f} seconds ({written / max(elapsed, 1e-9):.0f} articles/s)")
+
+if __name__ == "__main__":
+    main()
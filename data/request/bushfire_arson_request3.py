@@ -1,8 +1,9 @@
 # Author: Oisin Aeonn
 
-import requests
 import json
-import uuid
+from collector import DEFAULT_CACHE_DIR, collect, load_config
+
+PROFILE = "bushfire_arson"  # Profile in collector_profiles.json
 
 def fetch_bushfire_news(api_key, start_date, end_date, urls):
     """
@@ -29,108 +30,9 @@ def fetch_bushfire_news(api_key, start_date, end_date, urls):
             - uri: Generated unique identifier
             - isDuplicate: Boolean indicating if article is duplicate
     """
-    # API endpoint configuration
-    url = "https://newsapi.ai/api/v1/article/getArticles"
-    
-    # Construct query payload with search criteria
-    payload = {
-        "query": {
-            "$query": {
-                "$and": [
-                    {
-                        "keyword": "(bushfire or bushfires) and (\"arson\" or \"arsonist\" or \"arsonists\" or \"greens\" or \"greenies\" or \"cobargo\")",
-                        "keywordSearchMode": "exact"
-                    },
-                    {
-                        "dateStart": start_date,
-                        "dateEnd": end_date
-                    },
-                    {
-                        "$or": [{"sourceUri": source_url} for source_url in urls]
-                    }
-                ]
-            }
-        },
-        "resultType": "articles",
-        "articlesSortBy": "date",
-        "includeArticleImage": True,
-        "apiKey": api_key,
-        "articlesPage": 1,
-        "articlesCount": 100  # Articles per page
-    }
-    
-    all_articles_info = []
-    total_articles = 0
-    current_page = 1
-
-    # Fetch articles with pagination
-    while True:
-        payload["articlesPage"] = current_page
-        
-        try:
-            # Make API request
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'articles' in data:
-                articles = data['articles'].get('results', [])
-                total_results = data['articles'].get('totalResults', 0)
-                
-                print(f"Fetching page {current_page}. Articles on this page: {len(articles)}")
-                
-                # Process each article
-                for art in articles:
-                    if isinstance(art, dict):
-                        # Extract and format author information
-                        authors = art.get('authors', [])
-                        if isinstance(authors, list):
-                            authors_str = ', '.join(author.get('name', '') for author in authors if isinstance(author, dict))
-                        else:
-                            authors_str = str(authors)
-
-                        # Create standardized article object
-                        article_info = {
-                            "title": art.get('title', ''),
-                            "dateTime": art.get('dateTimePub', ''),
-                            "authors": authors_str,
-                            "image": art.get('image', ''),
-                            "body": art.get('body', ''),
-                            "source": art.get('source', {}).get('title', ''),
-                            "url": art.get('url', ''),
-                            "uri": f"uri-{uuid.uuid4().hex[:8]}", # Generate unique identifier
-                            "isDuplicate": art.get('isDuplicate', False)
-                        }
-                        all_articles_info.append(article_info)
-                    else:
-                        print(f"Unexpected article format: {art}")
-                
-                total_articles += len(articles)
-                
-                # Check if we've retrieved all available articles
-                if total_articles >= total_results:
-                    print(f"Fetched all available articles. Total: {total_articles}")
-                    break
-                
-                current_page += 1
-            else:
-                print("No articles found in the response.")
-                break
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error making request: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"Response text: {e.response.text}")
-            break
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            break
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            break
-    
-    return all_articles_info
+    # Query keywords are defined by the 'bushfire_arson' collector profile
+    config = dict(load_config(), sources=urls)
+    return collect(config, [PROFILE], api_key, start_date, end_date, cache_dir=DEFAULT_CACHE_DIR)[PROFILE]
 
 def main():
     """
@@ -0,0 +1,411 @@
+# Author: Oisin Aeonn
+
+"""
+NewsAPI.ai Article Collector
+
+Runs one or more named query profiles from collector_profiles.json in a single process.
+Each profile only differs in its keyword expression, so collection is split in two phases:
+
+1. For every profile, page through the matching article uris (resultType uriWgtList).
+   These pages are small, so this costs far fewer bytes than fetching articles.
+2. Fetch full details once for the union of uris (100 per getArticle request), so an
+   article matched by several profiles is only downloaded once.
+
+All requests share one keep-alive session and one worker pool. Each profile is written
+to its own output file in the API's date order, and merged_output (if configured) holds
+every unique article with the list of profiles that matched it.
+
+The date range is split into calendar-month windows. A window whose first page reports
+--max-window-results or more matches is split in half (NewsAPI.ai date filters are
+day-resolution, so down to single days) and the halves are queried instead, so quiet
+months cost one request and only busy periods are narrowed down.
+
+Each completed window is cached under --cache-dir as gzipped NDJSON: the uri list per
+query (keyed by a hash of the profile's keywords and sources) and the raw articles per
+month window. Reruns only request windows and articles that are not cached, so extending
+the date range costs API calls for the new months (and the old partial last month) only.
+Windows ending today or later are never cached because articles are still being
+published into them.
+
+Usage:
+    python3 collector.py [--config collector_profiles.json] [--profiles NAME ...]
+                         [--start-date YYYY-MM-DD] [--end-date YYYY-MM-DD] [--workers 4]
+                         [--max-window-results 10000] [--cache-dir .collector_cache] [--refresh]
+
+The NewsAPI.ai key is read from --api-key or the NEWSAPI_KEY environment variable.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from newsapi_client import (MAX_CONCURRENT_REQUESTS, NEWSAPI_URL, RateLimiter, create_session,
+                            fetch_articles_by_uri, fetch_page, format_article, page_count)
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collector_profiles.json')
+URI_PAGE_SIZE = 5000  # Article uris per uriWgtList page
+DEFAULT_CACHE_DIR = '.collector_cache'
+MAX_WINDOW_RESULTS = 10000  # Windows matching this many articles are split before paging
+
+def load_config(path=CONFIG_FILE):
+    """
+    Load collector settings and query profiles.
+
+    Args:
+        path (str): Path to the JSON config file
+
+    Returns:
+        dict: Config with 'start_date', 'end_date', 'sources', 'profiles' and optional 'merged_output'
+    """
+    with open(path, 'r', encoding='utf-8') as config_file:
+        return json.load(config_file)
+
+def build_query(profile, sources, start_date, end_date):
+    """
+    Build the NewsAPI.ai query for a profile.
+
+    Args:
+        profile (dict): Profile with 'keyword' and optional 'keyword_search_mode'
+        sources (list): Source URIs to search
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format
+
+    Returns:
+        dict: Query object for the 'query' field of a getArticles request
+    """
+    return {
+        "$query": {
+            "$and": [
+                {
+                    "keyword": profile['keyword'],
+                    "keywordSearchMode": profile.get('keyword_search_mode', 'exact')
+                },
+                {
+                    "dateStart": start_date,
+                    "dateEnd": end_date
+                },
+                {
+                    "$or": [{"sourceUri": source_url} for source_url in sources]
+                }
+            ]
+        }
+    }
+
+def build_uri_payload(query, api_key):
+    """
+    Build a getArticles payload that returns article uris only.
+    """
+    return {
+        "query": query,
+        "resultType": "uriWgtList",
+        "uriWgtListSortBy": "date",
+        "uriWgtListCount": URI_PAGE_SIZE,
+        "apiKey": api_key
+    }
+
+def uris_from_page(result):
+    """
+    Extract article uris from a uriWgtList page ('uri:weight' strings).
+    """
+    return [entry.rsplit(':', 1)[0] for entry in result.get('results', []) if isinstance(entry, str)]
+
+def date_windows(start_date, end_date):
+    """
+    Split an inclusive date range into calendar-month windows.
+
+    Args:
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format
+
+    Returns:
+        list: (window start, window end) date string tuples, both inclusive
+    """
+    current = date.fromisoformat(start_date)
+    last = date.fromisoformat(end_date)
+    windows = []
+    while current <= last:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        window_end = min(next_month - timedelta(days=1), last)
+        windows.append((current.isoformat(), window_end.isoformat()))
+        current = next_month
+    return windows
+
+def split_window(window):
+    """
+    Split a date window of two or more days into two halves.
+
+    Args:
+        window (tuple): (window start, window end) date strings, both inclusive
+
+    Returns:
+        list: The earlier and the later half
+    """
+    start = date.fromisoformat(window[0])
+    middle = start + timedelta(days=(date.fromisoformat(window[1]) - start).days // 2)
+    return [(window[0], middle.isoformat()), ((middle + timedelta(days=1)).isoformat(), window[1])]
+
+def window_key(window):
+    """
+    Cache file name stem for a date window.
+    """
+    return window[0] if window[0] == window[1] else f"{window[0]}_{window[1]}"
+
+def query_hash(profile, sources):
+    """
+    Hash the parts of a profile's query that determine which articles match (not the dates).
+    """
+    query = {
+        'keyword': profile['keyword'],
+        'keyword_search_mode': profile.get('keyword_search_mode', 'exact'),
+        'sources': sorted(sources)
+    }
+    return hashlib.sha256(json.dumps(query, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def read_cache(path):
+    """
+    Read a gzipped NDJSON cache file.
+
+    Returns:
+        list: Decoded records, or None if the file does not exist
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as cache_file:
+            return [json.loads(line) for line in cache_file if line.strip()]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+def write_cache(path, records):
+    """
+    Atomically write records to a gzipped NDJSON cache file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as cache_file:
+        for record in records:
+            cache_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(temp_path, path)
+
+def collect(config, profile_names, api_key, start_date=None, end_date=None, max_workers=MAX_CONCURRENT_REQUESTS,
+            max_window_results=MAX_WINDOW_RESULTS, cache_dir=None, refresh=False):
+    """
+    Collect articles for several profiles, fetching each unique article once.
+
+    Args:
+        config (dict): Loaded collector config
+        profile_names (list): Names of the profiles to run
+        api_key (str): NewsAPI.ai authentication key
+        start_date (str): Start date override (defaults to the config value)
+        end_date (str): End date override (defaults to the config value)
+        max_workers (int): Maximum number of concurrent requests across all profiles
+        max_window_results (int): Matches at which a window is split in half instead of paged through
+        cache_dir (str): Directory for cached windows, or None to disable caching
+        refresh (bool): Ignore existing cache entries (they are rewritten after fetching)
+
+    Returns:
+        dict: Profile name -> list of article information dictionaries
+    """
+    start_date = start_date or config['start_date']
+    end_date = end_date or config['end_date']
+    windows = date_windows(start_date, end_date)
+    today = date.today().isoformat()
+    rate_limiter = RateLimiter()
+
+    def cacheable(window):
+        return cache_dir is not None and window[1] < today
+
+    def uri_cache_path(name, window):
+        profile_hash = query_hash(config['profiles'][name], config['sources'])
+        return os.path.join(cache_dir, 'uris', profile_hash, f"{window_key(window)}.ndjson.gz")
+
+    def article_cache_path(window):
+        return os.path.join(cache_dir, 'articles', f"{window_key(window)}.ndjson.gz")
+
+    # Load cached uri lists; everything else becomes a (profile, window) fetch task
+    window_uris = {}
+    tasks = []
+    for name in profile_names:
+        for window in windows:
+            cached = read_cache(uri_cache_path(name, window)) if cacheable(window) and not refresh else None
+            if cached is None:
+                tasks.append((name, window))
+            else:
+                window_uris[(name, window)] = cached
+    print(f"{len(windows)} windows x {len(profile_names)} profiles: {len(window_uris)} cached, {len(tasks)} to fetch")
+
+    payloads = {}
+
+    def fetch_uri_page(task, page):
+        return fetch_page(session, NEWSAPI_URL, payloads[task], page, rate_limiter, 'uriWgtList', 'uriWgtListPage')
+
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Phase 1a: first uri page of every task, which also gives each task's match and page count.
+        # Windows with too many matches are split, and their halves fetched in the next round
+        first_pages = {}
+        halves = {}
+        pending = tasks
+        while pending:
+            round_tasks, pending = pending, []
+            payloads.update(
+                (task, build_uri_payload(build_query(config['profiles'][task[0]], config['sources'], *task[1]), api_key))
+                for task in round_tasks
+            )
+            for task, first_page in zip(round_tasks, executor.map(lambda task: fetch_uri_page(task, 1), round_tasks)):
+                total = first_page.get('totalResults', 0) if first_page is not None else 0
+                if total >= max_window_results and task[1][0] != task[1][1]:
+                    halves[task] = [(task[0], half) for half in split_window(task[1])]
+                    pending.extend(halves[task])
+                    continue
+                if total >= max_window_results:
+                    print(f"Warning: {task[0]} matches {total} articles on {task[1][0]}, which cannot be split further")
+                first_pages[task] = first_page
+        if halves:
+            print(f"Split {len(halves)} windows with {max_window_results} or more matches")
+
+        # Phase 1b: remaining uri pages of all unsplit windows in one flat batch of requests
+        remaining = [
+            (task, page)
+            for task, first_page in first_pages.items() if first_page is not None
+            for page in range(2, page_count(first_page, URI_PAGE_SIZE) + 1)
+        ]
+        remaining_pages = executor.map(lambda item: fetch_uri_page(*item), remaining)
+
+        complete = {}
+        for task, first_page in first_pages.items():
+            complete[task] = first_page is not None
+            window_uris[task] = uris_from_page(first_page) if first_page is not None else []
+        for (task, page), result in zip(remaining, remaining_pages):
+            if result is None:
+                print(f"Skipping {task[0]} uri page {page} for {window_key(task[1])} after errors")
+                complete[task] = False
+                continue
+            window_uris[task].extend(uris_from_page(result))
+
+        # Split windows are their halves in date order (halves are split after their window)
+        for task in reversed(list(halves)):
+            window_uris[task] = [uri for half in halves[task] for uri in window_uris[half]]
+            complete[task] = all(complete[half] for half in halves[task])
+
+        # Only windows whose every page was fetched are cached
+        for task, is_complete in complete.items():
+            if is_complete and cacheable(task[1]):
+                write_cache(uri_cache_path(*task), window_uris[task])
+
+        # Phase 2: article details for uris not already cached, grouped by window
+        raw_articles = {}
+        missing = {}
+        for window in windows:
+            needed = dict.fromkeys(uri for name in profile_names for uri in window_uris[(name, window)])
+            cached = read_cache(article_cache_path(window)) if cacheable(window) and not refresh else None
+            cached_by_uri = {art.get('uri'): art for art in cached or []}
+            for uri in needed:
+                if uri in cached_by_uri:
+                    raw_articles[uri] = cached_by_uri[uri]
+                elif uri not in raw_articles:
+                    missing.setdefault(window, []).append(uri)
+
+        profile_uris = {
+            name: [uri for window in windows for uri in window_uris[(name, window)]]
+            for name in profile_names
+        }
+        unique_count = len(dict.fromkeys(uri for uris in profile_uris.values() for uri in uris))
+        total_matches = sum(len(set(uris)) for uris in profile_uris.values())
+        for name in profile_names:
+            print(f"Profile '{name}': {len(set(profile_uris[name]))} articles")
+        missing_uris = list(dict.fromkeys(uri for uris in missing.values() for uri in uris))
+        print(f"{unique_count} unique articles ({total_matches - unique_count} shared between profiles), "
+              f"{unique_count - len(missing_uris)} cached, fetching {len(missing_uris)}")
+        fetched = fetch_articles_by_uri(session, missing_uris, api_key, rate_limiter, executor)
+        raw_articles.update(fetched)
+
+        # Add newly fetched articles to each window's article cache
+        for window, uris in missing.items():
+            if cacheable(window) and any(uri in fetched for uri in uris):
+                cached = read_cache(article_cache_path(window)) if not refresh else None
+                articles = {art.get('uri'): art for art in cached or []}
+                articles.update((uri, fetched[uri]) for uri in uris if uri in fetched)
+                write_cache(article_cache_path(window), list(articles.values()))
+
+    formatted = {uri: format_article(art) for uri, art in raw_articles.items()}
+    return {
+        name: [formatted[uri] for uri in dict.fromkeys(profile_uris[name]) if uri in formatted]
+        for name in profile_names
+    }
+
+def merge_profiles(results):
+    """
+    Merge per-profile results into one list of unique articles tagged with their profiles.
+
+    Args:
+        results (dict): Profile name -> list of article information dictionaries
+
+    Returns:
+        list: Unique articles, each with a 'profiles' list
+    """
+    merged = {}
+    for name, articles in results.items():
+        for article_info in articles:
+            entry = merged.setdefault(article_info['uri'], dict(article_info, profiles=[]))
+            entry['profiles'].append(name)
+    return list(merged.values())
+
+def save_articles(filename, articles):
+    """
+    Save articles to a JSON file.
+
+    Args:
+        filename (str): Output path
+        articles (list): Articles to save
+    """
+    try:
+        with open(filename, 'w', encoding='utf-8') as json_file:
+            json.dump(articles, json_file, indent=4, ensure_ascii=False)
+        print(f"All articles saved to '{filename}'")
+    except Exception as e:
+        print(f"Error saving articles to JSON file: {e}")
+
+def main():
+    """
+    Main function to run the configured profiles and save their results.
+    """
+    parser = argparse.ArgumentParser(description='Collect NewsAPI.ai articles for named query profiles')
+    parser.add_argument('--config', default=CONFIG_FILE, help='Profiles config file')
+    parser.add_argument('--profiles', nargs='+', help='Profiles to run (default: all)')
+    parser.add_argument('--start-date', help='Override the configured start date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='Override the configured end date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=MAX_CONCURRENT_REQUESTS, help='Concurrent requests')
+    parser.add_argument('--api-key', default=os.environ.get('NEWSAPI_KEY'), help='NewsAPI.ai key (default: $NEWSAPI_KEY)')
+    parser.add_argument('--max-window-results', type=int, default=MAX_WINDOW_RESULTS,
+                        help='Matches at which a date window is split in half')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory for cached windows')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the window cache')
+    parser.add_argument('--refresh', action='store_true', help='Refetch cached windows and rewrite the cache')
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("a NewsAPI.ai key is required (--api-key or NEWSAPI_KEY)")
+
+    config = load_config(args.config)
+    profile_names = args.profiles or list(config['profiles'])
+    unknown = [name for name in profile_names if name not in config['profiles']]
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(unknown)}")
+
+    print("Fetching articles...")
+    results = collect(config, profile_names, args.api_key, args.start_date, args.end_date, args.workers,
+                      args.max_window_results, None if args.no_cache else args.cache_dir, args.refresh)
+
+    for name in profile_names:
+        save_articles(config['profiles'][name]['output'], results[name])
+    if config.get('merged_output'):
+        merged = merge_profiles(results)
+        save_articles(config['merged_output'], merged)
+        print(f"\nTotal unique articles collected: {len(merged)}")
+
+if __name__ == "__main__":
+    main()
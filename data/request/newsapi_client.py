@@ -0,0 +1,246 @@
+# Author: Oisin Aeonn
+
+"""
+Shared NewsAPI.ai page fetching for collector.py.
+
+The first page of a query is requested on its own to learn its page count; collector.py
+then fetches the remaining pages concurrently over a shared keep-alive session. Rate
+limiting (HTTP 429) and transient server errors are retried with exponential backoff, and
+a 429 pauses every worker rather than just the one that received it.
+
+Collection is two-phase: paging through article uris only (resultType uriWgtList), then
+fetching full articles by uri. test_collector.py exercises both against a local stub server.
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+
+NEWSAPI_URL = "https://newsapi.ai/api/v1/article/getArticles"
+NEWSAPI_ARTICLE_URL = "https://newsapi.ai/api/v1/article/getArticle"
+
+# Concurrency and retry settings
+MAX_CONCURRENT_REQUESTS = 4
+MAX_RETRIES = 5
+INITIAL_BACKOFF_SECONDS = 1
+MAX_BACKOFF_SECONDS = 30
+REQUEST_TIMEOUT_SECONDS = 60
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+ARTICLE_BATCH_SIZE = 100  # Article uris per getArticle request
+
+class RateLimiter:
+    """
+    Shared pause used by all workers after the API reports rate limiting.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.resume_at = 0
+
+    def wait(self):
+        """
+        Block until any active pause has elapsed.
+        """
+        while True:
+            with self.lock:
+                delay = self.resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """
+        Pause all workers for at least the given number of seconds.
+        """
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+def create_session(max_workers=MAX_CONCURRENT_REQUESTS):
+    """
+    Create a keep-alive session with enough pooled connections for every worker.
+
+    Args:
+        max_workers (int): Number of concurrent requests the session will serve
+
+    Returns:
+        requests.Session: Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_page(session, url, payload, page, rate_limiter, result_key='articles', page_param='articlesPage'):
+    """
+    Fetch a single results page.
+
+    Args:
+        session (requests.Session): Shared HTTP session
+        url (str): NewsAPI.ai endpoint
+        payload (dict): Query payload (the page parameter is set per request)
+        page (int): Page number to fetch
+        rate_limiter (RateLimiter): Pause shared between workers
+        result_key (str): Response object holding the results ('articles' or 'uriWgtList')
+        page_param (str): Payload parameter selecting the page
+
+    Returns:
+        dict: The response's result object, or None if the page could not be fetched
+    """
+    data = post_json(session, url, dict(payload, **{page_param: page}), rate_limiter, f"page {page}")
+    if data is None:
+        return None
+    if result_key not in data:
+        print(f"No {result_key} found in the response for page {page}.")
+        return None
+    return data[result_key]
+
+def page_count(result, page_size):
+    """
+    Work out how many pages a query has from its first page.
+
+    Args:
+        result (dict): Result object of the first page
+        page_size (int): Results requested per page
+
+    Returns:
+        int: Total number of pages (at least 1)
+    """
+    if result.get('pages'):
+        return result['pages']
+    return max(1, math.ceil(result.get('totalResults', 0) / page_size))
+
+def post_json(session, url, payload, rate_limiter, label):
+    """
+    POST a request and decode the JSON response, retrying rate-limited and transient failures.
+
+    Args:
+        session (requests.Session): Shared HTTP session
+        url (str): NewsAPI.ai endpoint
+        payload (dict): Request payload
+        rate_limiter (RateLimiter): Pause shared between workers
+        label (str): Description of the request used in log messages
+
+    Returns:
+        dict: Decoded response, or None if the request failed
+    """
+    backoff = INITIAL_BACKOFF_SECONDS
+
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.wait()
+        try:
+            response = session.post(url, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+                retry_after = response.headers.get('Retry-After')
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff
+                delay = min(delay, MAX_BACKOFF_SECONDS) * random.uniform(1, 1.5)
+                if response.status_code == 429:
+                    rate_limiter.pause(delay)
+                print(f"{label.capitalize()}: HTTP {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request for {label}: {e}")
+            if e.response is not None:
+                print(f"Response text: {e.response.text}")
+            if attempt < MAX_RETRIES and e.response is None:
+                # Connection errors and timeouts are worth retrying
+                time.sleep(backoff * random.uniform(1, 1.5))
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                continue
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON response for {label}: {e}")
+            return None
+
+    return None
+
+def fetch_articles_by_uri(session, uris, api_key, rate_limiter, executor):
+    """
+    Fetch full article details for a list of NewsAPI.ai article uris.
+
+    Args:
+        session (requests.Session): Shared HTTP session
+        uris (list): Article uris to fetch
+        api_key (str): NewsAPI.ai authentication key
+        rate_limiter (RateLimiter): Pause shared between workers
+        executor (ThreadPoolExecutor): Pool used to send batches concurrently
+
+    Returns:
+        dict: Raw article dictionaries keyed by uri (uris that failed are missing)
+    """
+    batches = [uris[i:i + ARTICLE_BATCH_SIZE] for i in range(0, len(uris), ARTICLE_BATCH_SIZE)]
+
+    def fetch_batch(batch):
+        payload = {
+            "articleUri": batch,
+            "resultType": "info",
+            "includeArticleImage": True,
+            "articleBodyLen": -1,
+            "apiKey": api_key
+        }
+        return post_json(session, NEWSAPI_ARTICLE_URL, payload, rate_limiter, f"{len(batch)} article details")
+
+    articles = {}
+    for data in executor.map(fetch_batch, batches):
+        for uri, result in (data or {}).items():
+            if isinstance(result, dict) and isinstance(result.get('info'), dict):
+                articles[uri] = result['info']
+            else:
+                print(f"Could not fetch article {uri}: {result}")
+    return articles
+
+def format_article(art):
+    """
+    Convert a raw NewsAPI.ai article into the standardized article info dictionary.
+
+    Args:
+        art (dict): Raw article from the API response
+
+    Returns:
+        dict: Article information (title, dateTime, authors, image, body, source, url, uri, isDuplicate)
+    """
+    # Handle author information
+    authors = art.get('authors', [])
+    if isinstance(authors, list):
+        authors_str = ', '.join(author.get('name', '') for author in authors if isinstance(author, dict))
+    else:
+        authors_str = str(authors)
+
+    return {
+        "title": art.get('title', ''),
+        "dateTime": art.get('dateTimePub', ''),
+        "authors": authors_str,
+        "image": art.get('image', ''),
+        "body": art.get('body', ''),
+        "source": art.get('source', {}).get('title', ''),
+        "url": art.get('url', ''),
+        "uri": article_uri(art),
+        "isDuplicate": art.get('isDuplicate', False)
+    }
+
+def article_uri(art):
+    """
+    Generate a short identifier that is stable for the same NewsAPI.ai article.
+
+    Args:
+        art (dict): Raw article from the API response
+
+    Returns:
+        str: Identifier in the form 'uri-xxxxxxxx'
+    """
+    # Stable ids let articles collected by several profiles or runs be merged
+    key = art.get('uri') or art.get('url')
+    if not key:
+        return f"uri-{uuid.uuid4().hex[:8]}"
+    return f"uri-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
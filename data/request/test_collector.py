@@ -0,0 +1,167 @@
+# Author: Oisin Aeonn
+
+"""
+Tests for the concurrent NewsAPI.ai paging in collector.py, run against a local stub server.
+
+The stub answers getArticles (uriWgtList pages) and getArticle (article details) like
+NewsAPI.ai does, answers later pages faster than earlier ones so completion order differs
+from page order, and records how many requests were in flight at once. Its uri pages come
+from server.pages, or from server.pages_for(date start, date end) to answer by date window.
+
+Usage:
+    python3 -m pytest data/request/test_collector.py
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import collector
+import newsapi_client
+
+PAGE_DELAY_SECONDS = 0.02
+WORKERS = 4
+
+class StubNewsAPIHandler(BaseHTTPRequestHandler):
+    """
+    Serves the stub server's pages; state lives on the server object.
+    """
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if self.path.endswith('/getArticles'):
+                dates = payload['query']['$query']['$and'][1]
+                self.send_uri_page(server.pages_for(dates['dateStart'], dates['dateEnd']), payload['uriWgtListPage'])
+            else:
+                with server.lock:
+                    server.article_batches += 1
+                self.send_json({uri: {'info': {'uri': uri, 'title': uri, 'source': {'title': 'stub'}}} for uri in payload['articleUri']})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_uri_page(self, pages, page):
+        server = self.server
+        with server.lock:
+            server.requests.append(page)
+            rate_limited = page in server.rate_limited
+            server.rate_limited.discard(page)
+        if rate_limited:
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        # Later pages answer sooner, so pages complete out of order
+        time.sleep((len(pages) - page) * PAGE_DELAY_SECONDS)
+        self.send_json({'uriWgtList': {
+            'results': [f"{uri}:1" for uri in pages[page - 1]],
+            'page': page,
+            'pages': len(pages),
+            'totalResults': sum(len(uris) for uris in pages)
+        }})
+
+    def send_json(self, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """
+    Start the stub server and point the collector's endpoints at it.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubNewsAPIHandler)
+    server.lock = threading.Lock()
+    server.pages = []
+    server.pages_for = lambda start, end: server.pages
+    server.requests = []
+    server.article_batches = 0
+    server.rate_limited = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/article"
+    monkeypatch.setattr(collector, 'NEWSAPI_URL', f"{base_url}/getArticles")
+    monkeypatch.setattr(newsapi_client, 'NEWSAPI_ARTICLE_URL', f"{base_url}/getArticle")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def run_collect(**kwargs):
+    """
+    Collect one profile for a single day (one date window) from the stub.
+    """
+    config = {
+        'start_date': '2019-12-01',
+        'end_date': '2019-12-01',
+        'sources': ['stub.example'],
+        'profiles': {'bushfire': {'keyword': 'bushfire', 'output': 'unused.json'}}
+    }
+    return collector.collect(config, ['bushfire'], 'test-key', max_workers=WORKERS, **kwargs)['bushfire']
+
+def test_pages_are_fetched_concurrently_in_page_order(stub_server):
+    stub_server.pages = [[f"uri-{page}-{index}" for index in range(5)] for page in range(8)]
+    # Articles indexed while paging can repeat on the next page
+    stub_server.pages[3].insert(0, stub_server.pages[2][-1])
+
+    articles = run_collect()
+
+    expected = list(dict.fromkeys(uri for uris in stub_server.pages for uri in uris))
+    assert [article['title'] for article in articles] == expected
+    assert sorted(stub_server.requests) == list(range(1, len(stub_server.pages) + 1))
+    assert 1 < stub_server.max_in_flight <= WORKERS
+
+def test_rate_limited_page_is_retried(stub_server):
+    stub_server.pages = [[f"uri-{page}-{index}" for index in range(3)] for page in range(4)]
+    stub_server.rate_limited = {2}
+
+    articles = run_collect()
+
+    assert len(articles) == 12
+    assert stub_server.requests.count(2) == 2
+
+def test_windows_with_too_many_matches_are_split(stub_server):
+    days = {f"2019-12-{day:02d}": [f"uri-{day}-{index}" for index in range(3)] for day in range(1, 9)}
+    windows = []
+
+    def pages_for(start, end):
+        windows.append((start, end))
+        return [[uri for day, uris in days.items() if start <= day <= end for uri in uris]]
+    stub_server.pages_for = pages_for
+
+    articles = run_collect(end_date='2019-12-08', max_window_results=10)
+
+    assert [article['title'] for article in articles] == [uri for uris in days.values() for uri in uris]
+    # 24 matches split into two windows of 12, then four of 6 that are under the cap
+    assert sorted(windows) == [
+        ('2019-12-01', '2019-12-02'), ('2019-12-01', '2019-12-04'), ('2019-12-01', '2019-12-08'),
+        ('2019-12-03', '2019-12-04'), ('2019-12-05', '2019-12-06'), ('2019-12-05', '2019-12-08'),
+        ('2019-12-07', '2019-12-08')
+    ]
+
+def test_complete_windows_are_served_from_the_cache(stub_server, tmp_path):
+    stub_server.pages = [[f"uri-{page}-{index}" for index in range(3)] for page in range(3)]
+    first = run_collect(cache_dir=str(tmp_path))
+    requests_made = (len(stub_server.requests), stub_server.article_batches)
+
+    second = run_collect(cache_dir=str(tmp_path))
+
+    assert second == first
+    assert (len(stub_server.requests), stub_server.article_batches) == requests_made
@@ -0,0 +1,64 @@
+import type * as Api from './api';
+
+jest.mock('axios', () => ({ __esModule: true, default: { get: jest.fn() } }));
+
+const manifest = {
+    version: 1,
+    latest: '2024-06-28T09:30:00Z',
+    shards: { all: 'all.0123456789ab.json', 'month:2024-05': 'month-2024-05.0123456789ab.json' },
+};
+const shardArticles = [
+    { articleId: 2, dateTime: '2024-06-28T09:30:00Z' },
+    { articleId: 1, dateTime: '2024-05-02T00:00:00Z' },
+];
+const apiArticles = [{ articleId: 3, dateTime: '2024-06-01T00:00:00Z' }];
+
+/**
+ * Loads a fresh copy of api.ts (its shard manifest is cached per page load) with axios
+ * answering the manifest, shard files and the API
+ */
+const loadApi = () => {
+    let api: typeof Api | undefined;
+    let get: jest.Mock | undefined;
+    jest.isolateModules(() => {
+        api = require('./api');
+        get = require('axios').default.get;
+    });
+    get!.mockImplementation((url: string) => {
+        if (url.endsWith('/shards/manifest.json')) {
+            return Promise.resolve({ data: manifest });
+        }
+        if (url.includes('/shards/')) {
+            return Promise.resolve({ data: shardArticles });
+        }
+        return Promise.resolve({ data: apiArticles });
+    });
+    return { api: api!, get: get! };
+};
+
+const apiCalls = (get: jest.Mock) => get.mock.calls.filter(([url]) => !url.includes('/shards/'));
+
+test('the search modal default query (ending today) is served from a shard', async () => {
+    const { api, get } = loadApi();
+    const today = new Date().toISOString().split('T')[0] + 'T23:59:59Z';
+
+    const articles = await api.fetchArticle('', '', today, [], '', undefined);
+
+    expect(articles).toEqual(shardArticles);
+    expect(get).toHaveBeenCalledWith(expect.stringMatching(/\/shards\/all\.0123456789ab\.json$/));
+    expect(apiCalls(get)).toHaveLength(0);
+});
+
+test('a query without dates is served from a shard', async () => {
+    const { api, get } = loadApi();
+
+    expect(await api.fetchArticle('', '', '', [], '', undefined)).toEqual(shardArticles);
+    expect(apiCalls(get)).toHaveLength(0);
+});
+
+test('a query ending before the newest shard article goes to the API', async () => {
+    const { api, get } = loadApi();
+
+    expect(await api.fetchArticle('', '', '2024-06-01T23:59:59Z', [], '', undefined)).toEqual(apiArticles);
+    expect(apiCalls(get)).toHaveLength(1);
+});
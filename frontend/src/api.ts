@@ -1,5 +1,82 @@
 import axios from 'axios';
 
+/**
+ * Manifest of the static query shards built by data/database/build_static_shards.py
+ */
+interface ShardManifest {
+    version: number;
+    latest: string | null;                         // dateTime of the newest article in the shards
+    shards: Record<string, string>;                // e.g. 'source:foxnews.com' -> content-hashed file name
+}
+
+const SHARD_BASE_URL = `${process.env.PUBLIC_URL}/shards`;
+let shardManifest: Promise<ShardManifest | null> | undefined;
+
+/**
+ * Loads the static shard manifest once per page load
+ * 
+ * @returns Promise that resolves to the manifest, or null when no shards are deployed
+ */
+const loadShardManifest = () => {
+    if (!shardManifest) {
+        shardManifest = axios
+            .get<ShardManifest>(`${SHARD_BASE_URL}/manifest.json`)
+            .then((res) => (res.data && res.data.shards ? res.data : null))
+            .catch(() => null);                    // No shards (e.g. local development): always use the API
+    }
+    return shardManifest;
+};
+
+/**
+ * Finds the manifest key of the static shard that answers a query, if there is one
+ * 
+ * Shards hold the API's first page for: no filters, a single month (startDate and endDate
+ * covering the whole month), a single source, or a publisher. They hold nothing newer than
+ * manifest.latest, so a query without an endDate or ending after it (like the search
+ * modal's default of today) is answered by the shard as it stands at the last build.
+ * 
+ * @returns Manifest key, or undefined when the query needs the API
+ */
+const getShardKey = (
+    manifest: ShardManifest,
+    search?: string,
+    startDate?: string,
+    endDate?: string,
+    sources?: string[],
+    publisher?: string,
+    thinkTankRef?: Boolean
+) => {
+    const hasSources = !!sources && sources.length > 0;
+    if (search || thinkTankRef !== undefined || (hasSources && publisher)) {
+        return undefined;
+    }
+
+    if (manifest.latest === null) {
+        return undefined;
+    }
+
+    if (!startDate) {
+        // An endDate before the newest article would cut into the shard's first page
+        if (endDate && endDate < manifest.latest) {
+            return undefined;
+        }
+        if (hasSources) {
+            return sources!.length === 1 ? `source:${sources![0]}` : undefined;
+        }
+        return publisher ? `publisher:${publisher.toLocaleLowerCase()}` : 'all';
+    }
+
+    if (startDate && endDate && !hasSources && !publisher) {
+        const month = startDate.slice(0, 7);
+        const [year, monthNumber] = month.split('-').map(Number);
+        const lastDay = new Date(Date.UTC(year, monthNumber, 0)).getUTCDate();
+        if (startDate === `${month}-01T00:00:00Z` && endDate === `${month}-${lastDay}T23:59:59Z`) {
+            return `month:${month}`;
+        }
+    }
+    return undefined;
+};
+
 /**
  * Fetches articles based on provided search criteria from the API
  * 
@@ -10,6 +87,9 @@ import axios from 'axios';
  * @param publisher - Optional publisher name to filter articles (will be converted to lowercase)
  * @param thinkTankRef - Optional boolean to filter articles with think tank references
  * 
+ * Common queries are read from static shards served by CloudFront when the shard
+ * manifest has one for the query; everything else goes to the API.
+ * 
  * @returns Promise that resolves to the API response data
  * @throws Will throw an error if the API request fails
  */
@@ -21,6 +101,24 @@ export const fetchArticle = async (
     publisher?: string,
     thinkTankRef?: Boolean
 ) => {
+    // Serve the query from a static shard when one exists
+    const manifest = await loadShardManifest();
+    const shardKey = manifest
+        ? getShardKey(manifest, search, startDate, endDate, sources, publisher, thinkTankRef)
+        : undefined;
+    const shardFile = shardKey ? manifest?.shards[shardKey] : undefined;
+    if (shardFile) {
+        try {
+            const articles: { dateTime?: string }[] = (await axios.get(`${SHARD_BASE_URL}/${shardFile}`)).data;
+            // The shard only matches the query if its endDate filters none of the shard's articles
+            if (articles.every((article) => !!article.dateTime && (!endDate || article.dateTime <= endDate))) {
+                return articles;
+            }
+        } catch (error) {
+            console.error('Error fetching static shard, using the API instead:', error);
+        }
+    }
+
     // Construct query parameters object with optional filters
     const params = {
         search: search?.toLocaleLowerCase(),        // Convert search term to lowercase
@@ -1,10 +1,13 @@
-import React, { useRef } from 'react';
+import React, { useMemo, useRef } from 'react';
 import * as THREE from 'three';
 import { useFrame } from '@react-three/fiber';
 import { Article } from '../../types/article';
 import { EdgeOptions } from '../../types/filters';
 import { hasActiveFilters, matchesFilter } from '../../utils/filters';
 
+// Edges drawn per article, whether from precomputed neighbors or the spatial fallback
+const MAX_EDGES_PER_ARTICLE = 2;
+
 interface Distance {
   index: number;
   distance: number;
@@ -64,10 +67,46 @@ export const ConnectionLines: React.FC<ConnectionLinesProps> = ({
 
     return distances
       .sort((a, b) => a.distance - b.distance)
-      .slice(0, 2)
+      .slice(0, MAX_EDGES_PER_ARTICLE)
       .map(d => d.index);
   };
 
+  // Edges from the backend's precomputed neighbors, resolved to particle indices once
+  // per data/filter change. Null when the articles carry no neighbors (older data).
+  const neighborPairs = useMemo((): [number, number][] | null => {
+    if (!articles.some(article => article.neighbors && article.neighbors.length > 0)) {
+      return null;
+    }
+
+    const indexById = new Map<string, number>();
+    articles.forEach((article, index) => indexById.set(String(article.articleId), index));
+
+    const pairs: [number, number][] = [];
+    const connectedPairs = new Set<string>();
+
+    articles.forEach((article, i) => {
+      if (!matchesFilter(article, edgeOptions)) return;
+
+      let edges = 0;
+      for (const neighborId of article.neighbors ?? []) {
+        if (edges >= MAX_EDGES_PER_ARTICLE) break;
+
+        // Neighbours outside the loaded or filtered set are skipped
+        const neighborIndex = indexById.get(String(neighborId));
+        if (neighborIndex === undefined || !matchesFilter(articles[neighborIndex], edgeOptions)) continue;
+        edges++;
+
+        const pairKey = [Math.min(i, neighborIndex), Math.max(i, neighborIndex)].join('-');
+        if (!connectedPairs.has(pairKey)) {
+          connectedPairs.add(pairKey);
+          pairs.push([i, neighborIndex]);
+        }
+      }
+    });
+
+    return pairs;
+  }, [articles, edgeOptions]);
+
   useFrame(() => {
     if (lineRef.current && materialRef.current) {
       const geometry = lineRef.current.geometry as THREE.BufferGeometry;
@@ -76,7 +115,22 @@ export const ConnectionLines: React.FC<ConnectionLinesProps> = ({
       const isEdgeActive = hasActiveFilters(edgeOptions);
 
       // Show connections when either in 'on' mode or when hovering in 'hover' mode
-      if ((edgeOptions.visibility === 'on' || (edgeOptions.visibility === 'hover' && hoveredParticle !== null)) && isEdgeActive) {
+      const showEdges =
+        (edgeOptions.visibility === 'on' || (edgeOptions.visibility === 'hover' && hoveredParticle !== null)) && isEdgeActive;
+
+      if (showEdges && neighborPairs) {
+        // Precomputed edges only need the current (animated) particle positions
+        neighborPairs.forEach(([i, neighborIndex]) => {
+          vertices.push(
+            positions[i * 3],
+            positions[i * 3 + 1],
+            positions[i * 3 + 2],
+            positions[neighborIndex * 3],
+            positions[neighborIndex * 3 + 1],
+            positions[neighborIndex * 3 + 2]
+          );
+        });
+      } else if (showEdges) {
         const connectedPairs = new Set<string>();
 
         articles.forEach((_, i) => {
@@ -72,6 +72,9 @@ export type Article = {
     
     /** Reference to think tank involvement (optional) */
     think_tank_ref?: string;
+
+    /** articleIds of the most similar articles, most similar first (optional, computed at ingestion) */
+    neighbors?: Array<string | number>;
   };
   
   /**